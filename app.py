@@ -1,18 +1,55 @@
 from flask import Flask, send_from_directory, request
 from flask_caching import Cache
+import json
 import logging
+import os
 
 # Backend API
 from backend import config as cfg
 from backend import data
+from backend.singleflight import SingleFlight
+from backend.swrcache import StaleWhileRevalidateCache
+from backend.refreshscheduler import RefreshScheduler
 
 app = Flask(__name__, static_url_path='', static_folder='frontend/build')
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
+cache = Cache(config=cfg.get_cache_config())
 cache.init_app(app)
 
 # configure logger
 app.logger.setLevel(logging.DEBUG)
 
+# serve expired data while it is refreshed in the background
+swr_cache = StaleWhileRevalidateCache(cache)
+
+# de-duplicate concurrent identical requests
+data_requests = SingleFlight('data')
+model_builds = SingleFlight('build_model')
+
+def scheduled_data_key(name):
+    return 'scheduled_data/' + name
+
+def set_scheduled_data(name, res, interval):
+    """Cache data refreshed by the scheduler until the refresh after next is due."""
+    cache.set(scheduled_data_key(name), res, timeout=int(2 * interval))
+
+def invalidate_parsed_data(name):
+    """Remove cached parsed data for this data name, e.g. after its stored time series is refreshed.
+        The key is derived from the name, so this removes it from the shared cache for every worker.
+    """
+    key = data.DataAPI(name).cache_key()
+    swr_cache.invalidate(key)
+    return [key]
+
+def invalidate_data(name):
+    """Remove all cached results for this data name, so the next request gets fresh data."""
+    cache.delete(scheduled_data_key(name))
+    return invalidate_parsed_data(name)
+
+# background refresh of data with a RefreshInterval in DataConfig.csv
+refresh_scheduler = RefreshScheduler(store_result=set_scheduled_data, on_store_refresh=invalidate_parsed_data)
+if cfg.ENABLE_REFRESH_SCHEDULER in os.environ:
+    refresh_scheduler.start(app)
+
 def process_form_data(form, json_str_keys, list_keys):
     """Convert the Flask request.form to a dict and convert keys in json_str_keys to dicts."""
     from json import loads
@@ -28,8 +65,8 @@ def process_form_data(form, json_str_keys, list_keys):
 
 def get_model(handle):
     """Return a Model object from the cache given a cache handle."""
-    model = cache.get(handle)
-    return model
+    snapshot = cache.get(handle)
+    return snapshot.model if snapshot is not None else None
 
 @app.route('/')
 def serve():
@@ -50,23 +87,30 @@ def get_data(name):
         app.logger.info('Request get_data(\'' + name + '\')')
         data_api = data.DataAPI(name)
         app.logger.debug('DataAPI(\''+ name + '\') returned ' + str(data_api))
+        # data refreshed in the background is served from the cache
+        scheduled_data = cache.get(scheduled_data_key(name))
+        if scheduled_data is not None:
+            return scheduled_data
+
+        # concurrent requests for the same data share one upstream fetch
         if data_api.cache:
-            return get_cached_data(data_api)
+            return data_requests.do(name, lambda: get_cached_data(data_api))
         else:
-            return get_uncached_data(data_api)
+            return data_requests.do(name, lambda: get_uncached_data(data_api))
     except Exception as e:
         app.logger.error(str(e))
         return dict(errors=str(e))
 
-@cache.cached(timeout=3600)
+@swr_cache.cached(*cfg.swr_timeouts_['data'], make_key=lambda data_api: data_api.cache_key())
 def get_cached_data(data_api):
-    return data_api.get_and_parse_data()
+    # time series are also kept in the on-disk store shared by all workers
+    return data_api.get_and_parse_stored_data()
 
 def get_uncached_data(data_api):
     return data_api.get_and_parse_data()
 
 @app.route('/tips_cusips')
-@cache.cached(timeout=1800)
+@swr_cache.cached(*cfg.swr_timeouts_['tips_cusips'])
 def get_tips_cusips():
     try:
         from backend.tips_data import get_tips_cusips
@@ -78,7 +122,7 @@ def get_tips_cusips():
         return dict(errors=str(e))
 
 @app.route('/all_tsy_reference_data')
-@cache.cached(timeout=1800)
+@swr_cache.cached(*cfg.swr_timeouts_['all_tsy_reference_data'])
 def get_all_tsy_reference_data():
     try:
         from backend.tips_data import get_all_tsy_reference_data
@@ -92,7 +136,7 @@ def get_all_tsy_reference_data():
         return dict(errors=str(e))
 
 @app.route('/tips_reference_data/<cusip>')
-@cache.cached(timeout=1800)
+@swr_cache.cached(*cfg.swr_timeouts_['tips_reference_data'])
 def get_tips_reference_data(cusip):
     try:
         from backend.tips_data import get_treasury_reference_data
@@ -139,25 +183,95 @@ def get_tips_prices():
         app.logger.error(str(e))
         return dict(errors=str(e))
 
+@app.route('/bond_analytics', methods=['POST'])
+def get_bond_analytics():
+    try:
+        from backend.products.bondanalytics import BondAnalytics
+        payload = process_form_data(request.form, ['bonds'], [])
+        analytics = BondAnalytics.from_specs(payload['bonds'], payload.get('base_date') or None)
+        return dict(analytics=analytics)
+
+    except Exception as e:
+        app.logger.error(str(e))
+        return dict(errors=str(e))
+
 @app.route('/build_model', methods=['POST'])
 def build_model():
     try:
         from backend.models.modelfactory import ModelFactory
         params = process_form_data(
-            request.form, ['model_data'], ['initial_guess'])
+            request.form, ['model_data', 'results_options'], ['initial_guess'])
         handle = params.get('handle', 'TempModel')
-        model = ModelFactory.build(params)
-        app.logger.info(f'Built model {handle}: {model}')
-
-        # cache model
-        is_set = cache.set(handle, model)
-        if not is_set:
-            raise RuntimeError(f'ModelFactory.build_and_cache: failed to set {model} in cache.')
-
-        # gather results
-        results_options = params.get('results_options') or {}
-        results = model.get_all_results(**results_options)
-        return dict(results=results, training_data=model.training_data)
+
+        def build_and_cache():
+            model = ModelFactory.build(params)
+            app.logger.info(f'Built model {handle}: {model}')
+
+            # cache a compact snapshot, from which the model is restored on demand
+            is_set = cache.set(handle, model.snapshot())
+            if not is_set:
+                raise RuntimeError(f'ModelFactory.build_and_cache: failed to set {model} in cache.')
+
+            # gather results
+            results_options = params.get('results_options') or {}
+            results = model.get_all_results(**results_options)
+            return dict(results=results, training_data=model.training_data)
+
+        # concurrent requests with the same parameters share one calibration
+        return model_builds.do(json.dumps(params, sort_keys=True, default=str), build_and_cache)
+    except Exception as e:
+        app.logger.error(str(e))
+        return dict(errors=str(e))
+
+
+@app.route('/calibration_stats')
+def get_calibration_stats():
+    try:
+        from backend.models.warmstart import calibration_warm_starts
+        return dict(stats=calibration_warm_starts.get_stats())
+
+    except Exception as e:
+        app.logger.error(str(e))
+        return dict(errors=str(e))
+
+
+@app.route('/invalidate_data/<name>', methods=['POST'])
+def post_invalidate_data(name):
+    try:
+        keys = invalidate_data(name)
+        return dict(invalidated=keys)
+
+    except Exception as e:
+        app.logger.error(str(e))
+        return dict(errors=str(e))
+
+
+@app.route('/refresh_status')
+def get_refresh_status():
+    try:
+        return dict(status=refresh_scheduler.get_status())
+
+    except Exception as e:
+        app.logger.error(str(e))
+        return dict(errors=str(e))
+
+
+@app.route('/cache_stats')
+def get_cache_stats():
+    try:
+        return dict(stats=swr_cache.get_stats(per_key=True))
+
+    except Exception as e:
+        app.logger.error(str(e))
+        return dict(errors=str(e))
+
+
+@app.route('/http_stats')
+def get_http_stats():
+    try:
+        from backend.httpsession import http_session
+        return dict(stats=http_session.get_stats())
+
     except Exception as e:
         app.logger.error(str(e))
         return dict(errors=str(e))
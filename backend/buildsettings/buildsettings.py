@@ -128,6 +128,9 @@ class BuildSettingsBondCurve(BuildSettings):
             opt_method=[
                 cfg.CG,
                 cfg.BFGS,
-                cfg.TRUST_CONSTR
+                cfg.TRUST_CONSTR,
+                cfg.LEAST_SQUARES_TRF,
+                cfg.LEAST_SQUARES_LM,
+                cfg.BOOTSTRAP
             ]
             )
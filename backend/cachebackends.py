@@ -0,0 +1,330 @@
+import hashlib
+import mmap
+import os
+import pickle
+import socket
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+from flask_caching.backends.base import BaseCache
+
+from . import config as cfg
+
+def serialize(value, compress_min_bytes=cfg.cache_compress_min_bytes_):
+    """Return value as bytes, pickled with the highest protocol and compressed if it is large."""
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) >= compress_min_bytes:
+        return b'Z' + zlib.compress(data, 1)
+    return b'P' + data
+
+def deserialize(data):
+    """Return the value of bytes from serialize. data can be any buffer, e.g. a memoryview of a memory map."""
+    data = memoryview(data)
+    if data[:1] == b'Z':
+        return pickle.loads(zlib.decompress(data[1:]))
+    return pickle.loads(data[1:])
+
+def timeout_seconds(timeout, default_timeout):
+    """Return timeout in seconds, keeping fractions of a second, where 0 means the value never expires."""
+    if timeout is None:
+        timeout = default_timeout
+    if hasattr(timeout, 'total_seconds'):
+        timeout = timeout.total_seconds()
+    return max(float(timeout), 0.0)
+
+
+class FileCache(BaseCache):
+    """Cache shared by all processes on a host, with one file per key in cache_dir.
+        Files are written atomically and read through a memory map. When the total size of the files exceeds
+        max_bytes, the least recently used files are removed.
+    """
+    header = struct.Struct('<d')
+    suffix = '.cache'
+
+    def __init__(self, cache_dir, max_bytes=cfg.cache_max_bytes_, default_timeout=300, ignore_delete_many_errors=False):
+        super().__init__(default_timeout=default_timeout, ignore_delete_many_errors=ignore_delete_many_errors)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.bytes_since_eviction = None
+        self.lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        return cls(config.get('CACHE_DIR') or os.path.join(os.getcwd(), 'backend/cache_store'), *args, **kwargs)
+
+    def __repr__(self):
+        return f'FileCache(\'{self.cache_dir}\', max_bytes={self.max_bytes})'
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(str(key).encode('UTF-8')).hexdigest() + self.suffix)
+
+    def expires_at(self, timeout):
+        timeout = timeout_seconds(timeout, self.default_timeout)
+        return time.time() + timeout if timeout > 0 else 0.0
+
+    def read(self, key):
+        """Return (expires_at, value) for key, or None if there is no unexpired value."""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                expires_at, = self.header.unpack_from(m)
+                is_expired = expires_at and expires_at <= time.time()
+                value = None if is_expired else deserialize(m[self.header.size:])
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, zlib.error, struct.error):
+            return None
+
+        if is_expired:
+            self.remove(path)
+            return None
+
+        # the modification time orders files for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return expires_at, value
+
+    def write(self, key, value, timeout):
+        data = self.header.pack(self.expires_at(timeout)) + serialize(value)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key))
+        except OSError:
+            self.remove(tmp_path)
+            return False
+
+        self.evict_if_full(len(data))
+        return True
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def evict_if_full(self, bytes_written):
+        """Remove the least recently used files while the cache is larger than max_bytes.
+            The folder is scanned after every tenth of max_bytes written.
+        """
+        with self.lock:
+            if self.bytes_since_eviction is not None:
+                self.bytes_since_eviction += bytes_written
+                if self.bytes_since_eviction < self.max_bytes / 10:
+                    return
+            self.bytes_since_eviction = 0
+
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                except OSError:
+                    pass
+
+        total_bytes = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_bytes <= self.max_bytes:
+                break
+            if self.remove(path):
+                total_bytes -= size
+
+    def get(self, key):
+        entry = self.read(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key, value, timeout=None):
+        return self.write(key, value, timeout)
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.write(key, value, timeout)
+
+    def delete(self, key):
+        return self.remove(self.path(key))
+
+    def has(self, key):
+        return self.read(key) is not None
+
+    def clear(self):
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(self.suffix):
+                self.remove(entry.path)
+        return True
+
+
+class RespError(Exception):
+    pass
+
+
+class RespClient(object):
+    """Minimal client for the Redis serialization protocol (RESP), with one connection per thread."""
+    def __init__(self, host='localhost', port=6379, db=0, password=None, timeout=cfg.cache_redis_timeout_):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def __repr__(self):
+        return f'RespClient(\'{self.host}:{self.port}/{self.db}\')'
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile('rb'))
+            self.local.conn = conn
+            if self.password:
+                self.send_command(conn, 'AUTH', self.password)
+            if self.db:
+                self.send_command(conn, 'SELECT', self.db)
+        return conn
+
+    def close(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            self.local.conn = None
+            conn[1].close()
+            conn[0].close()
+
+    @staticmethod
+    def encode(args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('UTF-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def read_reply(self, f):
+        line = f.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('RespClient.read_reply: connection closed')
+        prefix, rest = line[:1], line[1:-2]
+        if prefix == b'+':
+            return rest.decode('UTF-8')
+        if prefix == b'-':
+            raise RespError(rest.decode('UTF-8'))
+        if prefix == b':':
+            return int(rest)
+        if prefix == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = f.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self.read_reply(f) for _ in range(length)]
+        raise RespError(f'RespClient.read_reply: unexpected reply {line}')
+
+    def send_command(self, conn, *args):
+        sock, f = conn
+        sock.sendall(self.encode(args))
+        return self.read_reply(f)
+
+    def command(self, *args):
+        """Send a command and return the reply, reconnecting once if the connection was dropped."""
+        try:
+            return self.send_command(self.connection(), *args)
+        except (ConnectionError, socket.timeout, OSError):
+            self.close()
+            return self.send_command(self.connection(), *args)
+
+
+class RedisProtocolCache(BaseCache):
+    """Cache shared by all processes and hosts using a server that speaks the Redis protocol.
+        Keys are namespaced with key_prefix. Server settings are left unchanged, so eviction of the least recently used
+        keys must be configured on the server with maxmemory and maxmemory-policy allkeys-lru or volatile-lru.
+    """
+    def __init__(self, host='localhost', port=6379, db=0, password=None, key_prefix=cfg.cache_key_prefix_,
+                 default_timeout=300, ignore_delete_many_errors=False):
+        super().__init__(default_timeout=default_timeout, ignore_delete_many_errors=ignore_delete_many_errors)
+        self.client = RespClient(host, port, db, password)
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        url = urlsplit(config.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0')
+        return cls(
+            host=url.hostname or 'localhost',
+            port=url.port or 6379,
+            db=int(url.path.strip('/') or 0),
+            password=url.password,
+            **kwargs
+        )
+
+    def __repr__(self):
+        return f'RedisProtocolCache({self.client})'
+
+    def full_key(self, key):
+        return self.key_prefix + str(key)
+
+    def set_value(self, key, value, timeout, only_if_missing=False):
+        args = ['SET', self.full_key(key), serialize(value)]
+        timeout = timeout_seconds(timeout, self.default_timeout)
+        if timeout > 0:
+            args += ['PX', max(int(timeout * 1000), 1)]
+        if only_if_missing:
+            args.append('NX')
+        try:
+            return self.client.command(*args) == 'OK'
+        except (RespError, OSError):
+            return False
+
+    def get(self, key):
+        try:
+            data = self.client.command('GET', self.full_key(key))
+        except (RespError, OSError):
+            return None
+        if data is None:
+            return None
+        try:
+            return deserialize(data)
+        except (pickle.UnpicklingError, zlib.error, EOFError, ValueError):
+            return None
+
+    def set(self, key, value, timeout=None):
+        return self.set_value(key, value, timeout)
+
+    def add(self, key, value, timeout=None):
+        return self.set_value(key, value, timeout, only_if_missing=True)
+
+    def delete(self, key):
+        try:
+            return self.client.command('DEL', self.full_key(key)) > 0
+        except (RespError, OSError):
+            return False
+
+    def has(self, key):
+        try:
+            return self.client.command('EXISTS', self.full_key(key)) > 0
+        except (RespError, OSError):
+            return False
+
+    def clear(self):
+        """Delete all keys with this cache's key prefix."""
+        try:
+            cursor = b'0'
+            while True:
+                cursor, keys = self.client.command('SCAN', cursor, 'MATCH', self.key_prefix + '*', 'COUNT', 1000)
+                if keys:
+                    self.client.command('DEL', *keys)
+                if cursor in (b'0', '0', 0):
+                    return True
+        except (RespError, OSError):
+            return False
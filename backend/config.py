@@ -9,6 +9,11 @@ APP_VERSION = 'APP_VERSION'
 IS_PROD = 'IS_PROD'
 CHROMEDRIVER_PATH = 'CHROMEDRIVER_PATH'
 GOOGLE_CHROME_BIN = 'GOOGLE_CHROME_BIN'
+TIME_SERIES_STORE_FOLDER = 'TIME_SERIES_STORE_FOLDER'
+ENABLE_REFRESH_SCHEDULER = 'ENABLE_REFRESH_SCHEDULER'
+CACHE_BACKEND = 'CACHE_BACKEND'
+CACHE_FOLDER = 'CACHE_FOLDER'
+CACHE_REDIS_URL = 'CACHE_REDIS_URL'
 
 # Model names
 BONDCURVE = 'BondCurve'
@@ -19,6 +24,77 @@ HIST_DEV_SEASONALITY = 'HistDevSeasonality'
 # Numerical constants
 calibration_tolerance_ = 1E-6
 zero_tolerance_ = 1E-12
+warm_start_cache_size_ = 256
+
+# Seconds before a series in the time series store is fetched again
+time_series_store_max_age_ = 3600
+# Seconds before the full history of a series is fetched again instead of only the latest observations
+time_series_full_refresh_age_ = 7 * 24 * 3600
+
+# Timeout in seconds for the components of composite data
+composite_getter_timeout_ = 30.0
+
+# Fetch engine: worker pool size and concurrent requests per host
+fetch_engine_max_workers_ = 64
+fetch_engine_default_host_limit_ = 8
+fetch_engine_host_limits_ = {
+    'fred.stlouisfed.org': 16,
+    'www.treasurydirect.gov': 32,
+    'www.spglobal.com': 8,
+    'ts-api.cnbc.com': 8
+}
+
+# Shared HTTP session: connection pool size per host, (connect, read) timeout in seconds and retries of GET requests.
+# Connection and DNS failures are not retried, so a source that is down fails fast.
+http_default_pool_size_ = 10
+http_pool_sizes_ = {
+    'fred.stlouisfed.org': 32,
+    'www.treasurydirect.gov': 32,
+    'www.spglobal.com': 16,
+    'ts-api.cnbc.com': 16
+}
+http_timeout_ = (5.0, 30.0)
+http_retries_ = 3
+http_connect_retries_ = 0
+http_backoff_factor_ = 0.5
+http_retry_status_codes_ = (429, 500, 502, 503, 504)
+
+# Background refresh of data with a RefreshInterval in DataConfig.csv: requests per second per host,
+# relative jitter of refresh times, seconds between checks for due refreshes and refresh timeout in seconds
+refresh_default_rate_limit_ = 1.0
+refresh_rate_limits_ = {
+    'fred.stlouisfed.org': 2.0,
+    'www.spglobal.com': 1.0,
+    'ts-api.cnbc.com': 2.0
+}
+refresh_jitter_ = 0.1
+refresh_poll_interval_ = 1.0
+refresh_timeout_ = 60.0
+
+# Stale-while-revalidate (soft, hard) timeouts in seconds by route, and background refresh threads
+swr_timeouts_ = {
+    'data': (3600, 24 * 3600),
+    'tips_cusips': (1800, 7 * 24 * 3600),
+    'all_tsy_reference_data': (1800, 7 * 24 * 3600),
+    'tips_reference_data': (1800, 7 * 24 * 3600)
+}
+swr_refresh_workers_ = 4
+
+# Model result date grids: (end tenor, step) segments from the base date, selected with results_options grid
+result_date_grids_ = {
+    'default': [('3Y', '1D'), ('10Y', '7D'), ('31Y', '1M')],
+    'thumbnail': [('31Y', '3M')],
+    'export': [('31Y', '1D')]
+}
+default_result_date_grid_ = 'default'
+result_date_grid_cache_size_ = 64
+
+# Shared cache backend: size limit for LRU eviction of the file cache, pickles larger than this are compressed,
+# key prefix and socket timeout in seconds for Redis protocol servers
+cache_max_bytes_ = 256 * 1024 * 1024
+cache_compress_min_bytes_ = 16 * 1024
+cache_key_prefix_ = 'inflationhub:'
+cache_redis_timeout_ = 5.0
 
 # Optimization methods supported by scipy.optimize.minimize
 NELDER_MEAD = 'Nelder-Mead'
@@ -36,6 +112,22 @@ TRUST_NCG = 'trust-ncg'
 TRUST_EXACT = 'trust-exact'
 TRUST_KRYLOV = 'trust-krylov'
 
+# Optimization methods that use an analytic gradient (jac) and Hessian (hess) when supplied
+GRADIENT_OPT_METHODS = [CG, BFGS, NEWTON_CG, L_BFGS_B, TNC, SLSQP, TRUST_CONSTR, DOGLEG, TRUST_NCG, TRUST_EXACT, TRUST_KRYLOV]
+HESSIAN_OPT_METHODS = [NEWTON_CG, TRUST_CONSTR, DOGLEG, TRUST_NCG, TRUST_EXACT, TRUST_KRYLOV]
+
+# Optimization methods supported by scipy.optimize.least_squares, mapped to the scipy method name
+LEAST_SQUARES_TRF = 'least_squares-trf'
+LEAST_SQUARES_LM = 'least_squares-lm'
+LEAST_SQUARES_OPT_METHODS = {
+    LEAST_SQUARES_TRF: 'trf',
+    LEAST_SQUARES_LM: 'lm'
+}
+
+# Sequential bootstrap, solving for one curve node per instrument
+BOOTSTRAP = 'bootstrap'
+BOOTSTRAP_FALLBACK_OPT_METHOD = LEAST_SQUARES_LM
+
 # get logger from current_app instance
 from flask import current_app as app
 
@@ -59,6 +151,31 @@ else:
     os.environ['PATH'] += os.pathsep + os.environ[CHROMEDRIVER_PATH]
 
 
+def get_cache_config():
+    """Return the Flask-Caching config for the backend named by the CACHE_BACKEND environment variable.
+        simple (default): in-memory cache of each process
+        file: files shared by the processes on this host, in CACHE_FOLDER
+        redis: a server that speaks the Redis protocol at CACHE_REDIS_URL, which must be configured with a maxmemory
+            limit and an LRU maxmemory-policy, e.g. allkeys-lru, to evict old entries
+    """
+    backend = os.environ.get(CACHE_BACKEND, 'simple')
+    if backend == 'simple':
+        return {'CACHE_TYPE': 'SimpleCache'}
+    elif backend == 'redis':
+        return {
+            'CACHE_TYPE': 'backend.cachebackends.RedisProtocolCache',
+            'CACHE_REDIS_URL': os.environ.get(CACHE_REDIS_URL, 'redis://localhost:6379/0')
+        }
+    elif backend == 'file':
+        return {
+            'CACHE_TYPE': 'backend.cachebackends.FileCache',
+            'CACHE_DIR': os.environ.get(CACHE_FOLDER, os.path.join(os.getcwd(), 'backend/cache_store')),
+            'CACHE_OPTIONS': {'max_bytes': cache_max_bytes_}
+        }
+    else:
+        raise ValueError(f'get_cache_config: unrecognized {CACHE_BACKEND} {backend}, expected simple, file or redis.')
+
+
 def get_app_info():
     """Returns a dictionary of app info data."""
     frontend_path = os.path.abspath('frontend')
@@ -1,14 +1,21 @@
-from ..utils import Date, DayCount, day_count_fraction
+from ..utils import Date, DayCount, day_count_fraction, day_count_fractions
 from . import domains
 
 # Utility functions for converting a CurveDataPoint to a given domain
 
-def time_difference(start_date, end_date, time_domain):
+def time_domain_day_count(time_domain):
     if time_domain == domains.TIME_ACT_365:
-        day_count = DayCount.ACT_365
+        return DayCount.ACT_365
     elif time_domain == domains.TIME_30_360:
-        day_count = DayCount.THIRTY_360
+        return DayCount.THIRTY_360
     else:
         raise ValueError(f'Unsupported time domain: {time_domain}.')
 
+def time_difference(start_date, end_date, time_domain):
+    day_count = time_domain_day_count(time_domain)
     return day_count_fraction(start_date, end_date, day_count)
+
+def time_differences(start_date, end_dates, time_domain):
+    """Return a numpy array of times from start_date to each date in end_dates."""
+    day_count = time_domain_day_count(time_domain)
+    return day_count_fractions(start_date, end_dates, day_count)
@@ -1,5 +1,9 @@
+import asyncio
 import datetime
+import functools
+import hashlib
 import os
+import time
 from io import BytesIO
 import requests
 import pandas as pd
@@ -8,7 +12,11 @@ from xml.etree import ElementTree
 # get logger from current_app instance
 from flask import current_app as app
 
-from .utils import Date, DateTime
+from . import config as cfg
+from .utils import Date, DateParser, DateTime
+from .timeseriesstore import time_series_store
+from .httpsession import http_session
+from .fetchengine import fetch_engine, url_host
 from .curveconstruction.curvedata import CpiLevelDataPoint, YoYDataPoint
 
 # Read DataConfig.csv
@@ -18,6 +26,12 @@ DATA_CONFIG = pd.read_csv(
                 keep_default_na=False
             ).to_dict(orient='index')
 
+# Query for requesting observations on or after a start date (yyyy-mm-dd) or month (yyyy-mm), by URL prefix
+INCREMENTAL_QUERIES = {
+    'https://fred.stlouisfed.org/graph/fredgraph.csv': 'cosd={date}',
+    'https://www150.statcan.gc.ca/t1/wds/sdmx/': 'startPeriod={month}'
+}
+
 # Flag icon folcer
 FLAG_FOLDER = os.path.join(os.getcwd(), 'backend/flag_icons')
 
@@ -146,16 +160,42 @@ class DataAPI(object):
         return str(self.__dict__)
 
 
+    def cache_key(self):
+        """Return the key of this data in the cache of parsed data, from its name and what is requested."""
+        if isinstance(self.data_getter, CompositeGetter):
+            request_str = '/'.join(self.data_getter.components)
+        else:
+            request_str = self.url_query() + '|' + '|'.join(f'{k}:{v}' for k, v in sorted(self.headers.items()))
+        request_hash = hashlib.sha1(request_str.encode('UTF-8')).hexdigest()[:12]
+        return f'data/{self.name}/{request_hash}'
+
     def url_query(self):
         if self.query_params:
             return self.url + '?' + '&'.join(self.query_params)
         else:
             return self.url
 
+    def incremental_query(self, start_date):
+        """Return the query that restricts this source to observations on or after start_date, or None if it is not supported."""
+        if isinstance(self.data_getter, CompositeGetter) or not self.url:
+            return None
+        for url_prefix, query in INCREMENTAL_QUERIES.items():
+            if self.url.startswith(url_prefix):
+                start_date = str(start_date)[:10]
+                return query.format(date=start_date, month=start_date[:7])
+        return None
+
     
-    def get_and_parse_data(self):
+    def get_and_parse_data(self, start_date=None):
+        """Get and parse the data, restricted to observations on or after start_date if it is given."""
         try:
-            response = self.data_getter.get()
+            if start_date is None:
+                response = self.data_getter.get()
+            else:
+                query = self.incremental_query(start_date)
+                if not query:
+                    raise ValueError(f'{self.__class__.__name__}.get_and_parse_data: {self.name} does not support requests from a start date.')
+                response = self.data_getter.get_with_query(query)
         except Exception as e:
             app.logger.error('DataAPI(\'' + self.name + '\').get_and_parse_data failed to get data: ' + str(e))
             return dict(errors=str(e))
@@ -166,8 +206,89 @@ class DataAPI(object):
             app.logger.error('DataAPI(\'' + self.name + '\').get_and_parse_data failed to parse data: ' + str(e))
             return dict(errors=str(e))
 
+        if isinstance(self.data_getter, CompositeGetter) and self.data_getter.component_errors:
+            return dict(data=parsed_data, component_errors=dict(self.data_getter.component_errors))
+
         return dict(data=parsed_data)
-        
+
+    def is_time_series(self):
+        return isinstance(self.data_parser, TimeSeriesParser)
+
+    @staticmethod
+    def get_and_parse_many(names, stored=False, timeout=None):
+        """Return a dict of name to dict(data=...) or dict(errors=...) for a list of data names, requested concurrently.
+            If stored is True, time series are read from and written to the on-disk store.
+        """
+        def get_one(name):
+            data_api = DataAPI(name)
+            return data_api.get_and_parse_stored_data() if stored else data_api.get_and_parse_data()
+
+        calls = [
+            (('DataAPI', name, stored), url_host(DATA_CONFIG.get(name, {}).get('URL')), functools.partial(get_one, name))
+            for name in names
+        ]
+        results = {}
+        for name, res in zip(names, fetch_engine.call_many(calls, timeout=timeout)):
+            if isinstance(res, asyncio.TimeoutError):
+                res = dict(errors=f'timed out after {timeout} seconds')
+            elif isinstance(res, Exception):
+                res = dict(errors=str(res))
+            results[name] = res
+        return results
+
+    def get_and_parse_stored_data(self, store=None, max_age=cfg.time_series_store_max_age_,
+                                  incremental=True, full_refresh_age=cfg.time_series_full_refresh_age_):
+        """Return time series data from the on-disk store if it was fetched within max_age seconds,
+            otherwise get and parse the data and write it to the store.
+            If incremental is True and the source supports it, only observations from the last stored date onwards are
+            requested and merged into the stored series, unless the full history is older than full_refresh_age seconds.
+            If getting the data fails, the stored series is returned regardless of its age.
+        """
+        if not (self.cache and self.is_time_series()):
+            return self.get_and_parse_data()
+
+        store = store or time_series_store
+        stored = store.get(self.name)
+        now = time.time()
+        if stored and now - stored[2] < max_age:
+            dates, values, _, _ = stored
+            return dict(data=self.data_parser.to_data(dates, values))
+
+        # one process refreshes the series while the others wait and then read it from the store
+        with store.lock(self.name):
+            stored = store.get(self.name)
+            now = time.time()
+            if stored and now - stored[2] < max_age:
+                dates, values, _, _ = stored
+                return dict(data=self.data_parser.to_data(dates, values))
+
+            is_incremental = (incremental and stored and stored[0]
+                              and now - stored[3] < full_refresh_age
+                              and self.incremental_query(stored[0][-1]) is not None)
+            if is_incremental:
+                # request from the last stored date so that a revision of the latest observation is picked up
+                res = self.get_and_parse_data(start_date=stored[0][-1])
+            else:
+                res = self.get_and_parse_data()
+
+            if 'data' in res:
+                try:
+                    dates, values = self.data_parser.from_data(res['data'])
+                    if is_incremental:
+                        dates, values = TimeSeriesParser.merge(stored[0], stored[1], dates, values)
+                        res = dict(data=self.data_parser.to_data(dates, values))
+                        store.set(self.name, dates, values, fetched_at=now, full_fetched_at=stored[3])
+                    else:
+                        store.set(self.name, dates, values, fetched_at=now)
+                except Exception as e:
+                    app.logger.error('DataAPI(\'' + self.name + '\').get_and_parse_stored_data failed to store data: ' + str(e))
+            elif stored:
+                app.logger.warning('DataAPI(\'' + self.name + '\').get_and_parse_stored_data returning stored data from ' + str(datetime.datetime.fromtimestamp(stored[2])))
+                dates, values, _, _ = stored
+                return dict(data=self.data_parser.to_data(dates, values))
+
+            return res
+
 
 class DataGetter(object):
     def __init__(self, name):
@@ -179,34 +300,75 @@ class DataGetter(object):
     def get(self):
         raise  NotImplementedError(f'{self.__class__.__name__}.{__name__}: not implemented in base class')
 
+    def get_with_query(self, query):
+        """Get the data with an additional query, e.g. to restrict it to recent observations."""
+        raise  NotImplementedError(f'{self.__class__.__name__}.{__name__}: not implemented in base class')
+
 class HttpGetter(DataGetter):
     """Make GET request to a url."""
-    def __init__(self, name, url, headers={}):
+    def __init__(self, name, url, headers={}, timeout=None):
         super().__init__(name)
         self.url = url
         self.headers = headers
+        self.timeout = timeout
 
     def get(self):
         """Default implementation: make GET request to url and return response as text."""
         app.logger.info('DataAPI(\'' + self.name + '\') making request GET ' + self.url)
-        response = requests.get(self.url, headers=self.headers)
+        response = http_session.get(self.url, headers=self.headers, timeout=self.timeout)
+        return response
+
+    def get_with_query(self, query):
+        """Make GET request to url with query appended."""
+        url = self.url + ('&' if '?' in self.url else '?') + query
+        app.logger.info('DataAPI(\'' + self.name + '\') making request GET ' + url)
+        response = http_session.get(url, headers=self.headers, timeout=self.timeout)
         return response
 
 class CompositeGetter(DataGetter):
-    """Combine a list of existing data getters in DataConfig.csv (separated by / in QueryParam1)."""
-    def __init__(self, name, components):
+    """Combine a list of existing data getters in DataConfig.csv (separated by / in QueryParam1).
+        Components are requested concurrently by the fetch engine, and components that fail or time out are left
+        out of the results and reported in component_errors.
+    """
+    def __init__(self, name, components, timeout=cfg.composite_getter_timeout_):
         super().__init__(name)
         for name in components:
             if name not in DATA_CONFIG:
                 raise KeyError(f'{self.__class__.__name__}.{__name__}: Component {name} not fond in DataConfig.')
         self.components = components
+        self.timeout = timeout
+        self.component_errors = {}
+
+    def get_component(self, name):
+        """Return the parsed data of one component as dict(data=...) or dict(errors=...)."""
+        data_api = DataAPI(name=name)
+        if isinstance(data_api.data_getter, HttpGetter):
+            data_api.data_getter.timeout = self.timeout
+        return data_api.get_and_parse_data()
 
     def get(self):
-        """Get each component and merge the results."""
+        """Get each component concurrently and merge the results."""
         app.logger.info(f'{self.__class__.__name__}.{__name__}: getting composite data for {self.name}')
+        self.component_errors = {}
+
+        calls = [
+            (('DataAPI', name), url_host(DATA_CONFIG[name].get('URL')), functools.partial(self.get_component, name))
+            for name in self.components
+        ]
         results = {}
-        for name in self.components:
-            results[name] = DataAPI(name=name).get_and_parse_data().get('data')
+        for name, res in zip(self.components, fetch_engine.call_many(calls, timeout=self.timeout)):
+            if isinstance(res, asyncio.TimeoutError):
+                self.component_errors[name] = f'timed out after {self.timeout} seconds'
+            elif isinstance(res, Exception):
+                self.component_errors[name] = str(res)
+            elif res.get('data') is not None:
+                results[name] = res['data']
+            else:
+                self.component_errors[name] = res.get('errors', 'no data')
+
+        if self.component_errors:
+            app.logger.warning(f'{self.__class__.__name__}.{__name__}: {self.name} is missing components {self.component_errors}')
+
         return results
 
 
@@ -303,6 +465,10 @@ class Parser(object):
         'Z': 'DEC'
     }
 
+    def __init__(self):
+        # each parser detects the date format of its series once
+        self.date_parser = DateParser(Date.supported_formats, lock_format=True)
+
     def __repr__(self):
         return f'{self.__class__.__name__}({self.__dict__})'
 
@@ -346,6 +512,8 @@ class Parser(object):
             Use 1st of the month if day is not provided.
         """
         try:
+            if isinstance(date_str, str):
+                return self.date_parser.parse(date_str).isoformat()
             return str(Date(date_str))
         except TypeError:
             return None
@@ -418,11 +586,34 @@ class Parser(object):
         return f'{month} {year}'
 
 
-class TimeSeriesCsvParser(Parser):
+class TimeSeriesParser(Parser):
+    """Base class for parsers that return a single time series as {date_col_name:[...], value_col_name:[...]}."""
     def __init__(self, value_col_name='Value', date_col_name='Date'):
+        super().__init__()
         self.value_col_name = value_col_name
         self.date_col_name = date_col_name
 
+    def to_data(self, dates, values):
+        """Return lists of dates and values as parsed data."""
+        return {self.date_col_name: list(dates),
+                self.value_col_name: list(values)}
+
+    def from_data(self, data):
+        """Return the lists of dates and values in parsed data."""
+        return data[self.date_col_name], data[self.value_col_name]
+
+    @staticmethod
+    def merge(dates, values, new_dates, new_values):
+        """Return the sorted lists of dates and values of a series updated with new observations.
+            New values replace existing values on the same date.
+        """
+        series = dict(zip(dates, values))
+        series.update(zip(new_dates, new_values))
+        merged_dates = sorted(series.keys())
+        return merged_dates, [series[d] for d in merged_dates]
+
+
+class TimeSeriesCsvParser(TimeSeriesParser):
     def parse(self, response):
         """Handle response as CSV and return data as {date_col_name:[...], value_col_name:[...]}
             dates: yyyy-mm-dd format
@@ -448,16 +639,11 @@ class TimeSeriesCsvParser(Parser):
                 # continue if value cannot be parsed as a float
                 pass
 
-        return {self.date_col_name: dates,
-                self.value_col_name: values}
+        return self.to_data(dates, values)
 
 
-class TimeSeriesCnbcJsonParser(Parser):
+class TimeSeriesCnbcJsonParser(TimeSeriesParser):
     """Parser for CNBC quotes JSON data."""
-    def __init__(self, value_col_name='Value', date_col_name='Date'):
-        self.value_col_name = value_col_name
-        self.date_col_name = date_col_name
-
     def parse(self, response):
         """Hande response as JSON data and return data as {date_col_name:[...], value_col_name:[...]}
             dates: yyyy-mm-dd format
@@ -477,15 +663,10 @@ class TimeSeriesCnbcJsonParser(Parser):
             dates.append(date_str)
             values.append(float(v))
 
-        return {self.date_col_name: dates,
-                self.value_col_name: values}
+        return self.to_data(dates, values)
 
-class TimeSeriesCnbcIntradayCloseParser(Parser):
+class TimeSeriesCnbcIntradayCloseParser(TimeSeriesParser):
     """Parser for CNBC quotes intraday close JSON data."""
-    def __init__(self, value_col_name='Value', date_col_name='Date'):
-        self.value_col_name = value_col_name
-        self.date_col_name = date_col_name
-
     def parse(self, response):
         """Hande response as JSON data and return data as {date_col_name:[...], value_col_name:[...]}
             dates: yyyy-mm-dd HH:MM:SS format
@@ -505,8 +686,7 @@ class TimeSeriesCnbcIntradayCloseParser(Parser):
             dates.append(date_str)
             values.append(float(v))
 
-        return {self.date_col_name: dates,
-                self.value_col_name: values}
+        return self.to_data(dates, values)
 
 
 class CnbcJsonQuoteParser(Parser):
@@ -573,12 +753,8 @@ class CnbcJsonQuoteParser(Parser):
         return res
 
 
-class TimeSeriesSPIndexJsonParser(Parser):
+class TimeSeriesSPIndexJsonParser(TimeSeriesParser):
     """Parser for index time series data from S&P Global."""
-    def __init__(self, value_col_name='Value', date_col_name='Date'):
-        self.value_col_name = value_col_name
-        self.date_col_name = date_col_name
-
     def parse(self, response):
         """Hande response as JSON data and return data as {date_col_name:[...], value_col_name:[...]}
             dates: yyyy-mm-dd format
@@ -598,16 +774,11 @@ class TimeSeriesSPIndexJsonParser(Parser):
             dates.append(date_str)
             values.append(float(v))
 
-        return {self.date_col_name: dates,
-                self.value_col_name: values}
+        return self.to_data(dates, values)
 
 
-class TimeSeriesStatCanXmlParser(Parser):
+class TimeSeriesStatCanXmlParser(TimeSeriesParser):
     """Parser for time series from Statistics Canada."""
-    def __init__(self, value_col_name='Value', date_col_name='Date'):
-        self.value_col_name = value_col_name
-        self.date_col_name = date_col_name
-
     def parse(self, response):
         """Hande response as JSON data and return data as {date_col_name:[...], value_col_name:[...]}
             dates: yyyy-mm-dd format
@@ -626,8 +797,7 @@ class TimeSeriesStatCanXmlParser(Parser):
             dates.append(date_str)
             values.append(float(v))
 
-        return {self.date_col_name: dates,
-                self.value_col_name: values}
+        return self.to_data(dates, values)
 
 
 class IntradayUSTQuoteWsjParser(Parser):
@@ -692,6 +862,7 @@ class CmeTsyQuoteJsonParser(Parser):
 class CmeFuturesQuoteJsonParser(Parser):
     """Parser for intraday CME futures quotes."""
     def __init__(self, name):
+        super().__init__()
         self.name = name
 
     def parse(self, response):
@@ -828,6 +999,7 @@ class MarketWatchBondQuoteParser(Parser):
 class ExcelParser(Parser):
     """Parser for Excel data (xlsx, xls, and any format supported by pandas.read_excel)."""
     def __init__(self, dropna=True, sheet_name=0, header=0, usecols=None):
+        super().__init__()
         self.dropna = dropna
         self.sheet_name = sheet_name
         self.header = header
@@ -929,6 +1101,7 @@ class ErisSwapRateCsvParser(Parser):
 class ErisFuturesCsvParser(Parser):
 
     def __init__(self):
+        super().__init__()
         self.eris_futures_map = {
             'index': {
                 'YI': 'SOFR',
@@ -1012,6 +1185,7 @@ class ErisFuturesCsvParser(Parser):
 
 class ErisIntradayCurveCsvParser(Parser):
     def __init__(self, value_col_name='DiscountFactor'):
+        super().__init__()
         self.value_col_name = value_col_name
 
     def parse(self, response):
@@ -1059,6 +1233,7 @@ class ErisIntradayCurveCsvParser(Parser):
 
 class ErisEodCurveCsvParser(Parser):
     def __init__(self, field, value_col_name='DiscountFactor'):
+        super().__init__()
         self.field = field
         self.value_col_name = value_col_name
 
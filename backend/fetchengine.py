@@ -0,0 +1,173 @@
+import asyncio
+from concurrent import futures
+import functools
+import os
+import threading
+from urllib.parse import urlsplit
+
+from flask import current_app, has_app_context
+
+from . import config as cfg
+from .httpsession import http_session
+
+def url_host(url):
+    """Return the host name of url, or '' if it has none."""
+    return urlsplit(url or '').hostname or ''
+
+
+class FetchEngine(object):
+    """Asyncio event loop, run in a background thread, that schedules blocking fetches for synchronous callers.
+        Concurrency is limited per host and in total by a bounded worker pool, and calls with the same key that
+        are in flight at the same time are coalesced so the work is only done once.
+        Calls made from inside a call, e.g. the components of a composite refreshed by the scheduler, are scheduled
+        on the same loop with their timeout, in a worker pool and host limits for their nesting depth, so that a
+        worker waiting on nested calls cannot deadlock the pool it is running in.
+    """
+    worker_thread_prefix = 'FetchEngineWorker'
+
+    def __init__(self,
+                 session=http_session,
+                 max_workers=cfg.fetch_engine_max_workers_,
+                 host_limits=cfg.fetch_engine_host_limits_,
+                 default_host_limit=cfg.fetch_engine_default_host_limit_):
+        self.session = session
+        self.max_workers = max_workers
+        self.host_limits = dict(host_limits)
+        self.default_host_limit = default_host_limit
+
+        self.loop = None
+        self.pid = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.stats = dict(calls=0, coalesced=0, timeouts=0, errors=0)
+
+    def __repr__(self):
+        return f'FetchEngine(max_workers={self.max_workers}, default_host_limit={self.default_host_limit})'
+
+    def start(self):
+        """Start the event loop thread, or restart it in a forked process."""
+        with self.lock:
+            if self.loop is not None and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.loop = asyncio.new_event_loop()
+            self.executors = {}
+            self.semaphores = {}
+            self.in_flight = {}
+            thread = threading.Thread(target=self.loop.run_forever, name='FetchEngineLoop', daemon=True)
+            thread.start()
+
+    def in_loop_thread(self):
+        return threading.current_thread().name == 'FetchEngineLoop'
+
+    def call_depth(self):
+        """Return the nesting depth of calls made from this thread: 0 outside the engine, n + 1 in a depth n worker."""
+        return getattr(self.local, 'depth', -1) + 1
+
+    def set_worker_depth(self, depth):
+        self.local.depth = depth
+
+    def executor(self, depth):
+        """Return the worker pool for calls at this nesting depth. Only called in the loop thread."""
+        if depth not in self.executors:
+            self.executors[depth] = futures.ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f'{self.worker_thread_prefix}{depth}',
+                initializer=self.set_worker_depth,
+                initargs=(depth,)
+            )
+        return self.executors[depth]
+
+    def semaphore(self, host, depth):
+        if (host, depth) not in self.semaphores:
+            self.semaphores[(host, depth)] = asyncio.Semaphore(self.host_limits.get(host, self.default_host_limit))
+        return self.semaphores[(host, depth)]
+
+    async def run_limited(self, host, func, depth):
+        async with self.semaphore(host, depth):
+            return await self.loop.run_in_executor(self.executor(depth), func)
+
+    async def run_call(self, key, host, func, timeout, depth):
+        self.stats['calls'] += 1
+        if key is not None and key in self.in_flight:
+            self.stats['coalesced'] += 1
+            task = self.in_flight[key]
+        else:
+            task = self.loop.create_task(self.run_limited(host, func, depth))
+            if key is not None:
+                self.in_flight[key] = task
+                task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+        try:
+            # shield the shared task so a caller that times out does not cancel it for the others
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+
+    async def run_calls(self, calls, timeout, depth):
+        return await asyncio.gather(
+            *[self.run_call(key, host, func, timeout, depth) for key, host, func in calls],
+            return_exceptions=True
+        )
+
+    def call_many(self, calls, timeout=None):
+        """Run a list of (key, host, func) calls concurrently and return a list of results, in the same order.
+            A call that raises or does not finish within timeout seconds has the exception as its result.
+            Calls with key None are never coalesced.
+        """
+        calls = list(calls)
+        if not calls:
+            return []
+
+        # blocking functions are run in the current app context
+        if has_app_context():
+            flask_app = current_app._get_current_object()
+            def in_app_context(func):
+                def inner():
+                    with flask_app.app_context():
+                        return func()
+                return inner
+            calls = [(key, host, in_app_context(func)) for key, host, func in calls]
+
+        if self.in_loop_thread():
+            # the loop cannot block on itself, so calls from the loop thread run sequentially
+            results = []
+            for _, _, func in calls:
+                try:
+                    results.append(func())
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self.run_calls(calls, timeout, self.call_depth()), self.loop).result()
+
+    def fetch(self, url, headers=None, timeout=None):
+        """Make GET request to url with the shared session and return the response with its content loaded."""
+        response = self.session.get(url, headers=headers, timeout=timeout)
+        response.content
+        return response
+
+    def get_many(self, urls, headers=None, timeout=None):
+        """Make GET requests to a list of urls concurrently and return a list of responses or exceptions.
+            Identical concurrent requests share a single response.
+        """
+        calls = [
+            (('GET', url, tuple(sorted((headers or {}).items()))), url_host(url), functools.partial(self.fetch, url, headers, timeout))
+            for url in urls
+        ]
+        return self.call_many(calls)
+
+    def get_stats(self):
+        """Return a dict of call counts."""
+        stats = dict(self.stats)
+        stats['in_flight'] = len(self.in_flight) if self.loop is not None else 0
+        return stats
+
+
+# Shared by DataAPI, CompositeGetter and the TreasuryDirect pagers in this process
+fetch_engine = FetchEngine()
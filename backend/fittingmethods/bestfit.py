@@ -29,9 +29,16 @@ class BestFitConstant(FittingMethod):
     def predict(self, x=0):
         return self.constant
 
+    @FittingMethod.check_is_fit
+    def predict_array(self, xs):
+        return np.full(np.shape(xs), self.constant, dtype=float)
+
     def dydx(self, x):
         return 0.0
 
+    def dydx_array(self, xs):
+        return np.zeros(np.shape(xs))
+
     def grad(self, x):
         if self.gradient is not None:
             return self.gradient
@@ -39,6 +46,9 @@ class BestFitConstant(FittingMethod):
         self.gradient = np.array([1.0 / self.training_len for _ in range(self.training_len)])
         return self.gradient
 
+    def grad_array(self, xs):
+        return np.tile(self.grad(0.0), (np.size(xs), 1))
+
     def hess(self, x):
         if self.hessian is not None:
             return self.hessian
@@ -79,10 +89,18 @@ class BestFitLinear(FittingMethod):
         arr = np.array([x]).reshape(-1, 1)
         return self.linear_regression.predict(arr)[0]
 
+    @FittingMethod.check_is_fit
+    def predict_array(self, xs):
+        xs = np.asarray(xs, dtype=float)
+        return self.linear_regression.predict(xs.reshape(-1, 1)).reshape(xs.shape)
+
 
     def dydx(self, x):
         return self.linear_regression.coef_[0]
 
+    def dydx_array(self, xs):
+        return np.full(np.shape(xs), self.linear_regression.coef_[0], dtype=float)
+
     def grad(self, x):
         if self.pinv is not None:
             return x * self.pinv[0] + self.pinv[1]
@@ -92,6 +110,10 @@ class BestFitLinear(FittingMethod):
         predict_vars = [[pt, 1.0] for pt in self.xs]
         self.pinv = pinv(predict_vars)
         return x * self.pinv[0] + self.pinv[1]
+
+    def grad_array(self, xs):
+        self.grad(0.0)
+        return np.outer(np.asarray(xs, dtype=float), self.pinv[0]) + self.pinv[1]
     
     def hess(self, x):
         if self.hessian is not None:
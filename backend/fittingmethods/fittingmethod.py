@@ -1,4 +1,6 @@
 
+import numpy as np
+
 from ..curveconstruction.domains import DomainPair
 
 # String constants for fitting method names
@@ -14,6 +16,8 @@ class FittingMethod(object):
     def __init__(self, domainX, domainY):
         self.domain_pair = DomainPair(domainX, domainY)
         self.is_fit = False
+        # True if y(x) only depends on the training points adjacent to x, so nodes can be solved for one at a time
+        self.has_local_nodes = False
 
 
     def throw_if_not_fit(self):
@@ -60,6 +64,13 @@ class FittingMethod(object):
         raise NotImplementedError('FittingMethod.predict: not implemented in base class.')
 
     
+    def predict_array(self, xs):
+        """Predict y values for an array of x values, returned as a numpy array with the shape of xs."""
+        # Default implementation calls predict point by point - override in derived classes
+        xs = np.asarray(xs, dtype=float)
+        return np.array([self.predict(x) for x in xs.ravel()], dtype=float).reshape(xs.shape)
+
+
     def difference_quotient(self, x, delta_x=1E-4):
         """Return the difference quotient (y(x + delta_x) - y(x) / (delta_x)."""
         if delta_x == 0:
@@ -77,10 +88,21 @@ class FittingMethod(object):
         # Default implementation is a difference quotient with small step size
         return self.difference_quotient(x, delta_x=1E-8)
 
+    def dydx_array(self, xs):
+        """Return the derivative dy/dx at an array of x values as a numpy array with the shape of xs."""
+        # Default implementation calls dydx point by point - override in derived classes
+        xs = np.asarray(xs, dtype=float)
+        return np.array([self.dydx(x) for x in xs.ravel()], dtype=float).reshape(xs.shape)
+
     def grad(self, x):
         """Return the gradient vector (df(x)/dy_1,...,df(x)/dy_n) as a numpy array with shape (n,)"""
         raise NotImplementedError(f'{self.__class__.__name__}.{__name__}: not implemented in base class.')
 
+    def grad_array(self, xs):
+        """Return the gradient vectors at a 1-d array of x values as a numpy array with shape (len(xs), n)."""
+        # Default implementation calls grad point by point - override in derived classes
+        return np.array([self.grad(x) for x in np.asarray(xs, dtype=float)], dtype=float)
+
     def hess(self, x):
         """Return the Hessian matrix [d^2f(x)/dy_idy_j] as a numpy array with shape (n,n)"""
         raise NotImplementedError(f'{self.__class__.__name__}.{__name__}: not implemented in base class.')
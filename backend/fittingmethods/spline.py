@@ -7,177 +7,130 @@ from .fittingmethod import FittingMethod
 class Spline(FittingMethod):
     def __init__(self, domainX, domainY):
         super().__init__(domainX, domainY)
-        self.pairs = None
+        self.xs = None
+        self.ys = None
         self.x_min = None
         self.x_max = None
         self.num_nodes = None
-        self.time_index_cache = {}
-
-    def is_between_endpoints(self, x):
-        return (self.x_min <= x) and (x <= self.x_max)
-
-    def throw_if_out_of_range(self, x):
-        if not self.is_between_endpoints(x):
-            raise ValueError(f'x={x} is out of Spline interpolation range [{self.x_min}, {self.x_max}]')
-
-    # decorator
-    def check_if_out_of_range(predict):
-        def inner(self, x):
-            self.throw_if_out_of_range(x)
-            return predict(self, x)
-        return inner
-
-
-    @check_if_out_of_range
-    def find_node_index_below(self, target):
-        """Return the index of the spline node with the largest x that is <= target."""
-        if target in self.time_index_cache:
-            return self.time_index_cache[target]
-        
-        # binary search
-        left = 0
-        right = self.num_nodes
-
-        while left + 1 < right:
-            mid = (left + right) // 2
-            x, _ = self.pairs[mid]
-            
-            if target < x:
-                right = mid
-            else:
-                left = mid
-
-        self.time_index_cache[target] = left
-        return left
-
-
-    def find_node_index_above(self, target):
-        """Return the index of the spline node with the smallest x that is >= target."""
-        i = self.find_node_index_below(target)
-        xi, _ = self.pairs[i]
-        if target == xi:
-            return i
-        else:
-            return i + 1
+
+    def find_node_index_below(self, targets):
+        """Return the index of the spline node with the largest x that is <= target, for each target.
+            Indices are clipped to the range of nodes, so targets below x_min map to node 0.
+        """
+        return np.clip(np.searchsorted(self.xs, targets, side='right') - 1, 0, self.num_nodes - 1)
+
+
+    def find_node_index_above(self, targets):
+        """Return the index of the spline node with the smallest x that is >= target, for each target.
+            Indices are clipped to the range of nodes, so targets above x_max map to the last node.
+        """
+        return np.clip(np.searchsorted(self.xs, targets, side='left'), 0, self.num_nodes - 1)
 
 
     @FittingMethod.set_is_fit
     def fit(self, xs, ys):
         self.validate(xs, ys)
-        xs = [float(x) for x in xs]
-        ys = [float(y) for y in ys]
+        xs = np.array(xs, dtype=float)
+        ys = np.array(ys, dtype=float)
 
-        self.pairs = sorted(zip(xs, ys), key=lambda x: x[0])
-        self.x_min = self.pairs[0][0]
-        self.x_max = self.pairs[-1][0]
-        self.num_nodes = len(self.pairs)
+        order = np.argsort(xs, kind='stable')
+        self.xs = np.ascontiguousarray(xs[order])
+        self.ys = np.ascontiguousarray(ys[order])
+        self.x_min = self.xs[0]
+        self.x_max = self.xs[-1]
+        self.num_nodes = self.xs.size
 
         # ensure strictly increasing
-        x_last = self.x_min
-        for x, _ in self.pairs[1:]:
-            if x == x_last:
-                raise ValueError(f'Spline.fit: x values must be strictly increasing. Got multiple x={x}.')
-            x_last = x
-
+        repeated = self.xs[1:][np.diff(self.xs) == 0.0]
+        if repeated.size:
+            raise ValueError(f'Spline.fit: x values must be strictly increasing. Got multiple x={repeated[0]}.')
 
+    # Scalar x returns a float (or a vector of shape (n,) for grad), array x returns a numpy array.
     @FittingMethod.check_is_fit
     def predict(self, x):
-        raise NotImplementedError('Spline.predict: not implemented in base class')
+        res = self.predict_array(x)
+        return float(res) if np.ndim(x) == 0 else res
+
+    def dydx(self, x):
+        res = self.dydx_array(x)
+        return float(res) if np.ndim(x) == 0 else res
+
+    def grad(self, x):
+        """Return the gradient of y(x) w.r.t. the node y values: shape (n,) for scalar x, (len(x), n) for an array."""
+        res = self.grad_array(np.atleast_1d(np.asarray(x, dtype=float)))
+        return res[0] if np.ndim(x) == 0 else res
+
+    def predict_array(self, xs):
+        raise NotImplementedError(f'{self.__class__.__name__}.predict_array: not implemented in base class')
+
+    def dydx_array(self, xs):
+        raise NotImplementedError(f'{self.__class__.__name__}.dydx_array: not implemented in base class')
+
+    def grad_array(self, xs):
+        """Return the dense Jacobian of y at a 1-d array of x values w.r.t. the node y values, with shape (len(xs), n)."""
+        raise NotImplementedError(f'{self.__class__.__name__}.grad_array: not implemented in base class')
+
+    def hess(self, x):
+        if self.hessian is None or self.hessian.shape[0] != self.num_nodes:
+            dim = self.num_nodes
+            self.hessian = np.zeros((dim, dim))
+        return self.hessian
+
+    def unit_grad_array(self, indices):
+        """Return a (len(indices), n) matrix with a 1 in column indices[k] of row k."""
+        jac = np.zeros((indices.size, self.num_nodes))
+        jac[np.arange(indices.size), indices] = 1.0
+        return jac
 
 
 class PiecewiseConstantLeftCts(Spline):
     def __init__(self, domainX, domainY):
         super().__init__(domainX, domainY)
+        self.has_local_nodes = True
         self.hessian = None
 
     def __repr__(self):
         return f'PiecewiseConstantLeftCts({self.domain_pair})'
 
     @FittingMethod.check_is_fit
-    def predict(self, x):
-        # natural extrapolation
-        if x <= self.x_min:
-            return self.pairs[0][1]
-        if x > self.x_max:
-            return self.pairs[-1][1]
+    def predict_array(self, xs):
+        # natural extrapolation, take left endpoint
+        i = self.find_node_index_above(np.asarray(xs, dtype=float))
+        return self.ys[i]
 
-        # binary search, take left endpoint
-        i = self.find_node_index_above(x)
-        _, y = self.pairs[i]
-        return y
+    def dydx_array(self, xs):
+        return np.zeros(np.shape(xs))
 
-    def dydx(self, x):
-        return 0.0
+    def grad_array(self, xs):
+        return self.unit_grad_array(self.find_node_index_above(xs))
 
-    def grad(self, x):
-        vec = [0.0 for _ in self.pairs]
-        if x <= self.x_min:
-            vec[0] = 1.0
-            return vec
-        if x > self.x_max:
-            vec[-1] = 1.0
-            return vec
-        
-        i = self.find_node_index_above(x)
-        vec[i] = 1.0
-        return np.array(vec)
-
-    def hess(self, x):
-        if self.hessian is not None:
-            return self.hessian
-
-        dim = self.num_nodes
-        self.hessian = np.zeros((dim, dim))
-        return self.hessian
 
 class PiecewiseConstantRightCts(Spline):
     def __init__(self, domainX, domainY):
         super().__init__(domainX, domainY)
+        self.has_local_nodes = True
         self.hessian = None
 
     def __repr__(self):
         return f'PiecewiseConstantRightCts({self.domain_pair})'
 
     @FittingMethod.check_is_fit
-    def predict(self, x):
-        # natural extrapolation
-        if x < self.x_min:
-            return self.pairs[0][1]
-        if x >= self.x_max:
-            return self.pairs[-1][1]
-        
-        # binary search, take right endpoint
-        i = self.find_node_index_below(x)
-        _, y = self.pairs[i]
-        return y
+    def predict_array(self, xs):
+        # natural extrapolation, take right endpoint
+        i = self.find_node_index_below(np.asarray(xs, dtype=float))
+        return self.ys[i]
 
-    def dydx(self, x):
-        return 0.0
-
-    def grad(self, x):
-        vec = [0.0 for _ in self.pairs]
-        if x <= self.x_min:
-            vec[0] = 1.0
-            return vec
-        if x > self.x_max:
-            vec[-1] = 1.0
-            return np.array(vec)
-        
-        i = self.find_node_index_below(x)
-        vec[i] = 1.0
-        return vec
+    def dydx_array(self, xs):
+        return np.zeros(np.shape(xs))
 
-    def hess(self, x):
-        if self.hessian is not None:
-            return self.hessian
+    def grad_array(self, xs):
+        return self.unit_grad_array(self.find_node_index_below(xs))
 
-        dim = self.num_nodes
-        self.hessian = np.zeros((dim, dim))
-        return self.hessian
 
 class PiecewiseLinear(Spline):
     def __init__(self, domainX, domainY):
         super().__init__(domainX, domainY)
+        self.has_local_nodes = True
         self.slopes = None
         self.hessian = None
 
@@ -188,65 +141,36 @@ class PiecewiseLinear(Spline):
     @FittingMethod.set_is_fit
     def fit(self, xs, ys):
         super().fit(xs, ys)
-        if len(xs) < 2:
+        if self.num_nodes < 2:
             raise ValueError(f'PiecewiseLinear.fit: requires at least 2 points but got xs={xs}, ys={ys}.')
-        self.slopes = [(ys[i + 1] - ys[i]) / (xs[i + 1] - xs[i]) for i in range(len(ys) - 1)]
+        self.slopes = np.diff(self.ys) / np.diff(self.xs)
 
+    def segment_indices(self, xs):
+        """Return the node index each x is interpolated from and the index of the slope to apply."""
+        # natural extrapolation: below x_min use node 0 and the first slope, above x_max use the last node and last slope
+        i = self.find_node_index_below(xs)
+        return i, np.minimum(i, self.num_nodes - 2)
 
     @FittingMethod.check_is_fit
-    def predict(self, x):
-        # natural extrapolation
-        if x < self.x_min:
-            x0, y0 = self.pairs[0]
-            return y0 + self.slopes[0] * (x - x0)
-
-        if x >= self.x_max:
-            xn, yn = self.pairs[-1]
-            return yn + self.slopes[-1] * (x - xn)
-
-        # linear interpolation
-        i = self.find_node_index_below(x)
-        xi, yi = self.pairs[i]
-        return yi + self.slopes[i] * (x - xi)
-            
-    
-    def dydx(self, x):
-        # natural extrapolation
-        if x < self.x_min:
-            return self.slopes[0]
-
-        if x >= self.x_max:
-            return self.slopes[-1]
-
-        # linear interpolation
-        i = self.find_node_index_below(x)
-        return self.slopes[i]
-
-    def grad(self, x):
-        if x < self.x_min:
-            i = 0
-        elif x >= self.x_max:
-            i = self.num_nodes - 2
-        else:
-            i = self.find_node_index_below(x)
-        
-        xi, _ = self.pairs[i]
-        xiplus1, _ = self.pairs[i + 1]
+    def predict_array(self, xs):
+        xs = np.asarray(xs, dtype=float)
+        i, j = self.segment_indices(xs)
+        return self.ys[i] + self.slopes[j] * (xs - self.xs[i])
+
+    def dydx_array(self, xs):
+        _, j = self.segment_indices(np.asarray(xs, dtype=float))
+        return self.slopes[j]
+
+    def grad_array(self, xs):
+        _, j = self.segment_indices(xs)
+        xi, xiplus1 = self.xs[j], self.xs[j + 1]
         run = xiplus1 - xi
 
-        vec = [0.0 for _ in self.pairs]
-        vec[i] = (xiplus1 - x) / run
-        vec[i + 1] = (x - xi) / run
-
-        return np.array(vec)
-
-    def hess(self, x):
-        if self.hessian is not None:
-            return self.hessian
-
-        dim = len(self.pairs)
-        self.hessian = np.zeros((dim, dim))
-        return self.hessian
+        rows = np.arange(xs.size)
+        jac = np.zeros((xs.size, self.num_nodes))
+        jac[rows, j] = (xiplus1 - xs) / run
+        jac[rows, j + 1] = (xs - xi) / run
+        return jac
 
 
 class CubicSpline(Spline):
@@ -254,6 +178,8 @@ class CubicSpline(Spline):
         super().__init__(domainX, domainY)
         self.interpolator = None
         self.interpolator_prime = None
+        self.basis = None
+        self.hessian = None
 
     def __repr__(self):
         return f'{self.__class__.__name__}({self.domain_pair})'
@@ -261,15 +187,21 @@ class CubicSpline(Spline):
     @FittingMethod.set_is_fit
     def fit(self, xs, ys):
         super().fit(xs, ys)
-        xs = np.array([p[0] for p in self.pairs])
-        ys = np.array([p[1] for p in self.pairs])
-        self.interpolator = scipyCubicSpline(xs, ys, bc_type='not-a-knot', extrapolate=True)
+        self.interpolator = scipyCubicSpline(self.xs, self.ys, bc_type='not-a-knot', extrapolate=True)
+        self.interpolator_prime = None
 
     @FittingMethod.check_is_fit
-    def predict(self, x):
-        return self.interpolator(x)
-    
-    def dydx(self, x):
+    def predict_array(self, xs):
+        return self.interpolator(np.asarray(xs, dtype=float))
+
+    def dydx_array(self, xs):
         if self.interpolator_prime is None:
             self.interpolator_prime = self.interpolator.derivative(1)
-        return float(np.asscalar(self.interpolator_prime(x)))
+        return self.interpolator_prime(np.asarray(xs, dtype=float))
+
+    def grad_array(self, xs):
+        # The spline is linear in the node y values, so the gradient is the vector of cardinal basis splines.
+        # The basis only depends on the node x values and is re-used across re-fits with the same xs.
+        if self.basis is None or not np.array_equal(self.basis.x, self.xs):
+            self.basis = scipyCubicSpline(self.xs, np.eye(self.num_nodes), axis=0, bc_type='not-a-knot', extrapolate=True)
+        return self.basis(xs)
@@ -0,0 +1,127 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import config as cfg
+
+class HttpSessionManager(object):
+    """Process-wide requests.Session with a keep-alive connection pool per host.
+        Pool sizes are set per host, GET requests are retried with exponential backoff on read errors and
+        retryable status codes but fail fast on connection errors, and every request has a (connect, read) timeout unless one is given.
+        Latency, error, retry and connection reuse counts are kept per host.
+    """
+    def __init__(self,
+                 pool_sizes=cfg.http_pool_sizes_,
+                 default_pool_size=cfg.http_default_pool_size_,
+                 timeout=cfg.http_timeout_,
+                 retries=cfg.http_retries_,
+                 connect_retries=cfg.http_connect_retries_,
+                 backoff_factor=cfg.http_backoff_factor_):
+        self.pool_sizes = dict(pool_sizes)
+        self.default_pool_size = default_pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.connect_retries = connect_retries
+        self.backoff_factor = backoff_factor
+
+        self.session = requests.Session()
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+        self.adapters = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f'HttpSessionManager(hosts={list(self.adapters.keys())})'
+
+    def retry(self):
+        return Retry(
+            total=self.retries,
+            connect=self.connect_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=cfg.http_retry_status_codes_,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+
+    def adapter(self, url):
+        """Return the adapter for the host of url, mounting one with the host's pool size if there is none yet."""
+        parts = urlsplit(url)
+        host = parts.hostname or ''
+        prefix = f'{parts.scheme}://{parts.netloc}/'
+        with self.lock:
+            if prefix not in self.adapters:
+                pool_size = self.pool_sizes.get(host, self.default_pool_size)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=self.retry())
+                self.session.mount(prefix, adapter)
+                self.adapters[prefix] = adapter
+                self.stats[prefix] = dict(
+                    host=host,
+                    pool_size=pool_size,
+                    requests=0,
+                    errors=0,
+                    retries=0,
+                    total_seconds=0.0,
+                    max_seconds=0.0
+                )
+        return self.adapters[prefix], prefix
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        """Make GET request to url through the shared session and return the response."""
+        _, prefix = self.adapter(url)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout or self.timeout, **kwargs)
+        except Exception:
+            self.record(prefix, time.perf_counter() - start, is_error=True)
+            raise
+
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', None) or ()
+        self.record(prefix, time.perf_counter() - start, is_error=response.status_code >= 400, retries=len(retries))
+        return response
+
+    def record(self, prefix, seconds, is_error=False, retries=0):
+        with self.lock:
+            stats = self.stats[prefix]
+            stats['requests'] += 1
+            stats['errors'] += int(is_error)
+            stats['retries'] += retries
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+    def get_stats(self):
+        """Return a dict of request and connection stats by host."""
+        with self.lock:
+            items = [(prefix, dict(self.stats[prefix]), self.adapters[prefix]) for prefix in self.stats]
+
+        host_stats = {}
+        for prefix, stats, adapter in items:
+            # urllib3 counts the connections opened and requests made by each pool
+            connections = 0
+            pool_requests = 0
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    pool_requests += pool.num_requests
+            stats['connections_opened'] = connections
+            stats['connections_reused'] = max(pool_requests - connections, 0)
+            stats['avg_seconds'] = stats['total_seconds'] / stats['requests'] if stats['requests'] else None
+            host_stats[prefix] = stats
+        return host_stats
+
+    def close(self):
+        with self.lock:
+            self.session.close()
+            self.adapters.clear()
+            self.stats.clear()
+            self.session = requests.Session()
+            self.session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+
+
+# Shared by all HTTP requests in this process
+http_session = HttpSessionManager()
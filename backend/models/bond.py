@@ -1,5 +1,6 @@
 
 from .model import Model
+from .warmstart import calibration_warm_starts
 from ..buildsettings.buildsettings import BuildSettingsBondCurve
 from ..curveconstruction.curvedata import BondDataPoint
 from ..curveconstruction import domains
@@ -11,15 +12,41 @@ from ..products.bonds import Bond
 from ..products.cashflows import MultiLegCashflows
 from ..products.projectedcashflows import ProjectedCashflows
 
-from collections import defaultdict, deque
+from collections import deque
 import math
-from scipy.optimize import minimize
+import numpy as np
+from scipy.optimize import minimize, least_squares, root_scalar, OptimizeResult
 
 # get logger from current_app instance
 from flask import current_app as app
 
+class BondPricingKernel(object):
+    """The contractual cashflows of a list of bonds, compiled once into a sorted array of curve times
+        and a stacked amount matrix with one row per bond, so that bond PVs are amounts @ df(times).
+    """
+    def __init__(self, times_by_bond, amounts_by_bond):
+        if len(times_by_bond) != len(amounts_by_bond):
+            raise ValueError(f'BondPricingKernel: must have equal number of time and amount arrays, but got {len(times_by_bond)} and {len(amounts_by_bond)}, respectively.')
+
+        self.times = np.unique(np.concatenate(times_by_bond)) if times_by_bond else np.array([])
+        self.amounts = np.zeros((len(times_by_bond), self.times.size))
+        for row, times, amounts in zip(self.amounts, times_by_bond, amounts_by_bond):
+            np.add.at(row, np.searchsorted(self.times, times), amounts)
+
+    def __repr__(self):
+        return f'BondPricingKernel(bonds={self.amounts.shape[0]}, times={self.times.size})'
+
+    def pvs(self, dfs):
+        """Return the array of bond PVs given discount factors at the kernel times."""
+        return self.amounts @ dfs
+
+    def pv_jacobian(self, df_jacobian):
+        """Return the matrix of bond PV gradients given the (times, parameters) Jacobian of discount factors at the kernel times."""
+        return self.amounts @ df_jacobian
+
+
 class BondModel(Model):
-    def __init__(self, base_date, training_data=[], build_settings=None, calibration_tolerance=cfg.calibration_tolerance_, initial_guess=[]):
+    def __init__(self, base_date, training_data=[], build_settings=None, calibration_tolerance=cfg.calibration_tolerance_, initial_guess=[], handle=None):
         # no reference model is needed
         super().__init__(base_date, training_data, build_settings)
     
@@ -28,6 +55,7 @@ class BondModel(Model):
         self.t0_date = self.build_settings.t0_date if self.build_settings.t0_date else base_date
         self.calibration_tolerance = calibration_tolerance
         self.curve_time_cache = { self.t0_date: 0.0 }
+        self.training_values = None
         
          # Validate build settings
         if not isinstance(self.build_settings , BuildSettingsBondCurve):
@@ -46,6 +74,7 @@ class BondModel(Model):
         # Future work: allow different node times
         self.training_times = [self.curve_time(p.bond.last_payment_date) for p in self.bond_data_points]
         self.target_pvs = [p.bond.clean_price_to_market_value(p.price, self.base_date) for p in self.bond_data_points]
+        self.pricing_kernel = BondPricingKernel(*zip(*[self.unrealized_cashflows(p.bond) for p in self.bond_data_points]))
 
         if len(self.training_times) != len(self.bond_data_points):
             raise ValueError(f'{self.__class__.__name__}: must have equal number of training times and bond points, but got {len(self.training_times)} and {len(self.bond_data_points)}, respectively.')
@@ -53,24 +82,33 @@ class BondModel(Model):
         if any([t <= 0.0 for t in self.training_times]):
             raise ValueError(f'{self.__class__.__name__}: training times must be strictly positive.')
 
+        # Warm start from the last calibration of the same curve, if the model has a handle and no initial guess is given
+        warm_start_key = None
+        warm_start = None
+        if handle and not initial_guess:
+            warm_start_key = calibration_warm_starts.key(
+                    handle,
+                    [p.label for p in self.bond_data_points],
+                    self.build_settings.domainX,
+                    self.build_settings.domainY,
+                    self.build_settings.fitting_method_str
+                )
+            warm_start = calibration_warm_starts.get(warm_start_key)
+
         if initial_guess:
             if initial_guess[0] == 0.0:
                 initial_guess = initial_guess[1:]
             if len(initial_guess) != len(self.training_times):
                 raise ValueError(f'{self.__class__.__name__}: initial guess must have same length as training times but got len(initial_guess)={len(initial_guess)} and len(training_times)={len(self.training_times)}.')
+        elif warm_start and len(warm_start) == len(self.training_times):
+            app.logger.info(f'{self.__class__.__name__}: warm starting calibration of {handle}.')
+            initial_guess = warm_start
         else:
+            warm_start = None
             initial_guess = self.initial_training_data_guess()
 
         # Calibrate model
-        # Use a numerical minimizer to iteratively update training data, re-fit model and
-        # re-price instruments until square error to target PV is minimized.
-        # - Default minimization method is BFGS.
-        app.logger.info(f'Calibrating {self.__class__.__name__} using method={self.build_settings.opt_method}')
-        res = minimize(
-                self.calibration_objective,
-                initial_guess,
-                method=self.build_settings.opt_method
-            )
+        res = self.calibrate(initial_guess, self.build_settings.opt_method)
         app.logger.info(f'{self.__class__.__name__} calibration result:\n{res}')
         
         # Round-trip check - also ensures model is fit to the final iteration
@@ -100,37 +138,163 @@ class BondModel(Model):
             raise RuntimeError(msg)
         else:
             app.logger.info(f'{self.__class__.__name__} calibrated within tolerance {self.calibration_tolerance}.')
+
+        if warm_start_key:
+            calibration_warm_starts.set(warm_start_key, res.x)
+            calibration_warm_starts.record_calibration(warm_start_key, warm_start is not None, int(res.get('nit', res.nfev)))
     
 
-    def calibration_objective(self, training_values):
-        """Objective function for calibration: use a training guess to fit model, price bonds, minimize error to target PVs."""
+    def calibrate(self, initial_guess, opt_method):
+        """Return the scipy OptimizeResult of calibrating training values to the target PVs with this method."""
+        # Use a numerical minimizer to iteratively update training data, re-fit model and
+        # re-price instruments until square error to target PV is minimized.
+        # - Default minimization method is BFGS.
+        # - Gradient based methods are given the analytic gradient, and the Hessian if they use it.
+        # - Least squares methods minimize the per-bond PV errors directly using their analytic Jacobian.
+        # - Bootstrap solves one node at a time when the fitting method allows it.
+        app.logger.info(f'Calibrating {self.__class__.__name__} using method={opt_method}')
+
+        if opt_method == cfg.BOOTSTRAP:
+            fallback_opt_method = cfg.BOOTSTRAP_FALLBACK_OPT_METHOD
+            if not self.fitting_method.has_local_nodes:
+                app.logger.info(f'{self.__class__.__name__}.calibrate: cannot bootstrap {self.fitting_method}, using method={fallback_opt_method}.')
+                return self.calibrate(initial_guess, fallback_opt_method)
+            try:
+                return self.bootstrap(initial_guess)
+            except RuntimeError as e:
+                app.logger.warning(f'{self.__class__.__name__}.calibrate: bootstrap failed because {e}, using method={fallback_opt_method}.')
+                return self.calibrate(initial_guess, fallback_opt_method)
+
+        if opt_method in cfg.LEAST_SQUARES_OPT_METHODS:
+            return least_squares(
+                    self.calibration_pricing_errors,
+                    initial_guess,
+                    jac=self.calibration_pricing_errors_jacobian,
+                    method=cfg.LEAST_SQUARES_OPT_METHODS[opt_method],
+                    xtol=cfg.zero_tolerance_
+                )
+
+        derivative_kwargs = {}
+        objective = self.calibration_objective
+        if opt_method in cfg.GRADIENT_OPT_METHODS:
+            objective = self.calibration_objective_and_gradient
+            derivative_kwargs['jac'] = True
+        if opt_method in cfg.HESSIAN_OPT_METHODS:
+            derivative_kwargs['hess'] = self.calibration_hessian
+
+        return minimize(
+                objective,
+                initial_guess,
+                method=opt_method,
+                **derivative_kwargs
+            )
+
+    def bootstrap(self, initial_guess):
+        """Solve for one training value at a time, in order of maturity, with a 1-d root finder on each bond's PV error.
+            Requires a fitting method with local nodes: bond i only depends on the nodes up to its own training time.
+        """
+        training_values = np.array(initial_guess, dtype=float)
+        kernel = self.pricing_kernel
+        nfev = 0
+        nit = 0
+
+        for i, target_pv in enumerate(self.target_pvs):
+            payment_indices = np.nonzero(kernel.amounts[i])[0]
+            times, amounts = kernel.times[payment_indices], kernel.amounts[i, payment_indices]
+
+            def target(v):
+                training_values[i] = v
+                self.fit_training_values(training_values)
+                diff = target_pv - amounts @ self.df_at_times(times)
+                # training value i is node i + 1 of the fitting method, after the fixed node at time 0
+                return diff, -self.pv_gradient_at_times(times, amounts)[i + 1]
+
+            res = root_scalar(target, fprime=True, x0=training_values[i], method='newton', xtol=cfg.zero_tolerance_)
+            nfev += res.function_calls
+            nit += res.iterations
+            if not res.converged:
+                raise RuntimeError(f'failed to converge for {self.bond_data_points[i].label}: {res.flag}')
+            training_values[i] = res.root
+
+        return OptimizeResult(x=training_values, success=True, nfev=nfev, nit=nit, message=f'Bootstrapped {len(self.target_pvs)} nodes.')
+
+    def fit_training_values(self, training_values):
+        """Fit the model to a training guess, unless the model is already fit to it."""
+        if self.training_values is not None and np.array_equal(self.training_values, training_values):
+            return
+
         # Insert node at time 0
         q = deque(zip(self.training_times, training_values))
         q.appendleft((0.0, 0.0))
-        
+
         self.training_data = list(q)
         self.fit()
-        # print('*'*100)
-        # print(f'training_data = {self.training_data}')
-        # price instruments and calculate difference from target
-        square_error = 0.0
-        for p, target_pv in zip(self.bond_data_points, self.target_pvs):
-            model_pv = self.pv_bond(p.bond)
-            diff = target_pv - model_pv
-            square_error += diff * diff
-            # print(f'target_pv={target_pv}, model_pv={model_pv}, diff={diff}')
-        
-        # print(f'square_error={square_error}')
-        return square_error
+        self.training_values = np.array(training_values, dtype=float)
+
+    def calibration_pricing_errors(self, training_values):
+        """Use a training guess to fit model, price bonds and return the array of target PV - model PV."""
+        self.fit_training_values(training_values)
+        model_pvs = self.pricing_kernel.pvs(self.df_at_times(self.pricing_kernel.times))
+        return np.asarray(self.target_pvs) - model_pvs
+
+    def calibration_objective(self, training_values):
+        """Objective function for calibration: use a training guess to fit model, price bonds, minimize error to target PVs."""
+        diffs = self.calibration_pricing_errors(training_values)
+        return float(diffs @ diffs)
+
+    def calibration_pv_jacobian(self):
+        """Return the matrix of bond PV gradients w.r.t. training values, with shape (number of bonds, number of training values)."""
+        jacobian = self.pricing_kernel.pv_jacobian(self.df_gradient_at_times(self.pricing_kernel.times))
+        # drop the fixed node at time 0
+        return jacobian[:, 1:]
+
+    def calibration_pricing_errors_jacobian(self, training_values):
+        """Return the Jacobian matrix of the array of target PV - model PV w.r.t. training values."""
+        self.fit_training_values(training_values)
+        return -self.calibration_pv_jacobian()
+
+    def calibration_objective_and_gradient(self, training_values):
+        """Return the calibration objective and its analytic gradient w.r.t. training values."""
+        diffs = self.calibration_pricing_errors(training_values)
+        jacobian = self.calibration_pv_jacobian()
+        return float(diffs @ diffs), -2.0 * (jacobian.T @ diffs)
+
+    def calibration_hessian(self, training_values):
+        """Return the analytic Hessian matrix of the calibration objective w.r.t. training values."""
+        diffs = self.calibration_pricing_errors(training_values)
+        jacobian = self.calibration_pv_jacobian()
+        # sum of PV Hessians weighted by pricing errors is the Hessian of a single PV with error weighted amounts
+        weighted_amounts = diffs @ self.pricing_kernel.amounts
+        weighted_pv_hessian = self.pv_hessian_at_times(self.pricing_kernel.times, weighted_amounts)
+        return 2.0 * (jacobian.T @ jacobian - weighted_pv_hessian[1:, 1:])
 
 
     @classmethod
-    def build(cls, base_date, curve_data, domainX, domainY, fitting_method_str, t0_date=None, calibration_tolerance=cfg.calibration_tolerance_, opt_method=cfg.BFGS, initial_guess=[]):
+    def build(cls, base_date, curve_data, domainX, domainY, fitting_method_str, t0_date=None, calibration_tolerance=cfg.calibration_tolerance_, opt_method=cfg.BFGS, initial_guess=[], handle=None):
          # default t0_date to base_date
         if not t0_date:
             t0_date = base_date
         build_settings = BuildSettingsBondCurve(domainX, domainY, fitting_method_str, t0_date, opt_method)
-        return BondModel(base_date, curve_data, build_settings, calibration_tolerance=calibration_tolerance, initial_guess=initial_guess)
+        return BondModel(base_date, curve_data, build_settings, calibration_tolerance=calibration_tolerance, initial_guess=initial_guess, handle=handle)
+
+    def snapshot(self):
+        """Return a compact ModelSnapshot of the calibrated curve."""
+        return super().snapshot(nodes=self.training_data, t0_date=self.t0_date)
+
+    @classmethod
+    def build_settings_from_snapshot(cls, build_settings):
+        return BuildSettingsBondCurve(**build_settings)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Return a BondModel restored from a ModelSnapshot. It has no bonds, so it cannot be calibrated again."""
+        model = super().from_snapshot(snapshot)
+        model.t0_date = Date(snapshot.t0_date)
+        model.calibration_tolerance = cfg.calibration_tolerance_
+        model.curve_time_cache = { model.t0_date: 0.0 }
+        model.training_values = snapshot.node_values[1:].copy()
+        model.bond_data_points = []
+        return model
     
 
     def curve_time(self, date):
@@ -139,6 +303,10 @@ class BondModel(Model):
             self.curve_time_cache[date] = cu.time_difference(self.t0_date, date, self.build_settings.domainX)
         return self.curve_time_cache[date]
 
+    def curve_times(self, dates):
+        """Return a numpy array of times in years from the curve's t=0 date to each date."""
+        return cu.time_differences(self.t0_date, dates, self.build_settings.domainX)
+
     def initial_training_data_guess(self):
         """Return initial guess for the model's training data."""
         domainY = self.build_settings.domainY
@@ -240,37 +408,112 @@ class BondModel(Model):
         else:
             raise ValueError(f'{self.__class__.__name__}.df: unsupported domain {domainY}.')
         
-        grad = self.df_gradient(date)
-        hessian = self.fitting_method.hess(time)
+        grad = self.fitting_method.grad(time)
+        hessian = np.asarray(self.fitting_method.hess(time))
 
         gradTgrad = grad.reshape(grad.size, 1) * grad
         m = (-scale * df) *(-scale * gradTgrad + hessian)
         return m
 
 
-    def get_all_results(self, **kwargs):
-        """Return a dict of all BondModel output."""        
-        # calculate results
-        res = defaultdict(list)
-        results_key_to_func = {
-            'df': self.df,
-            'time_weighted_zero_rate': self.time_weighted_zero_rate,
-            'zero_rate': self.zero_rate,
-            'instantaneous_forward_rate': self.instantaneous_forward_rate
-        }
+    # Vectorized curve functions, evaluated on a numpy array of curve times
+    def df_at_times(self, times):
+        """Return the discount factors at an array of curve times."""
+        y = self.fitting_method.predict_array(times)
+        domainY = self.build_settings.domainY
+
+        if domainY == domains.TIME_WEIGHTED_ZERO_RATE:
+            return np.exp(-y)
+
+        elif domainY == domains.ZERO_RATE:
+            return np.exp(-times * y)
+
+        else:
+            raise ValueError(f'{self.__class__.__name__}.df_at_times: unsupported domain {domainY}.')
+
+    def df_scale_at_times(self, times):
+        """Return the derivative of -log(df) w.r.t. the fitting method's y value at an array of curve times."""
+        domainY = self.build_settings.domainY
+
+        if domainY == domains.TIME_WEIGHTED_ZERO_RATE:
+            return np.ones_like(times)
+
+        elif domainY == domains.ZERO_RATE:
+            return times
+
+        else:
+            raise ValueError(f'{self.__class__.__name__}.df_scale_at_times: unsupported domain {domainY}.')
+
+    def df_gradient_at_times(self, times):
+        """Return the gradients of the discount factors at an array of curve times w.r.t. training data y values, with shape (len(times), n)."""
+        weights = self.df_at_times(times) * self.df_scale_at_times(times)
+        return -weights[:, np.newaxis] * self.fitting_method.grad_array(times)
+
+    def pv_gradient_at_times(self, times, amounts):
+        """Return the gradient of sum(amounts * df(times)) w.r.t. training data y values."""
+        return amounts @ self.df_gradient_at_times(times)
+
+    def pv_hessian_at_times(self, times, amounts):
+        """Return the Hessian matrix of sum(amounts * df(times)) w.r.t. training data y values."""
+        scale = self.df_scale_at_times(times)
+        weights = amounts * self.df_at_times(times) * scale
+        grads = self.fitting_method.grad_array(times)
+
+        hessian = (grads.T * (weights * scale)) @ grads
+        for t, w in zip(times, weights):
+            hessian -= w * np.asarray(self.fitting_method.hess(t))
+        return hessian
+
+    def time_weighted_zero_rate_at_times(self, times):
+        """Return the time-weighted zero rates at an array of curve times."""
+        return -1.0 * np.log(self.df_at_times(times))
+
+    def zero_rate_at_times(self, times):
+        """Return the zero rates at an array of curve times."""
+        time_weighted_zero_rates = self.time_weighted_zero_rate_at_times(times)
+        return np.divide(time_weighted_zero_rates, times, out=np.zeros_like(time_weighted_zero_rates), where=(times != 0))
+
+    def instantaneous_forward_rate_at_times(self, times):
+        """Return the instantaneous forward rates at an array of curve times."""
+        dydt = self.fitting_method.dydx_array(times)
+        domainY = self.build_settings.domainY
 
-        for d in self.get_curve_result_dates():
-            for key, func in results_key_to_func.items():
-                try:
-                    value = func(d)
-                    res[key].append((str(d), value))
-                except Exception as e:
-                    app.logger.error(f'{self.__class__.__name__}.get_all_results: failed to calculate {key} on {d} because {e}.')
+        if domainY == domains.TIME_WEIGHTED_ZERO_RATE:
+            return dydt
+
+        elif domainY == domains.ZERO_RATE:
+            y = self.fitting_method.predict_array(times)
+            return y + times * dydt
 
-        return res
+        else:
+            raise ValueError(f'{self.__class__.__name__}.instantaneous_forward_rate_at_times: unsupported domain {domainY}.')
+
+
+    def get_all_results(self, grid=None, **kwargs):
+        """Return a dict of all BondModel output on a result date grid, given by a spec or name in cfg.result_date_grids_."""
+        grid = self.get_curve_result_grid(grid)
+        times = self.curve_times(grid.dates64)
+        results_key_to_funcs = {
+            'df': (self.df_at_times, self.df),
+            'time_weighted_zero_rate': (self.time_weighted_zero_rate_at_times, self.time_weighted_zero_rate),
+            'zero_rate': (self.zero_rate_at_times, self.zero_rate),
+            'instantaneous_forward_rate': (self.instantaneous_forward_rate_at_times, self.instantaneous_forward_rate)
+        }
+        return self.evaluate_results(grid, times, results_key_to_funcs)
 
 
     # Valuation
+    def unrealized_cashflows(self, bond):
+        """Return numpy arrays of curve times and contractual amounts of the bond's cashflows paid on or after base_date."""
+        cashflows = bond.cashflows
+        projection_function = [None for _ in cashflows.legs] if isinstance(cashflows, MultiLegCashflows) else None
+        contractual_amounts = ProjectedCashflows(cashflows, projection_function=projection_function, base_date=self.base_date).projected_amounts
+
+        unrealized = [(d, a) for d, a in zip(cashflows.payment_dates, contractual_amounts) if d >= self.base_date]
+        times = np.array([self.curve_time(d) for d, _ in unrealized], dtype=float)
+        amounts = np.array([a for _, a in unrealized], dtype=float)
+        return times, amounts
+
     def project_cashflows(self, cashflows):
         """Return ProjectedCashflows obtained by applying the model's discount factors."""
         projection_function = self.df
@@ -6,8 +6,8 @@ from ..curveconstruction import convertutils as cu
 from ..utils import Date
 from .. import config as cfg
 
-from collections import defaultdict
 import math
+import numpy as np
 from .seasonality import SeasonalityModel
 
 # get logger from current_app instance
@@ -100,6 +100,27 @@ class CpiModel(Model):
         build_settings = BuildSettingsCPICurve(domainX, domainY, fitting_method_str, t0_date)
         return CpiModel(base_date, curve_data, build_settings)
 
+    def snapshot(self):
+        """Return a compact ModelSnapshot of the fit curve and its seasonality."""
+        return super().snapshot(
+            nodes=self.training_data,
+            t0_date=self.t0_date,
+            t0_cpi=self.t0_cpi,
+            seasonality=self.seasonality_model.snapshot()
+        )
+
+    @classmethod
+    def build_settings_from_snapshot(cls, build_settings):
+        return BuildSettingsCPICurve(**build_settings)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        model = super().from_snapshot(snapshot)
+        model.t0_date = Date(snapshot.t0_date)
+        model.t0_cpi = snapshot.t0_cpi
+        model.seasonality_model = snapshot.seasonality.model if snapshot.seasonality else SeasonalityModel(model.base_date)
+        return model
+
     def clamped_date(self, date, clamp_date=False):
         date = Date(date)
         return date.start_of_month() if clamp_date else date
@@ -110,6 +131,13 @@ class CpiModel(Model):
         return cu.time_difference(self.t0_date, date, self.build_settings.domainX)
 
 
+    def clamped_times(self, dates, clamp_date=False):
+        """Return a numpy array of times from t0_date to each date."""
+        if clamp_date:
+            dates = [self.clamped_date(d, clamp_date) for d in dates]
+        return cu.time_differences(self.t0_date, dates, self.build_settings.domainX)
+
+
     def predict_at_date(self, date, clamp_date=False):
         """Get fitting method's prediction at a given date."""
         time = self.clamped_time(date, clamp_date)
@@ -253,24 +281,80 @@ class CpiModel(Model):
         return m
         
 
-    def get_all_results(self, **kwargs):
-        """Return a dict of all CpiModel output."""        
-        # calculate results
-        res = defaultdict(list)
-        results_key_to_func = {
-            'cpi': self.cpi,
-            'cpi_trend': self.cpi_trend,
-            'time_weighted_zero_rate': self.time_weighted_zero_rate,
-            'zero_rate': self.zero_rate,
-            'instantaneous_forward_rate': self.instantaneous_forward_rate
-        }
+    # Vectorized curve functions, evaluated on a numpy array of curve times
+    def cpi_trend_at_times(self, times):
+        """Return the CPI levels without seasonality at an array of curve times."""
+        y = self.fitting_method.predict_array(times)
+        domainY = self.build_settings.domainY
+
+        if domainY == domains.CPI_LEVEL:
+            cpi_trend = y
+
+        else:
+            # t0_cpi is required
+            if not self.t0_cpi:
+                raise ValueError(f'CpiModel.cpi_trend_at_times: uninitialized t0_cpi for domain {domainY}.')
+
+            if domainY == domains.TIME_WEIGHTED_ZERO_RATE:
+                cpi_trend = self.t0_cpi * np.exp(y)
+
+            elif domainY == domains.ZERO_RATE:
+                cpi_trend = self.t0_cpi * np.exp(times * y)
+
+            else:
+                raise ValueError(f'CpiModel.cpi_trend_at_times: unsupported domain {domainY}.')
+
+        return np.maximum(cpi_trend, cfg.zero_tolerance_)
+
+
+    def cpi_at_times(self, times, dates):
+        """Return the CPI levels with seasonality at an array of curve times corresponding to dates."""
+        cpi_sa = self.cpi_trend_at_times(times)
+        cpi_nsa = self.seasonality_model.apply_array(self.t0_date, dates, cpi_sa)
+        return np.maximum(cpi_nsa, cfg.zero_tolerance_)
+
+
+    def time_weighted_zero_rate_at_times(self, times):
+        """Return the time-weighted zero inflation rates of the trend CPI at an array of curve times."""
+        if self.t0_cpi <= 0.0:
+            raise ValueError(f'CpiModel.time_weighted_zero_rate_at_times: cannot calculate due to CPI {self.t0_cpi} <= 0 at t0_date {self.t0_date}.')
+        return np.log(self.cpi_trend_at_times(times) / self.t0_cpi)
+
+
+    def zero_rate_at_times(self, times):
+        """Return the zero rates of the trend CPI at an array of curve times."""
+        time_weighted_zero_rates = self.time_weighted_zero_rate_at_times(times)
+        return np.divide(time_weighted_zero_rates, times, out=np.zeros_like(time_weighted_zero_rates), where=(times != 0.0))
+
 
-        for d in self.get_curve_result_dates():
-            for key, func in results_key_to_func.items():
-                try:
-                    value = func(d)
-                    res[key].append((str(d), value))
-                except Exception as e:
-                    app.logger.error(f'CpiModel.get_all_results: failed to calculate {key} on {d} because {e}.')
+    def instantaneous_forward_rate_at_times(self, times):
+        """Return the instantaneous forward rates of inflation of the trend CPI at an array of curve times."""
+        dydt = self.fitting_method.dydx_array(times)
+        domainY = self.build_settings.domainY
+
+        if domainY == domains.TIME_WEIGHTED_ZERO_RATE:
+            return dydt
+
+        y = self.fitting_method.predict_array(times)
+        if domainY == domains.ZERO_RATE:
+            return y + times * dydt
+
+        elif domainY == domains.CPI_LEVEL:
+            return dydt / np.maximum(y, cfg.zero_tolerance_)
 
-        return res
+        else:
+            raise ValueError(f'CpiModel.instantaneous_forward_rate_at_times: unsupported domain {domainY}.')
+
+
+    def get_all_results(self, grid=None, **kwargs):
+        """Return a dict of all CpiModel output on a result date grid, given by a spec or name in cfg.result_date_grids_."""
+        grid = self.get_curve_result_grid(grid)
+        times = self.clamped_times(grid.dates64)
+        results_key_to_funcs = {
+            'cpi': (lambda ts: self.cpi_at_times(ts, grid.dates()), self.cpi),
+            'cpi_trend': (self.cpi_trend_at_times, self.cpi_trend),
+            'time_weighted_zero_rate': (self.time_weighted_zero_rate_at_times, self.time_weighted_zero_rate),
+            'zero_rate': (self.zero_rate_at_times, self.zero_rate),
+            'instantaneous_forward_rate': (self.instantaneous_forward_rate_at_times, self.instantaneous_forward_rate)
+        }
+        return self.evaluate_results(grid, times, results_key_to_funcs)
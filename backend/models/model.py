@@ -1,8 +1,57 @@
 
 from ..curveconstruction.curvedata import CurveDataPointFactory
-from ..utils import Date, EomRule
+from ..utils import Date
+from ..utilities.dategrid import result_date_grid
 from ..fittingmethods.fittingmethodfactory import FittingMethodFactory
 
+from collections import defaultdict
+import numpy as np
+
+# get logger from current_app instance
+from flask import current_app as app
+
+class ModelSnapshot(object):
+    """Compact state of a built model: build settings, dates as ISO strings and calibrated nodes as numpy arrays.
+        A snapshot pickles to a few KB, unlike a model that holds its instruments, cashflows and caches.
+        The model is restored on first access by re-fitting its fitting method to the nodes, without calibrating again.
+    """
+    def __init__(self, model_type, base_date, build_settings=None, nodes=[], t0_date=None, t0_cpi=None, seasonals=None, seasonality=None):
+        self.model_type = model_type
+        self.base_date = str(base_date)
+        self.build_settings = None if build_settings is None else {
+            k: str(v) if isinstance(v, Date) else v for k, v in vars(build_settings).items()
+        }
+        nodes = np.array(nodes, dtype=float).reshape(-1, 2)
+        self.node_times = nodes[:, 0].copy()
+        self.node_values = nodes[:, 1].copy()
+        self.t0_date = str(t0_date) if t0_date else None
+        self.t0_cpi = None if t0_cpi is None else float(t0_cpi)
+        self.seasonals = None if seasonals is None else np.array(seasonals, dtype=float)
+        self.seasonality = seasonality
+        self.restored_model = None
+
+    def __repr__(self):
+        return f'ModelSnapshot({self.model_type}, {self.base_date}, nodes={self.node_times.size})'
+
+    def __getstate__(self):
+        # the restored model is rebuilt lazily in each process
+        state = dict(self.__dict__)
+        state['restored_model'] = None
+        return state
+
+    def training_data(self):
+        """Return the calibrated nodes as a list of (x, y) pairs."""
+        return list(zip(self.node_times.tolist(), self.node_values.tolist()))
+
+    @property
+    def model(self):
+        """Return the model restored from this snapshot."""
+        if self.restored_model is None:
+            from .modelfactory import ModelFactory
+            self.restored_model = ModelFactory.from_snapshot(self)
+        return self.restored_model
+
+
 class Model(object):
     def __init__(self, base_date, model_data=[], build_settings=None, reference_models=[]):
         self.base_date = Date(base_date)
@@ -33,29 +82,74 @@ class Model(object):
         self.fitting_method.fit(*zip(*self.training_data))
         return
 
+    def snapshot(self, **kwargs):
+        """Return a compact ModelSnapshot of this model. kwargs are passed to ModelSnapshot by derived classes."""
+        return ModelSnapshot(self.__class__.__name__, self.base_date, self.build_settings, **kwargs)
+
+    @classmethod
+    def build_settings_from_snapshot(cls, build_settings):
+        """Return the BuildSettings of a model from the dict saved in its snapshot."""
+        raise NotImplementedError(f'{cls.__name__}.build_settings_from_snapshot: not implemented in base class.')
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Return a model restored from a ModelSnapshot, fit to its nodes without calibrating again.
+            The restored model evaluates curves and results, but does not keep the data it was built from.
+        """
+        model = cls.__new__(cls)
+        model.base_date = Date(snapshot.base_date)
+        model.model_data = []
+        model.reference_models = []
+        model.build_settings = None
+        if snapshot.build_settings is not None:
+            model.build_settings = cls.build_settings_from_snapshot(snapshot.build_settings)
+            model.fitting_method = FittingMethodFactory.create(
+                model.build_settings.fitting_method_str,
+                model.build_settings.domainX,
+                model.build_settings.domainY
+            )
+
+        model.training_data = snapshot.training_data()
+        if model.training_data:
+            model.fit()
+        return model
+
     def get_all_results(self, **kwargs):
         """Return a dict of all model output."""
         raise NotImplementedError('Model.get_all_results: not implemented in base class.')
 
-    def get_curve_result_dates(self):
+    def evaluate_results(self, grid, times, results_key_to_funcs):
+        """Return a dict of (date string, value) lists for each result key, at the dates of a ResultDateGrid.
+            results_key_to_funcs maps each key to a pair (array_func, func):
+            - array_func is evaluated once on the whole array of times,
+            - func is evaluated date by date, only if array_func fails or returns non-finite values.
+        """
+        res = defaultdict(list)
+        date_strs = grid.date_strs()
+
+        for key, (array_func, func) in results_key_to_funcs.items():
+            try:
+                values = np.asarray(array_func(times), dtype=float)
+                if values.shape != times.shape or not np.all(np.isfinite(values)):
+                    raise ValueError('non-finite values in batch evaluation')
+                res[key] = list(zip(date_strs, values.tolist()))
+                continue
+            except Exception as e:
+                app.logger.warning(f'{self.__class__.__name__}.evaluate_results: batch evaluation of {key} failed because {e}, evaluating by date.')
+
+            for d in grid.dates():
+                try:
+                    value = func(d)
+                    res[key].append((str(d), value))
+                except Exception as e:
+                    app.logger.error(f'{self.__class__.__name__}.get_all_results: failed to calculate {key} on {d} because {e}.')
+
+        return res
+
+    def get_curve_result_grid(self, grid=None):
+        """Return the ResultDateGrid to evaluate model results, given a grid spec or the name of one in cfg.result_date_grids_."""
+        return result_date_grid(self.base_date, grid)
+
+    def get_curve_result_dates(self, grid=None):
         """Return a list of Dates to evaluate model results."""
-        start_date = self.base_date
-        daily_end_date = start_date.addTenor('3Y')
-        weekly_end_date = start_date.addTenor('10Y')
-        monthly_end_date = start_date.addTenor('31Y')
-
-        dates = []
-        d = start_date
-        while d <= daily_end_date:
-            dates.append(d)
-            d = d.addDays(1)
-        
-        while d <= weekly_end_date:
-            dates.append(d)
-            d = d.addDays(7)
-
-        while d <= monthly_end_date:
-            dates.append(d)
-            d = d.addMonths(1, EomRule.LAST)
-
-        return dates
+        return self.get_curve_result_grid(grid).dates()
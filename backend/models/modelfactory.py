@@ -7,7 +7,7 @@ from ..curveconstruction.curvedata import BondYieldDataPoint
 # Import derived model types for building
 from .cpi import CpiModel
 from .bond import BondModel
-from .seasonality import AdditiveSeasonalityModel, HistoricalDeviationSeasonalityModel
+from .seasonality import SeasonalityModel, AdditiveSeasonalityModel, HistoricalDeviationSeasonalityModel
 
 class ModelFactory(object):
 
@@ -28,6 +28,7 @@ class ModelFactory(object):
         calibration_tolerance = float(params.get('calibration_tolerance', cfg.calibration_tolerance_))
         opt_method = params.get('opt_method', cfg.TRUST_CONSTR)
         initial_guess = params.get('initial_guess', [])
+        handle = params.get('handle')
         if initial_guess:
             initial_guess = [float(x) for x in initial_guess]
 
@@ -50,7 +51,8 @@ class ModelFactory(object):
                     t0_date=t0_date,
                     calibration_tolerance=calibration_tolerance,
                     opt_method=opt_method,
-                    initial_guess=initial_guess
+                    initial_guess=initial_guess,
+                    handle=handle
                 )
         elif model_type == cfg.ADDITIVE_SEASONALITY:
             return AdditiveSeasonalityModel.build(
@@ -69,6 +71,20 @@ class ModelFactory(object):
         else:
             raise ValueError(f'ModelFactory.build: unsupported model type {model_type}.')
 
+    @staticmethod
+    def from_snapshot(snapshot):
+        """Return the model restored from a ModelSnapshot."""
+        model_types = { cls.__name__: cls for cls in [
+            CpiModel,
+            BondModel,
+            SeasonalityModel,
+            AdditiveSeasonalityModel,
+            HistoricalDeviationSeasonalityModel
+        ]}
+        if snapshot.model_type not in model_types:
+            raise ValueError(f'ModelFactory.from_snapshot: unsupported model type {snapshot.model_type}.')
+        return model_types[snapshot.model_type].from_snapshot(snapshot)
+
     @staticmethod
     def get_model_data(params):
         """Get training data for this model based on model_type."""
@@ -8,6 +8,7 @@ from ..curveconstruction.curvedata import CpiLevelDataPoint, AdditiveSeasonality
 from collections import defaultdict
 import datetime
 import math
+import numpy as np
 
 # get logger from current_app instance
 from flask import current_app as app
@@ -21,12 +22,20 @@ class SeasonalityModel(Model):
     def __repr__(self):
         return f'NoSeasonalityModel({self.base_date})'
 
+    @classmethod
+    def build_settings_from_snapshot(cls, build_settings):
+        return BuildSettingsSeasonality(build_settings['domainX'], build_settings['domainY'])
+
     def strip(self, start_date, end_date, end_cpi_nsa):
         return end_cpi_nsa
 
     def apply(self, start_date, end_date, end_cpi_trend):
         return end_cpi_trend
 
+    def apply_array(self, start_date, end_dates, end_cpi_trends):
+        """Apply seasonality to an array of trend CPI levels on end_dates and return a numpy array."""
+        return np.asarray(end_cpi_trends, dtype=float)
+
     # consistency verification functions - use these default implementions in derived classes
     def expect_invertible(self, start_date, end_date, cpi):
         """Return True if apply and strip are inverses over this time period for this value, False otherwise."""
@@ -53,8 +62,8 @@ class SeasonalityModel(Model):
         # Default implementation for No Seasonality
         return 0.0
 
-    def get_all_results(self, **kwargs):
-        """Return a dict of all SeasonalityModel output."""
+    def get_all_results(self, grid=None, **kwargs):
+        """Return a dict of all SeasonalityModel output on a result date grid, given by a spec or name in cfg.result_date_grids_."""
         # calculate results
         res = defaultdict(list)
         results_key_to_func = {
@@ -63,7 +72,7 @@ class SeasonalityModel(Model):
             'instantaneous_forward_rate': self.instantaneous_forward_rate
         }
 
-        for d in self.get_curve_result_dates():
+        for d in self.get_curve_result_dates(grid):
             for key, func in results_key_to_func.items():
                 try:
                     value = func(d)
@@ -104,6 +113,16 @@ class AdditiveSeasonalityModel(SeasonalityModel):
     def __repr__(self):
         return f'{__class__.__name__}({self.base_date})'
 
+    def snapshot(self):
+        """Return a compact ModelSnapshot with the seasonals of each month."""
+        return super().snapshot(seasonals=[self.seasonals_map[m] for m in range(1, 13)])
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        model = super().from_snapshot(snapshot)
+        model.seasonals_map = { m: v for m, v in zip(range(1, 13), snapshot.seasonals.tolist()) }
+        return model
+
     def strip(self, start_date, end_date, end_cpi_nsa):
         adjustment = self.integrate(start_date, end_date)
         return end_cpi_nsa * math.exp(-adjustment)
@@ -112,6 +131,10 @@ class AdditiveSeasonalityModel(SeasonalityModel):
         adjustment = self.integrate(start_date, end_date)
         return end_cpi_trend * math.exp(adjustment)
 
+    def apply_array(self, start_date, end_dates, end_cpi_trends):
+        adjustments = np.array([self.integrate(start_date, d) for d in end_dates])
+        return np.asarray(end_cpi_trends, dtype=float) * np.exp(adjustments)
+
     def instantaneous_forward_rate(self, date):
         """Return the instantaneous rate of seasonality on a specific date."""
         if not isinstance(date, Date):
@@ -0,0 +1,79 @@
+from .. import config as cfg
+
+from collections import OrderedDict
+import threading
+
+class CalibrationWarmStartCache(object):
+    """Keyed store of the last calibrated training values of each curve, used to seed the next calibration.
+        Keys are (handle, instruments, domainX, domainY, fitting_method_str) and the least recently used key is evicted first.
+    """
+    def __init__(self, max_size=cfg.warm_start_cache_size_):
+        self.max_size = max_size
+        self.training_values = OrderedDict()
+        self.cold_start_iterations = {}
+        self.stats = dict(
+            cold_starts=0,
+            warm_starts=0,
+            cold_start_iterations=0,
+            warm_start_iterations=0,
+            iterations_saved=0
+        )
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f'CalibrationWarmStartCache(size={len(self.training_values)}, max_size={self.max_size})'
+
+    @staticmethod
+    def key(handle, instruments, domainX, domainY, fitting_method_str):
+        return (handle, tuple(instruments), domainX, domainY, fitting_method_str)
+
+    def get(self, key):
+        """Return a copy of the last calibrated training values for this key, or None."""
+        with self.lock:
+            if key not in self.training_values:
+                return None
+            self.training_values.move_to_end(key)
+            return list(self.training_values[key])
+
+    def set(self, key, training_values):
+        with self.lock:
+            self.training_values[key] = [float(v) for v in training_values]
+            self.training_values.move_to_end(key)
+            while len(self.training_values) > self.max_size:
+                evicted_key, _ = self.training_values.popitem(last=False)
+                self.cold_start_iterations.pop(evicted_key, None)
+
+    def record_calibration(self, key, is_warm_start, iterations):
+        """Update convergence stats with the number of iterations a calibration took."""
+        with self.lock:
+            if is_warm_start:
+                self.stats['warm_starts'] += 1
+                self.stats['warm_start_iterations'] += iterations
+                # compare to the most recent cold start of the same curve
+                if key in self.cold_start_iterations:
+                    self.stats['iterations_saved'] += self.cold_start_iterations[key] - iterations
+            else:
+                self.stats['cold_starts'] += 1
+                self.stats['cold_start_iterations'] += iterations
+                self.cold_start_iterations[key] = iterations
+
+    def get_stats(self):
+        """Return a dict of convergence stats."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self.training_values)
+
+        stats['avg_cold_start_iterations'] = stats['cold_start_iterations'] / stats['cold_starts'] if stats['cold_starts'] else None
+        stats['avg_warm_start_iterations'] = stats['warm_start_iterations'] / stats['warm_starts'] if stats['warm_starts'] else None
+        return stats
+
+    def clear(self):
+        with self.lock:
+            self.training_values.clear()
+            self.cold_start_iterations.clear()
+            for k in self.stats:
+                self.stats[k] = 0
+
+
+# Shared by all BondModel calibrations in this process
+calibration_warm_starts = CalibrationWarmStartCache()
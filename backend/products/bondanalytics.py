@@ -0,0 +1,186 @@
+from .. import config as cfg
+from ..utils import Date
+from .bonds import Bond
+from .projectedcashflows import USStreetYieldCalculator
+
+import numpy as np
+
+class BondAnalytics(object):
+    """Yield, price and risk measures for a list of bonds on a base date.
+        The compounding terms of every bond's yield calculator are stacked into flat arrays, so PVs and their
+        yield derivatives are evaluated for all bonds at once and yields are solved with a vectorized Halley iteration.
+    """
+    def __init__(self, bonds, base_date=None, projected_cashflows=None):
+        if not all([isinstance(b, Bond) for b in bonds]):
+            raise ValueError('BondAnalytics: bonds must be a list of Bond objects.')
+
+        self.bonds = list(bonds)
+        self.base_date = Date(base_date) if base_date is not None else Date.today()
+        if projected_cashflows is None:
+            projected_cashflows = [b.get_projected_cashflows(self.base_date) for b in self.bonds]
+        elif len(projected_cashflows) != len(self.bonds):
+            raise ValueError('BondAnalytics: requires one projected cashflows per bond.')
+        self.projected_cashflows = list(projected_cashflows)
+        self.yield_calculators = [pc.yield_calculator for pc in self.projected_cashflows]
+
+        terms = [calc.compounding_terms() for calc in self.yield_calculators]
+        self.num_bonds = len(self.bonds)
+        self.bond_index = np.concatenate([np.full(len(amounts), i) for i, (amounts, _, _) in enumerate(terms)]) if terms else np.zeros(0, dtype=int)
+        self.amounts = np.concatenate([amounts for amounts, _, _ in terms]) if terms else np.zeros(0)
+        self.rates = np.concatenate([rates for _, rates, _ in terms]) if terms else np.zeros((0, 2))
+        self.exponents = np.concatenate([exponents for _, _, exponents in terms]) if terms else np.zeros((0, 2))
+
+        # Macauley duration is (1 + y * rate) times modified duration
+        self.macauley_rates = np.array([
+            1.0 / calc.periods_per_year if isinstance(calc, USStreetYieldCalculator) else 1.0
+            for calc in self.yield_calculators
+        ])
+        self.notionals = np.array([b.notional for b in self.bonds])
+        self.accrued_interest_per_100 = np.array([b.accrued_interest_per_100(self.base_date) for b in self.bonds])
+
+    def __repr__(self):
+        return f'BondAnalytics(bonds={self.num_bonds}, base_date={self.base_date})'
+
+    def sum_by_bond(self, term_values):
+        return np.bincount(self.bond_index, weights=term_values, minlength=self.num_bonds)
+
+    def yield_to_pv_and_derivatives(self, ys):
+        """Return arrays of PV, 1st and 2nd derivatives of PV w.r.t. yield, for an array of yields with one per bond."""
+        term_ys = np.asarray(ys, dtype=float)[self.bond_index, np.newaxis]
+        bases = 1.0 + self.rates * term_ys
+
+        # each term is amount * exp(-log_compounding), with log_compounding = sum(exponents * log(1 + rates * y))
+        log_compounding = np.sum(self.exponents * np.log(bases), axis=1)
+        log_compounding_prime = np.sum(self.exponents * self.rates / bases, axis=1)
+        log_compounding_prime2 = -np.sum(self.exponents * (self.rates / bases) ** 2, axis=1)
+
+        values = self.amounts * np.exp(-log_compounding)
+        pvs = self.sum_by_bond(values)
+        pv_primes = self.sum_by_bond(-values * log_compounding_prime)
+        pv_prime2s = self.sum_by_bond(values * (log_compounding_prime ** 2 - log_compounding_prime2))
+        return pvs, pv_primes, pv_prime2s
+
+    def yield_to_pv(self, ys):
+        pvs, _, _ = self.yield_to_pv_and_derivatives(ys)
+        return pvs
+
+    def pv_to_yield(self, pvs, guesses=None, solve=None, max_iterations=50, errors=None):
+        """Return an array of yields to maturity for an array of present values with one per bond.
+            Only bonds where solve is True are solved for, the others keep their guess.
+            The yield of a bond that cannot be solved is NaN, and the reason is added to the errors dict by bond index.
+        """
+        pvs = np.asarray(pvs, dtype=float)
+        ys = np.array(guesses, dtype=float) if guesses is not None else np.zeros(self.num_bonds)
+        active = np.array(solve, dtype=bool) if solve is not None else np.ones(self.num_bonds, dtype=bool)
+        solved = active.copy()
+
+        with np.errstate(all='ignore'):
+            for _ in range(max_iterations):
+                if not active.any():
+                    break
+                values, primes, prime2s = self.yield_to_pv_and_derivatives(ys)
+                diffs = values - pvs
+                # Halley step
+                steps = 2.0 * diffs * primes / (2.0 * primes * primes - diffs * prime2s)
+                steps[~active] = 0.0
+                ys = ys - steps
+
+                converged = np.abs(steps) <= cfg.zero_tolerance_ * (1.0 + np.abs(ys))
+                active &= ~converged & np.isfinite(ys)
+
+        # fall back to the bracketing solver of each bond's yield calculator
+        for i in np.nonzero(solved & (active | ~np.isfinite(ys)))[0]:
+            try:
+                ys[i] = self.yield_calculators[i].pv_to_yield(pvs[i])
+            except Exception as e:
+                ys[i] = np.nan
+                if errors is not None:
+                    errors[i] = str(e)
+
+        return ys
+
+    def clean_prices_to_pvs(self, clean_prices):
+        """Return the market values of the bonds at these clean prices."""
+        return self.notionals * (np.asarray(clean_prices, dtype=float) + self.accrued_interest_per_100) / 100.0
+
+    def analytics(self, ytms=None, clean_prices=None):
+        """Return a list of dicts of yield, price and risk measures, one per bond.
+            Each bond's yield is used if it is not None in ytms, otherwise its clean price.
+            A bond whose yield cannot be solved from its clean price gets a dict with errors instead.
+        """
+        ytms = list(ytms) if ytms is not None else [None] * self.num_bonds
+        clean_prices = list(clean_prices) if clean_prices is not None else [None] * self.num_bonds
+        if len(ytms) != self.num_bonds or len(clean_prices) != self.num_bonds:
+            raise ValueError(f'BondAnalytics.analytics: requires one ytm or clean_price per bond for {self.num_bonds} bonds.')
+
+        has_ytm = np.array([y is not None for y in ytms])
+        missing = [i for i in range(self.num_bonds) if not has_ytm[i] and clean_prices[i] is None]
+        if missing:
+            raise ValueError(f'BondAnalytics.analytics: requires at least one of ytm or clean_price for bonds at {missing}.')
+
+        # solve for yields of bonds quoted by price
+        ys = np.array([float(y) if y is not None else 0.0 for y in ytms])
+        errors = {}
+        if not has_ytm.all():
+            target_pvs = self.clean_prices_to_pvs([p if p is not None else 0.0 for p in clean_prices])
+            ys = self.pv_to_yield(target_pvs, guesses=ys, solve=~has_ytm, errors=errors)
+            for i in np.nonzero(~np.isfinite(ys))[0]:
+                errors.setdefault(i, 'failed to converge')
+            # price the failed bonds at a placeholder yield so the others are evaluated together
+            ys = np.where(np.isfinite(ys), ys, 0.0)
+
+        pvs, primes, prime2s = self.yield_to_pv_and_derivatives(ys)
+        dirty_prices = 100.0 * pvs / self.notionals
+        modified_durations = -primes / pvs
+
+        return [
+            dict(errors=f'BondAnalytics.analytics: cannot solve yield at clean price {clean_prices[i]}, {errors[i]}')
+            if i in errors else
+            dict(
+                ytm=float(ys[i]),
+                ctsly_compounded_yield=self.yield_calculators[i].annual_yield_to_ctsly_compounded(ys[i]),
+                clean_price=float(dirty_prices[i] - self.accrued_interest_per_100[i]),
+                dirty_price=float(dirty_prices[i]),
+                accrued_interest=float(self.notionals[i] * self.accrued_interest_per_100[i] / 100.0),
+                pv=float(pvs[i]),
+                yield_dv01=float(-primes[i] / 10000.0),
+                modified_duration=float(modified_durations[i]),
+                macauley_duration=float((1.0 + ys[i] * self.macauley_rates[i]) * modified_durations[i]),
+                convexity=float(prime2s[i] / pvs[i])
+            )
+            for i in range(self.num_bonds)
+        ]
+
+    @staticmethod
+    def from_specs(specs, base_date=None):
+        """Return a list of analytics dicts for bond specs, each a dict of Bond.create_bond kwargs plus ytm or clean_price.
+            A spec that cannot be built or priced gets a dict with errors instead.
+        """
+        base_date = Date(base_date) if base_date is not None else Date.today()
+        results = [None] * len(specs)
+        bonds, projected_cashflows, ytms, clean_prices, indices = [], [], [], [], []
+        for i, spec in enumerate(specs):
+            try:
+                spec = dict(spec)
+                ytm = spec.pop('ytm', None)
+                clean_price = spec.pop('clean_price', None)
+                if ytm is None and clean_price is None:
+                    raise ValueError('requires at least one of ytm or clean_price')
+                bond = Bond.create_bond(**spec)
+                bond_projected_cashflows = bond.get_projected_cashflows(base_date)
+            except Exception as e:
+                results[i] = dict(errors=f'BondAnalytics.from_specs: cannot price bond {i}, {e}.')
+                continue
+
+            bonds.append(bond)
+            projected_cashflows.append(bond_projected_cashflows)
+            ytms.append(float(ytm) if ytm is not None else None)
+            clean_prices.append(float(clean_price) if clean_price is not None else None)
+            indices.append(i)
+
+        if bonds:
+            analytics = BondAnalytics(bonds, base_date, projected_cashflows).analytics(ytms, clean_prices)
+            for i, a in zip(indices, analytics):
+                results[i] = a
+
+        return results
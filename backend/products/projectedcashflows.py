@@ -1,5 +1,6 @@
 
 import math
+import numpy as np
 
 from ..utils import Date, DayCount, day_count_fraction, YieldConvention
 from .cashflows import Cashflows, MultiLegCashflows
@@ -172,15 +173,24 @@ class YieldCalculator(object):
     def yield_to_pv_prime2(self, y):
         raise NotImplementedError('YieldCalculator.yield_to_pv_prime2: not implemented in base class.')
 
+    def value_and_derivatives(self, y):
+        """Returns the tuple (yield_to_pv, yield_to_pv_prime, yield_to_pv_prime2) evaluated at y."""
+        # Default implementation makes 3 calls - override in derived classes to evaluate in a single pass
+        return self.yield_to_pv(y), self.yield_to_pv_prime(y), self.yield_to_pv_prime2(y)
+
+    def compounding_terms(self):
+        """Returns numpy arrays (amounts, rates, exponents), with rates and exponents of shape (len(amounts), 2), such that
+            yield_to_pv(y) = sum(amounts * prod((1 + rates * y) ** -exponents, axis=1)).
+        """
+        raise NotImplementedError('YieldCalculator.compounding_terms: not implemented in base class.')
+
     def pv_to_yield(self, pv):
         """Returns the yield to maturity of the projected cashflows for a given present value."""
         from scipy.optimize import root_scalar        
         guess = 0.0
         def target(y):
-            return (self.yield_to_pv(y) - pv,
-                    self.yield_to_pv_prime(y),
-                    self.yield_to_pv_prime2(y)
-                    )
+            value, prime, prime2 = self.value_and_derivatives(y)
+            return value - pv, prime, prime2
 
         # First, try fast method without guaranteed convergence
         res = root_scalar(target, fprime=True, fprime2=True, x0=guess, method=self.fast_method)
@@ -203,54 +213,72 @@ class YieldCalculator(object):
         return - self.yield_to_pv_prime(y) / 10000.0
 
     def modified_duration(self, y):
-        price = self.yield_to_pv(y)
-        return - self.yield_to_pv_prime(y) / price
+        price, prime, _ = self.value_and_derivatives(y)
+        return - prime / price
 
     def macauley_duration(self, y):
         return (1.0 + y) * self.modified_duration(y)
 
     def convexity(self, y):
-        price = self.yield_to_pv(y)
-        return self.yield_to_pv_prime2(y) / price
+        price, _, prime2 = self.value_and_derivatives(y)
+        return prime2 / price
     
     def annual_yield_to_ctsly_compounded(self, y):
         raise NotImplementedError('YieldCalculator.annual_yield_to_ctsly_compounded: not implemented in base class.')
 
-class USStreetYieldCalculator(YieldCalculator):
-    def __init__(self, projected_amounts, periods_per_year, coupon_frac):
+class PeriodicYieldCalculator(YieldCalculator):
+    """Yield calculations for PV = sum(amounts * (1 + y / periods_per_year) ** -exponents).
+        Amounts and exponents are held as numpy arrays so PV and its derivatives are evaluated in one vectorized pass.
+    """
+    def __init__(self, projected_amounts, periods_per_year, exponents):
         super().__init__()
         self.projected_amounts = projected_amounts
         self.periods_per_year = periods_per_year
-        self.coupon_frac = coupon_frac
+        self.amounts = np.array(projected_amounts, dtype=float)
+        self.exponents = np.array(exponents, dtype=float)
+        self.rate = 1.0 / periods_per_year
+        self.exponents_plus_1 = self.exponents + 1.0
+
+    def discounted_amounts(self, y):
+        return self.amounts * (1.0 + y * self.rate) ** -self.exponents
 
     def yield_to_pv(self, y):
-        pv = 0.0
-        df = 1.0 / (1.0 + y / self.periods_per_year)
-        accum_df = 1.0 / (1.0 + y / self.periods_per_year)**self.coupon_frac
-        for a in self.projected_amounts:
-            pv += a * accum_df
-            accum_df *= df
-        return pv
-    
+        """Returns the PV of a projected cashflow for a given yield to maturity."""
+        return float(np.sum(self.discounted_amounts(y)))
+
     def yield_to_pv_prime(self, y):
-        res = 0.0
-        df = 1.0 / (1.0 + y / self.periods_per_year)
-        accum_df = 1.0 / (1.0 + y / self.periods_per_year)**(self.coupon_frac) / df
-        for i, a in enumerate(self.projected_amounts):
-            res += -(i + self.coupon_frac) * a * accum_df / self.periods_per_year
-            accum_df *= df
-        return res
+        """Returns the 1st-order derivative of the yieldToPv function."""
+        rate_df = self.rate / (1.0 + y * self.rate)
+        return float(-rate_df * (self.discounted_amounts(y) @ self.exponents))
 
     def yield_to_pv_prime2(self, y):
-        """Returns the 1st-order derivative of the yieldToPv function."""
-        res = 0.0
-        df = 1.0 / (1.0 + y / self.periods_per_year)
-        periods_sqd = self.periods_per_year * self.periods_per_year
-        accum_df = 1.0 / (1.0 + y / self.periods_per_year)**(self.coupon_frac) / (df * df)
-        for i, a in enumerate(self.projected_amounts):
-            res += (i + self.coupon_frac) * (i + 1.0 + self.coupon_frac) * a * accum_df / periods_sqd
-            accum_df *= df
-        return res
+        """Returns the 2nd-order derivative of the yieldToPv function."""
+        rate_df = self.rate / (1.0 + y * self.rate)
+        return float(rate_df * rate_df * (self.discounted_amounts(y) @ (self.exponents * self.exponents_plus_1)))
+
+    def value_and_derivatives(self, y):
+        rate_df = self.rate / (1.0 + y * self.rate)
+        values = self.discounted_amounts(y)
+        weighted_exponents = values * self.exponents
+        return (
+            float(np.sum(values)),
+            float(-rate_df * np.sum(weighted_exponents)),
+            float(rate_df * rate_df * (weighted_exponents @ self.exponents_plus_1))
+        )
+
+    def compounding_terms(self):
+        n = self.amounts.size
+        rates = np.zeros((n, 2))
+        rates[:, 0] = self.rate
+        exponents = np.zeros((n, 2))
+        exponents[:, 0] = self.exponents
+        return self.amounts.copy(), rates, exponents
+
+
+class USStreetYieldCalculator(PeriodicYieldCalculator):
+    def __init__(self, projected_amounts, periods_per_year, coupon_frac):
+        super().__init__(projected_amounts, periods_per_year, np.arange(len(projected_amounts)) + coupon_frac)
+        self.coupon_frac = coupon_frac
 
     def macauley_duration(self, y):
         return (1.0 + y / self.periods_per_year) * self.modified_duration(y)
@@ -286,7 +314,7 @@ class TbillYieldCalculator(YieldCalculator):
     def yield_to_pv_prime2(self, y):
         f = self.compound_factor(y)
         f_prime = self.compound_factor_prime(y)
-        return (- self.final_amount) * (f * self.compound_factor_prime2(y) -  (f_prime * f_prime)) / (f * f * f)
+        return self.final_amount * (2.0 * f_prime * f_prime - f * self.compound_factor_prime2(y)) / (f * f * f)
 
     def annual_yield_to_ctsly_compounded(self, y):
         return math.log(self.compound_factor(y)) / self.dcf
@@ -303,6 +331,9 @@ class TbillUnder6mYieldCalculator(TbillYieldCalculator):
 
     def compound_factor_prime2(self, y):
         return 0.0
+
+    def compounding_terms(self):
+        return np.array([self.final_amount], dtype=float), np.array([[self.dcf, 0.0]]), np.array([[1.0, 0.0]])
     
 class TbillOver6mYieldCalculator(TbillYieldCalculator):
     def __init__(self, projected_amounts, dcf):
@@ -315,35 +346,15 @@ class TbillOver6mYieldCalculator(TbillYieldCalculator):
         return (1.0 + self.dcf) * 0.5 + self.dcf * 0.5 * y
 
     def compound_factor_prime2(self, y):
-        return self.dcf * 0.
+        return self.dcf * 0.5
 
-class TrueYieldCalculator(YieldCalculator):
+    def compounding_terms(self):
+        return np.array([self.final_amount], dtype=float), np.array([[self.dcf * 0.5, 0.5]]), np.array([[1.0, 1.0]])
+
+class TrueYieldCalculator(PeriodicYieldCalculator):
     def __init__(self, projected_amounts, payment_times):
-        super().__init__()
-        self.projected_amounts = projected_amounts
+        super().__init__(projected_amounts, 1, payment_times)
         self.payment_times = payment_times
 
-    def yield_to_pv(self, y):
-        """Returns the PV of a projected cashflow for a given yield to maturity."""
-        pv = sum([
-            a / (1.0 + y)**t
-            for a, t in zip(self.projected_amounts, self.payment_times)
-        ])
-        return pv
-    
-    def yield_to_pv_prime(self, y):
-        """Returns the 1st-order derivative of the yieldToPv function."""
-        return sum([
-            -t * a / (1.0 + y)**(t + 1.0)
-            for a, t in zip(self.projected_amounts, self.payment_times)
-        ])
-
-    def yield_to_pv_prime2(self, y):
-        """Returns the 2nd-order derivative of the yieldToPv function."""
-        return sum([
-            t * (t + 1.0) * a / (1.0 + y)**(t + 2.0)
-            for a, t in zip(self.projected_amounts, self.payment_times)
-        ])
-
     def annual_yield_to_ctsly_compounded(self, y):
         return math.log(1.0 + y)
@@ -0,0 +1,225 @@
+import functools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from . import config as cfg
+from .data import DATA_CONFIG, DataAPI
+from .fetchengine import fetch_engine, url_host
+from .timeseriesstore import fcntl, time_series_store
+
+def refresh_interval(data_config):
+    """Return the RefreshInterval of a DataConfig row in seconds, or None if it is not scheduled."""
+    try:
+        interval = float(data_config.get('RefreshInterval') or 0.0)
+    except ValueError:
+        return None
+    return interval if interval > 0.0 else None
+
+
+class RateLimiter(object):
+    """Token bucket allowing rate requests per second on average, in bursts of up to max(rate, 1) requests."""
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def try_acquire(self):
+        """Take a token and return True if one is available, otherwise return False."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class RefreshScheduler(object):
+    """Background thread that refreshes the data in DataConfig.csv with a RefreshInterval, in seconds.
+        Cached time series are refreshed in the on-disk time series store, after which on_store_refresh is called
+        with the name, and other data is passed to store_result.
+        Refresh times are jittered, requests are rate limited per host, and only one process runs the scheduler.
+    """
+    def __init__(self,
+                 data_config=DATA_CONFIG,
+                 store_result=None,
+                 on_store_refresh=None,
+                 rate_limits=cfg.refresh_rate_limits_,
+                 default_rate_limit=cfg.refresh_default_rate_limit_,
+                 jitter=cfg.refresh_jitter_,
+                 folder=None):
+        self.intervals = {}
+        self.hosts = {}
+        for name, config in data_config.items():
+            interval = refresh_interval(config)
+            if interval:
+                self.intervals[name] = interval
+                self.hosts[name] = url_host(config.get('URL'))
+
+        self.store_result = store_result
+        self.on_store_refresh = on_store_refresh
+        self.rate_limits = dict(rate_limits)
+        self.default_rate_limit = default_rate_limit
+        self.rate_limiters = {}
+        self.jitter = jitter
+        self.folder = folder or time_series_store.folder
+
+        self.next_refresh = {}
+        self.status = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.lock_file = None
+
+    def __repr__(self):
+        return f'RefreshScheduler(series={len(self.intervals)}, running={self.is_running()})'
+
+    def status_path(self):
+        return os.path.join(self.folder, 'refresh_status.json')
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def jittered(self, interval):
+        return interval * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def rate_limiter(self, host):
+        if host not in self.rate_limiters:
+            self.rate_limiters[host] = RateLimiter(self.rate_limits.get(host, self.default_rate_limit))
+        return self.rate_limiters[host]
+
+    def acquire_leadership(self):
+        """Return True if this process holds the scheduler lock, so that only one gunicorn worker refreshes data."""
+        if fcntl is None:
+            return True
+        os.makedirs(self.folder, exist_ok=True)
+        self.lock_file = open(os.path.join(self.folder, 'refresh_scheduler.lock'), 'a')
+        try:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self.lock_file.close()
+            self.lock_file = None
+            return False
+
+    def start(self, flask_app):
+        """Start the scheduler thread in this process unless another process is running it. Return True if started."""
+        if self.is_running() or not self.intervals:
+            return self.is_running()
+        if not self.acquire_leadership():
+            flask_app.logger.info(f'{self.__class__.__name__}.start: scheduler is running in another process')
+            return False
+
+        # spread the first refreshes over the interval to avoid a burst at start up
+        now = time.time()
+        self.next_refresh = {name: now + random.uniform(0.0, interval) for name, interval in self.intervals.items()}
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, args=(flask_app,), name='RefreshScheduler', daemon=True)
+        self.thread.start()
+        flask_app.logger.info(f'{self.__class__.__name__}.start: scheduling {len(self.intervals)} series')
+        return True
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
+    def run(self, flask_app):
+        with flask_app.app_context():
+            while not self.stop_event.is_set():
+                due = self.due_names()
+                if due:
+                    self.refresh(due)
+                    self.write_status()
+                else:
+                    self.stop_event.wait(cfg.refresh_poll_interval_)
+
+    def due_names(self, now=None):
+        """Return the names that are due for a refresh and within their host's rate limit."""
+        now = time.time() if now is None else now
+        due = []
+        for name, next_refresh in sorted(self.next_refresh.items(), key=lambda item: item[1]):
+            if next_refresh > now:
+                break
+            if self.rate_limiter(self.hosts[name]).try_acquire():
+                due.append(name)
+        return due
+
+    def refresh_one(self, name):
+        """Get and parse the data for name and return the result dict."""
+        data_api = DataAPI(name)
+        if data_api.cache and data_api.is_time_series():
+            res = data_api.get_and_parse_stored_data(max_age=0.0)
+            if 'data' in res and self.on_store_refresh is not None:
+                self.on_store_refresh(name)
+            return res
+
+        res = data_api.get_and_parse_data()
+        if 'data' in res and self.store_result is not None:
+            self.store_result(name, res, self.intervals[name])
+        return res
+
+    def refresh_timed(self, name):
+        start = time.time()
+        res = self.refresh_one(name)
+        return res, start, time.time() - start
+
+    def refresh(self, names):
+        """Refresh a list of names concurrently in the fetch engine and update their status."""
+        calls = [(('refresh', name), self.hosts[name], functools.partial(self.refresh_timed, name)) for name in names]
+        results = fetch_engine.call_many(calls, timeout=cfg.refresh_timeout_)
+
+        now = time.time()
+        with self.lock:
+            for name, result in zip(names, results):
+                status = self.status.setdefault(name, dict(interval=self.intervals[name], refreshes=0, failures=0))
+                if isinstance(result, Exception):
+                    res, started_at, duration = dict(errors=str(result) or result.__class__.__name__), now, None
+                else:
+                    res, started_at, duration = result
+
+                status['last_refresh'] = started_at
+                status['duration'] = duration
+                if 'data' in res:
+                    status['refreshes'] += 1
+                    status['last_success'] = started_at
+                    status['errors'] = None
+                else:
+                    status['failures'] += 1
+                    status['errors'] = res.get('errors')
+
+                self.next_refresh[name] = now + self.jittered(self.intervals[name])
+                status['next_refresh'] = self.next_refresh[name]
+
+    def write_status(self):
+        """Write the status to a file in the store folder, so that every process can serve it."""
+        with self.lock:
+            status = json.dumps(self.status)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                f.write(status)
+            os.replace(tmp_path, self.status_path())
+        except OSError:
+            pass
+
+    def get_status(self):
+        """Return a dict of name to last refresh time, duration, next refresh time and errors."""
+        # the status is only in memory in the process that runs the scheduler
+        with self.lock:
+            if self.status:
+                return {name: dict(status) for name, status in self.status.items()}
+        try:
+            with open(self.status_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
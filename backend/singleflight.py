@@ -0,0 +1,58 @@
+import threading
+
+class SingleFlightCall(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    """De-duplicate concurrent calls with the same key.
+        The first caller runs the function and callers that arrive while it is running wait for it and share
+        its result, or its exception.
+    """
+    def __init__(self, name=''):
+        self.name = name
+        self.calls = {}
+        self.stats = dict(calls=0, shared=0)
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f'SingleFlight(\'{self.name}\', in_flight={len(self.calls)})'
+
+    def do(self, key, func):
+        """Return func(), or the result of the call with this key that is already in flight."""
+        with self.lock:
+            self.stats['calls'] += 1
+            call = self.calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = SingleFlightCall()
+                self.calls[key] = call
+            else:
+                call.waiters += 1
+                self.stats['shared'] += 1
+
+        if is_leader:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self.calls)
+        return stats
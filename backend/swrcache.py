@@ -0,0 +1,113 @@
+from concurrent import futures
+import functools
+import threading
+import time
+
+from flask import current_app, has_app_context, request
+
+from . import config as cfg
+from .singleflight import SingleFlight
+
+class StaleWhileRevalidateCache(object):
+    """Cache of function results with a soft and a hard timeout per use.
+        A value older than its soft timeout is still returned, and is refreshed in a background thread.
+        A value is removed once it is older than its hard timeout, and the next call then waits for the function.
+        Results with errors are not cached, so a failed refresh keeps serving the last good value.
+        Hits and misses are counted per key, and keys can be invalidated individually.
+        Values and their timestamps are stored together under the key, so invalidating a key in a shared cache
+        removes it for every process.
+    """
+    def __init__(self, cache, max_workers=cfg.swr_refresh_workers_):
+        self.cache = cache
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='StaleWhileRevalidate')
+        self.single_flight = SingleFlight('stale_while_revalidate')
+        self.refreshing = set()
+        self.stats = dict(hits=0, stale_hits=0, misses=0, refreshes=0, refresh_errors=0, invalidations=0)
+        self.key_stats = {}
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f'StaleWhileRevalidateCache({self.cache})'
+
+    @staticmethod
+    def is_cacheable(value):
+        return not (isinstance(value, dict) and 'errors' in value)
+
+    def count(self, stat, key=None):
+        with self.lock:
+            self.stats[stat] += 1
+            if key is not None:
+                key_stats = self.key_stats.setdefault(key, dict(hits=0, stale_hits=0, misses=0, refreshes=0, refresh_errors=0, invalidations=0))
+                key_stats[stat] += 1
+
+    def compute_and_set(self, key, func, hard_timeout):
+        value = func()
+        if self.is_cacheable(value):
+            self.cache.set(key, (value, time.time()), timeout=int(hard_timeout))
+        return value
+
+    def get(self, key, func, soft_timeout, hard_timeout):
+        """Return the cached value for key, calling func to compute it if it is missing.
+            A value older than soft_timeout seconds is returned and refreshed in the background.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            if time.time() - stored_at < soft_timeout:
+                self.count('hits', key)
+            else:
+                self.count('stale_hits', key)
+                self.revalidate(key, func, hard_timeout)
+            return value
+
+        self.count('misses', key)
+        return self.single_flight.do(key, lambda: self.compute_and_set(key, func, hard_timeout))
+
+    def revalidate(self, key, func, hard_timeout):
+        """Refresh the value for key in a background thread, unless it is already being refreshed."""
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        flask_app = current_app._get_current_object() if has_app_context() else None
+        def refresh():
+            try:
+                if flask_app is not None:
+                    with flask_app.app_context():
+                        value = self.compute_and_set(key, func, hard_timeout)
+                else:
+                    value = self.compute_and_set(key, func, hard_timeout)
+                self.count('refreshes' if self.is_cacheable(value) else 'refresh_errors', key)
+            except Exception:
+                self.count('refresh_errors', key)
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        self.executor.submit(refresh)
+
+    def cached(self, soft_timeout, hard_timeout, make_key=None):
+        """Decorator caching a function with stale-while-revalidate.
+            make_key returns the cache key from the function arguments, and defaults to the request path for views.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def inner(*args, **kwargs):
+                key = make_key(*args, **kwargs) if make_key else 'view' + request.path
+                return self.get(key, functools.partial(func, *args, **kwargs), soft_timeout, hard_timeout)
+            return inner
+        return decorator
+
+    def invalidate(self, key):
+        """Remove the cached value for key, so the next call in any process sharing the cache waits for a fresh value."""
+        self.cache.delete(key)
+        self.count('invalidations', key)
+
+    def get_stats(self, per_key=False):
+        """Return a dict of hit, miss and refresh counts, including counts by key if per_key is True."""
+        with self.lock:
+            stats = dict(self.stats)
+            if per_key:
+                stats['keys'] = {key: dict(key_stats) for key, key_stats in self.key_stats.items()}
+        return stats
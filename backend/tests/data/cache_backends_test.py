@@ -0,0 +1,179 @@
+from ...cachebackends import FileCache, RedisProtocolCache, deserialize, serialize
+
+import fnmatch
+import os
+import socketserver
+import threading
+import time
+import pytest
+
+
+def test_serialize_compresses_large_values():
+    small = dict(data=[1.0, 2.0])
+    large = dict(data=[1.0] * 10000)
+    assert serialize(small)[:1] == b'P'
+    assert serialize(large)[:1] == b'Z'
+    assert deserialize(serialize(small)) == small
+    assert deserialize(serialize(large)) == large
+
+
+def test_file_cache_is_shared_between_instances(tmp_path):
+    cache = FileCache(str(tmp_path))
+    other = FileCache(str(tmp_path))
+    assert cache.get('key') is None
+
+    assert cache.set('key', dict(data=[1, 2, 3]))
+    assert other.get('key') == dict(data=[1, 2, 3])
+    assert not other.add('key', 'other value')
+    assert other.has('key')
+
+    assert other.delete('key')
+    assert cache.get('key') is None
+    assert cache.add('key', None)
+    assert cache.has('key')
+
+
+def test_file_cache_expiry(tmp_path):
+    cache = FileCache(str(tmp_path))
+    cache.set('short', 1, timeout=0.1)
+    cache.set('forever', 2, timeout=0)
+    assert cache.get('short') == 1
+    time.sleep(0.15)
+    assert cache.get('short') is None
+    assert cache.get('forever') == 2
+    assert len(os.listdir(str(tmp_path))) == 1
+
+
+def test_file_cache_evicts_least_recently_used(tmp_path):
+    value = os.urandom(1000)
+    cache = FileCache(str(tmp_path), max_bytes=3500)
+    for key in ['a', 'b', 'c']:
+        cache.set(key, value)
+        time.sleep(0.02)
+
+    # reading a refreshes its modification time, so b is the least recently used
+    assert cache.get('a') == value
+    time.sleep(0.02)
+    cache.bytes_since_eviction = None
+    cache.set('d', value)
+    assert cache.get('b') is None
+    assert all(cache.get(key) == value for key in ['a', 'c', 'd'])
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    """Handle the subset of Redis commands used by RedisProtocolCache, with values in a shared dict."""
+    data = {}
+    config = {}
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, value):
+        if value is None:
+            self.wfile.write(b'$-1\r\n')
+        elif isinstance(value, int):
+            self.wfile.write(b':%d\r\n' % value)
+        elif isinstance(value, str):
+            self.wfile.write(b'+%s\r\n' % value.encode('UTF-8'))
+        elif isinstance(value, list):
+            self.wfile.write(b'*%d\r\n' % len(value))
+            for item in value:
+                self.reply(item)
+        else:
+            self.wfile.write(b'$%d\r\n%s\r\n' % (len(value), value))
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            self.data.pop(key, None)
+            return None
+        return value
+
+    def handle(self):
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            command = args[0].decode().upper()
+            if command == 'GET':
+                self.reply(self.get(args[1]))
+            elif command == 'SET':
+                options = [arg.decode().upper() for arg in args[3:]]
+                expires_at = time.time() + int(options[options.index('PX') + 1]) / 1000 if 'PX' in options else None
+                if 'NX' in options and self.get(args[1]) is not None:
+                    self.reply(None)
+                else:
+                    self.data[args[1]] = (args[2], expires_at)
+                    self.reply('OK')
+            elif command == 'DEL':
+                self.reply(sum(self.data.pop(key, None) is not None for key in args[1:]))
+            elif command == 'EXISTS':
+                self.reply(int(self.get(args[1]) is not None))
+            elif command == 'SCAN':
+                pattern = args[args.index(b'MATCH') + 1].decode()
+                self.reply([b'0', [key for key in list(self.data) if fnmatch.fnmatch(key.decode(), pattern)]])
+            elif command == 'CONFIG':
+                self.config[args[2]] = args[3]
+                self.reply('OK')
+            else:
+                self.wfile.write(b'-ERR unknown command\r\n')
+
+
+@pytest.fixture()
+def resp_server():
+    RespHandler.data = {}
+    RespHandler.config = {}
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), RespHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_redis_protocol_cache(resp_server):
+    cache = RedisProtocolCache(port=resp_server)
+    other = RedisProtocolCache(port=resp_server, key_prefix='other:')
+    # server settings are not changed by the client
+    assert RespHandler.config == {}
+
+    value = dict(data=[1.0] * 10000)
+    assert cache.set('key', value)
+    assert cache.get('key') == value
+    assert other.get('key') is None
+    assert not cache.add('key', 'other value')
+    assert cache.has('key')
+
+    other.set('key', 1)
+    assert cache.clear()
+    assert cache.get('key') is None
+    assert other.get('key') == 1
+
+    cache.set('short', 1, timeout=0.1)
+    time.sleep(0.15)
+    assert cache.get('short') is None
+    assert cache.delete('missing') is False
+
+
+def test_redis_protocol_cache_without_server():
+    cache = RedisProtocolCache(port=1)
+    assert cache.get('key') is None
+    assert not cache.set('key', 1)
+
+
+def test_cache_config(monkeypatch):
+    from ... import config as cfg
+    monkeypatch.delenv(cfg.CACHE_BACKEND, raising=False)
+    assert cfg.get_cache_config() == {'CACHE_TYPE': 'SimpleCache'}
+    monkeypatch.setenv(cfg.CACHE_BACKEND, 'redis')
+    assert 'CACHE_OPTIONS' not in cfg.get_cache_config()
+    monkeypatch.setenv(cfg.CACHE_BACKEND, 'file')
+    assert cfg.get_cache_config()['CACHE_TYPE'] == 'backend.cachebackends.FileCache'
@@ -0,0 +1,50 @@
+from ...data import DATA_CONFIG, CompositeGetter
+
+import time
+
+
+class SleepingCompositeGetter(CompositeGetter):
+    """Return each component's name as its data after sleeping for a given number of seconds."""
+    def __init__(self, name, sleep_seconds, errors=[], **kwargs):
+        super().__init__(name, list(sleep_seconds.keys()), **kwargs)
+        self.sleep_seconds = sleep_seconds
+        self.errors = errors
+
+    def get_component(self, name):
+        time.sleep(self.sleep_seconds[name])
+        if name in self.errors:
+            return dict(errors=f'{name} failed')
+        return dict(data=name)
+
+
+def composite_components():
+    name = 'Inflation Expectation Curve Data'
+    return name, DATA_CONFIG[name]['QueryParam1'].split('/')
+
+
+def test_composite_getter_is_concurrent(app):
+    with app.app_context():
+        name, components = composite_components()
+        getter = SleepingCompositeGetter(name, {c: 0.2 for c in components}, timeout=5.0)
+
+        start = time.time()
+        results = getter.get()
+        elapsed = time.time() - start
+
+        assert list(results.keys()) == components
+        assert getter.component_errors == {}
+        # latency is the max of the components, not the sum
+        assert elapsed < 0.2 * len(components) / 2
+
+
+def test_composite_getter_partial_results(app):
+    with app.app_context():
+        name, components = composite_components()
+        sleep_seconds = {c: 0.0 for c in components}
+        sleep_seconds[components[1]] = 1.0
+        getter = SleepingCompositeGetter(name, sleep_seconds, errors=[components[2]], timeout=0.5)
+
+        results = getter.get()
+        assert list(results.keys()) == [c for c in components if c not in components[1:3]]
+        assert set(getter.component_errors.keys()) == set(components[1:3])
+        assert 'timed out' in getter.component_errors[components[1]]
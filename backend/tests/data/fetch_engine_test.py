@@ -0,0 +1,70 @@
+from ...fetchengine import FetchEngine
+
+import asyncio
+import threading
+import time
+
+
+class Counter(object):
+    """Count calls and the maximum number of calls running at the same time."""
+    def __init__(self, sleep_seconds):
+        self.sleep_seconds = sleep_seconds
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.sleep_seconds)
+        with self.lock:
+            self.running -= 1
+        return self.calls
+
+
+def test_coalesced_calls():
+    engine = FetchEngine(max_workers=8)
+    counter = Counter(0.1)
+    results = engine.call_many([('series', 'example.com', counter)] * 10)
+    assert counter.calls == 1
+    assert results == [1] * 10
+    assert engine.get_stats()['coalesced'] == 9
+
+
+def test_host_limits():
+    engine = FetchEngine(max_workers=16, host_limits={'slow.com': 2}, default_host_limit=8)
+    slow, fast = Counter(0.05), Counter(0.05)
+    calls = [(None, 'slow.com', slow)] * 6 + [(None, 'fast.com', fast)] * 6
+    engine.call_many(calls)
+    assert slow.calls == 6 and fast.calls == 6
+    assert slow.max_running <= 2
+    assert fast.max_running > 2
+
+
+def test_timeouts_and_errors():
+    engine = FetchEngine(max_workers=4)
+    def fail():
+        raise ValueError('bad data')
+    results = engine.call_many([(None, 'a.com', Counter(0.5)), (None, 'a.com', fail), (None, 'a.com', lambda: 'ok')], timeout=0.2)
+    assert isinstance(results[0], asyncio.TimeoutError)
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 'ok'
+
+
+def test_nested_calls_are_concurrent_with_timeouts():
+    engine = FetchEngine(max_workers=2)
+    counter = Counter(0.1)
+
+    def composite():
+        # fan out from inside an engine worker, as a composite refreshed by the scheduler does
+        return engine.call_many([(None, 'a.com', counter)] + [(None, 'b.com', Counter(1.0))], timeout=0.3)
+
+    # the parents fill the top level pool while they wait on their components
+    start = time.time()
+    results = engine.call_many([(None, 'composite', composite)] * 2)
+    assert time.time() - start < 0.9
+    assert counter.calls == 2
+    assert all([res[0] in (1, 2) and isinstance(res[1], asyncio.TimeoutError) for res in results])
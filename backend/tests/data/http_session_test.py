@@ -0,0 +1,78 @@
+from ...httpsession import HttpSessionManager
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import pytest
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    failures = {}
+
+    def do_GET(self):
+        # fail the first requests to /flaky with 503
+        if self.path == '/flaky' and Handler.failures.get(self.path, 0) < 2:
+            Handler.failures[self.path] = Handler.failures.get(self.path, 0) + 1
+            status, body = 503, b'unavailable'
+        else:
+            status, body = 200, b'DATE,VALUE\n2023-01-01,1.0\n'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connections_are_reused(server):
+    session = HttpSessionManager(backoff_factor=0.0)
+    for _ in range(5):
+        response = session.get(server + '/data')
+        assert response.status_code == 200
+        assert response.text.startswith('DATE')
+
+    stats = session.get_stats()[server + '/']
+    assert stats['requests'] == 5
+    assert stats['errors'] == 0
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 4
+
+
+def test_retries(server):
+    Handler.failures.clear()
+    session = HttpSessionManager(backoff_factor=0.0, retries=3)
+    response = session.get(server + '/flaky')
+    assert response.status_code == 200
+
+    stats = session.get_stats()[server + '/']
+    assert stats['requests'] == 1
+    assert stats['retries'] == 2
+
+
+def test_connection_errors_fail_fast():
+    import requests
+    import socket
+    import time
+    # a port with nothing listening on it
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    url = f'http://127.0.0.1:{sock.getsockname()[1]}/data'
+    sock.close()
+
+    session = HttpSessionManager(backoff_factor=1.0, retries=3)
+    start = time.time()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(url)
+    assert time.time() - start < 1.0
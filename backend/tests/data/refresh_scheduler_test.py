@@ -0,0 +1,79 @@
+from ...data import DATA_CONFIG
+from ...refreshscheduler import RateLimiter, RefreshScheduler, refresh_interval
+
+import time
+
+
+class FakeRefreshScheduler(RefreshScheduler):
+    """Refresh without making requests, failing for names in errors."""
+    def __init__(self, errors=[], **kwargs):
+        super().__init__(**kwargs)
+        self.errors = errors
+        self.refreshed = []
+
+    def refresh_one(self, name):
+        self.refreshed.append(name)
+        if name in self.errors:
+            return dict(errors=f'{name} failed')
+        res = dict(data=[1.0])
+        self.store_result(name, res, self.intervals[name])
+        return res
+
+
+def test_refresh_intervals():
+    assert refresh_interval(DATA_CONFIG['US CPI NSA']) == 3600.0
+    assert refresh_interval(dict(RefreshInterval='')) is None
+    assert refresh_interval(dict()) is None
+
+    scheduler = RefreshScheduler()
+    assert scheduler.intervals['US CPI NSA'] == 3600.0
+    assert scheduler.hosts['US CPI NSA'] == 'fred.stlouisfed.org'
+    assert all(refresh_interval(DATA_CONFIG[name]) for name in scheduler.intervals)
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(2.0)
+    assert [limiter.try_acquire() for _ in range(3)] == [True, True, False]
+    time.sleep(0.6)
+    assert limiter.try_acquire()
+
+
+def test_refresh_and_status(app, tmp_path):
+    with app.app_context():
+        data_config = {
+            'A': dict(URL='https://a.com/x', RefreshInterval='60'),
+            'B': dict(URL='https://a.com/y', RefreshInterval='60'),
+            'C': dict(URL='https://b.com/z', RefreshInterval='120'),
+            'D': dict(URL='https://b.com/z', RefreshInterval='')
+        }
+        stored = {}
+        scheduler = FakeRefreshScheduler(
+            errors=['C'],
+            data_config=data_config,
+            store_result=lambda name, res, interval: stored.update({name: (res, interval)}),
+            rate_limits={'a.com': 1.0},
+            default_rate_limit=5.0,
+            folder=str(tmp_path)
+        )
+        assert sorted(scheduler.intervals) == ['A', 'B', 'C']
+
+        now = time.time()
+        scheduler.next_refresh = {'A': now - 2.0, 'B': now - 1.0, 'C': now - 1.0}
+        # a.com allows one request, so B waits for the next check
+        due = scheduler.due_names(now)
+        assert due == ['A', 'C']
+
+        scheduler.refresh(due)
+        assert sorted(scheduler.refreshed) == ['A', 'C']
+        assert stored == {'A': (dict(data=[1.0]), 60.0)}
+
+        status = scheduler.get_status()
+        assert status['A']['refreshes'] == 1 and status['A']['errors'] is None
+        assert status['C']['failures'] == 1 and status['C']['errors'] == 'C failed'
+        assert status['A']['duration'] >= 0.0
+        assert 54.0 <= scheduler.next_refresh['A'] - now <= 66.0 + 1.0
+
+        # other processes read the status from the store folder
+        scheduler.write_status()
+        other = RefreshScheduler(data_config=data_config, folder=str(tmp_path))
+        assert other.get_status()['C']['errors'] == 'C failed'
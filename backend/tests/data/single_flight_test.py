@@ -0,0 +1,43 @@
+from ...singleflight import SingleFlight
+
+from concurrent import futures
+import threading
+import time
+import pytest
+
+
+def test_concurrent_calls_share_result():
+    single_flight = SingleFlight('test')
+    calls = []
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return dict(data=[1.0, 2.0])
+
+    with futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: single_flight.do('US CPI NSA', fetch), range(8)))
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert single_flight.get_stats() == dict(calls=8, shared=7, in_flight=0)
+
+    # later calls run again
+    single_flight.do('US CPI NSA', fetch)
+    assert len(calls) == 2
+
+
+def test_errors_are_shared():
+    single_flight = SingleFlight('test')
+    started = threading.Event()
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError('upstream failed')
+
+    with futures.ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, 'key', fail)
+        started.wait()
+        follower = executor.submit(single_flight.do, 'key', fail)
+        for f in [leader, follower]:
+            with pytest.raises(RuntimeError):
+                f.result()
@@ -0,0 +1,117 @@
+from ...swrcache import StaleWhileRevalidateCache
+
+from flask_caching.backends import SimpleCache
+import threading
+import time
+
+
+class Source(object):
+    """Return an increasing version number on each call, or errors once failing is set."""
+    def __init__(self, sleep_seconds=0.0):
+        self.sleep_seconds = sleep_seconds
+        self.version = 0
+        self.failing = False
+        self.refreshed = threading.Event()
+
+    def __call__(self):
+        time.sleep(self.sleep_seconds)
+        if self.failing:
+            self.refreshed.set()
+            return dict(errors='upstream failed')
+        self.version += 1
+        self.refreshed.set()
+        return dict(data=self.version)
+
+
+def test_stale_value_is_served_and_refreshed(app):
+    with app.app_context():
+        swr_cache = StaleWhileRevalidateCache(SimpleCache())
+        source = Source(sleep_seconds=0.1)
+
+        assert swr_cache.get('key', source, 0.2, 60.0) == dict(data=1)
+        assert swr_cache.get('key', source, 0.2, 60.0) == dict(data=1)
+        time.sleep(0.25)
+
+        # the stale value is returned immediately and refreshed in the background
+        source.refreshed.clear()
+        start = time.time()
+        assert swr_cache.get('key', source, 0.2, 60.0) == dict(data=1)
+        assert time.time() - start < 0.1
+        assert source.refreshed.wait(2.0)
+        time.sleep(0.05)
+        assert swr_cache.get('key', source, 0.2, 60.0) == dict(data=2)
+        assert swr_cache.get_stats() == dict(hits=2, stale_hits=1, misses=1, refreshes=1, refresh_errors=0, invalidations=0)
+
+
+def test_errors_are_not_cached(app):
+    with app.app_context():
+        swr_cache = StaleWhileRevalidateCache(SimpleCache())
+        source = Source()
+        assert swr_cache.get('key', source, 0.0, 60.0) == dict(data=1)
+
+        # a failed refresh keeps the last good value
+        source.failing = True
+        source.refreshed.clear()
+        assert swr_cache.get('key', source, 0.0, 60.0) == dict(data=1)
+        assert source.refreshed.wait(2.0)
+        time.sleep(0.05)
+        assert swr_cache.get('key', source, 60.0, 60.0) == dict(data=1)
+        assert swr_cache.get_stats()['refresh_errors'] == 1
+
+        # errors are returned but not cached on a miss
+        assert swr_cache.get('other', source, 0.0, 60.0) == dict(errors='upstream failed')
+        source.failing = False
+        assert swr_cache.get('other', source, 0.0, 60.0) == dict(data=2)
+
+
+def test_per_key_stats_and_invalidation(app):
+    with app.app_context():
+        swr_cache = StaleWhileRevalidateCache(SimpleCache())
+        source = Source()
+        swr_cache.get('data/US CPI NSA/a', source, 60.0, 60.0)
+        swr_cache.get('data/US CPI NSA/a', source, 60.0, 60.0)
+        swr_cache.get('data/US CPI SA/b', source, 60.0, 60.0)
+
+        stats = swr_cache.get_stats(per_key=True)
+        assert stats['keys']['data/US CPI NSA/a']['hits'] == 1
+        assert stats['keys']['data/US CPI NSA/a']['misses'] == 1
+        assert stats['keys']['data/US CPI SA/b']['misses'] == 1
+
+        swr_cache.invalidate('data/US CPI NSA/a')
+        assert swr_cache.get_stats(per_key=True)['keys']['data/US CPI NSA/a']['invalidations'] == 1
+        assert swr_cache.get('data/US CPI NSA/a', source, 60.0, 60.0) == dict(data=3)
+        assert swr_cache.get('data/US CPI SA/b', source, 60.0, 60.0) == dict(data=2)
+
+
+def test_data_cache_keys(app):
+    from ...data import DataAPI
+    with app.app_context():
+        d = DataAPI('US CPI NSA')
+        assert d.cache_key().startswith('data/US CPI NSA/')
+        assert d.cache_key() == DataAPI('US CPI NSA').cache_key()
+        assert d.cache_key() != DataAPI('US CPI SA').cache_key()
+        assert DataAPI('Inflation Expectation Curve Data').cache_key().startswith('data/Inflation Expectation Curve Data/')
+
+
+def test_invalidation_is_shared_between_processes(app, tmp_path):
+    from ...cachebackends import FileCache
+    with app.app_context():
+        # two workers sharing a file cache, where only one has seen the key
+        swr_cache = StaleWhileRevalidateCache(FileCache(str(tmp_path)))
+        other = StaleWhileRevalidateCache(FileCache(str(tmp_path)))
+        source = Source()
+        assert swr_cache.get('data/US CPI NSA/a', source, 60.0, 60.0) == dict(data=1)
+
+        other.invalidate('data/US CPI NSA/a')
+        assert swr_cache.get('data/US CPI NSA/a', source, 60.0, 60.0) == dict(data=2)
+
+
+def test_invalidate_data_route(client):
+    import app as app_module
+    from ...data import DataAPI
+    key = DataAPI('US CPI NSA').cache_key()
+    app_module.cache.set(key, (dict(data='stale'), time.time()))
+
+    response = client.post('/invalidate_data/US CPI NSA')
+    assert response.json == dict(invalidated=[key])
+    assert app_module.cache.get(key) is None
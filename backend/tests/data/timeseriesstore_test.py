@@ -0,0 +1,130 @@
+from ...data import DATA_CONFIG, DataAPI, DataGetter
+from ...timeseriesstore import TimeSeriesStore
+
+import requests
+import pytest
+
+
+class CsvResponseGetter(DataGetter):
+    """Return a fixed CSV response and count the number of requests."""
+    def __init__(self, name, content):
+        super().__init__(name)
+        self.content = content
+        self.requests = 0
+        self.queries = []
+
+    def get_with_query(self, query):
+        self.queries.append(query)
+        return self.get()
+
+    def get(self):
+        self.requests += 1
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'text/csv'
+        response._content = self.content
+        response._content_consumed = True
+        return response
+
+
+def test_time_series_store_round_trip(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    name = 'US CPI NSA'
+    assert store.get(name) is None
+
+    store.set(name, ['2023-01-01', '2023-02-01'], [299.17, 300.84], fetched_at=1000.0)
+    dates, values, fetched_at, full_fetched_at = store.get(name)
+    assert dates == ['2023-01-01', '2023-02-01']
+    assert values == [299.17, 300.84]
+    assert fetched_at == 1000.0
+    assert full_fetched_at == 1000.0
+
+    # a second store on the same folder sees the same series
+    assert TimeSeriesStore(str(tmp_path)).get(name)[0] == dates
+
+    store.delete(name)
+    assert not store.contains(name)
+
+
+def test_get_and_parse_stored_data(app, tmp_path):
+    with app.app_context():
+        store = TimeSeriesStore(str(tmp_path))
+        name = 'US CPI NSA'
+        d = DataAPI(name)
+        getter = CsvResponseGetter(name, b'DATE,CPIAUCNS\n2023-01-01,299.170\n2023-02-01,300.840\n')
+        d.data_getter = getter
+
+        res = d.get_and_parse_stored_data(store=store)
+        assert res['data'] == {'Date': ['2023-01-01', '2023-02-01'], name: [299.17, 300.84]}
+        assert getter.requests == 1
+
+        # served from the store while it is fresh
+        assert d.get_and_parse_stored_data(store=store) == res
+        assert getter.requests == 1
+
+        # stale series are fetched again
+        assert d.get_and_parse_stored_data(store=store, max_age=0.0, incremental=False) == res
+        assert getter.requests == 2
+        assert getter.queries == []
+
+
+def test_incremental_stored_data(app, tmp_path):
+    with app.app_context():
+        store = TimeSeriesStore(str(tmp_path))
+        name = 'US CPI NSA'
+        store.set(name, ['2023-01-01', '2023-02-01'], [299.17, 300.0], fetched_at=1000.0)
+
+        d = DataAPI(name)
+        getter = CsvResponseGetter(name, b'DATE,CPIAUCNS\n2023-02-01,300.840\n2023-03-01,301.836\n')
+        d.data_getter = getter
+
+        # only observations from the last stored date are requested, and the latest stored value is revised
+        res = d.get_and_parse_stored_data(store=store, full_refresh_age=float('inf'))
+        assert getter.queries == ['cosd=2023-02-01']
+        assert res['data'] == {'Date': ['2023-01-01', '2023-02-01', '2023-03-01'], name: [299.17, 300.84, 301.836]}
+
+        dates, values, fetched_at, full_fetched_at = store.get(name)
+        assert dates == res['data']['Date']
+        assert fetched_at > full_fetched_at == 1000.0
+
+        # full history is requested once it is older than full_refresh_age
+        d.get_and_parse_stored_data(store=store, max_age=0.0, full_refresh_age=0.0)
+        assert getter.queries == ['cosd=2023-02-01']
+        assert getter.requests == 2
+
+
+def test_incremental_query(app):
+    with app.app_context():
+        assert DataAPI('US CPI NSA').incremental_query('2023-02-01') == 'cosd=2023-02-01'
+        statcan_names = [k for k, v in DATA_CONFIG.items() if v['Parser'] == 'TimeSeriesStatCanXmlParser']
+        assert DataAPI(statcan_names[0]).incremental_query('2023-02-01') == 'startPeriod=2023-02'
+        sp_names = [k for k, v in DATA_CONFIG.items() if v['Parser'] == 'TimeSeriesSPIndexJsonParser']
+        assert DataAPI(sp_names[0]).incremental_query('2023-02-01') is None
+
+
+def test_concurrent_stored_data_requests(app, tmp_path):
+    from concurrent import futures
+    import time
+
+    class SlowCsvResponseGetter(CsvResponseGetter):
+        def get(self):
+            time.sleep(0.1)
+            return super().get()
+
+    with app.app_context():
+        store = TimeSeriesStore(str(tmp_path))
+        name = 'US CPI NSA'
+        getter = SlowCsvResponseGetter(name, b'DATE,CPIAUCNS\n2023-01-01,299.170\n')
+
+        def get_stored(_):
+            with app.app_context():
+                d = DataAPI(name)
+                d.data_getter = getter
+                return d.get_and_parse_stored_data(store=store)
+
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(get_stored, range(4)))
+
+        # only one request refreshes the store, the others read it
+        assert getter.requests == 1
+        assert all(r == results[0] for r in results)
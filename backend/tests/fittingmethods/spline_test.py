@@ -0,0 +1,46 @@
+from ...fittingmethods.spline import PiecewiseConstantLeftCts, PiecewiseConstantRightCts, PiecewiseLinear, CubicSpline
+from ...curveconstruction import domains
+
+import numpy as np
+import pytest
+
+NODE_XS = [0.5, 1.0, 2.0, 5.0, 10.0, 30.0]
+NODE_YS = [0.02, 0.025, 0.03, 0.028, 0.033, 0.031]
+TEST_XS = [0.0, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0, 5.0, 7.5, 10.0, 29.0, 30.0, 35.0]
+
+@pytest.fixture(params=[PiecewiseConstantLeftCts, PiecewiseConstantRightCts, PiecewiseLinear, CubicSpline])
+def spline(request):
+    s = request.param(domains.TIME_ACT_365, domains.ZERO_RATE)
+    s.fit(NODE_XS, NODE_YS)
+    return s
+
+# TESTS
+def test_array_matches_scalar(spline):
+    xs = np.array(TEST_XS)
+    predicted = spline.predict(xs)
+    slopes = spline.dydx(xs)
+    jac = spline.grad(xs)
+
+    assert predicted.shape == xs.shape
+    assert slopes.shape == xs.shape
+    assert jac.shape == (len(TEST_XS), len(NODE_XS))
+    for k, x in enumerate(TEST_XS):
+        assert isinstance(spline.predict(x), float)
+        assert predicted[k] == pytest.approx(spline.predict(x), abs=1E-15)
+        assert slopes[k] == pytest.approx(spline.dydx(x), abs=1E-15)
+        assert jac[k] == pytest.approx(spline.grad(x), abs=1E-15)
+
+def test_grad_matches_bumped_nodes(spline):
+    xs = np.array(TEST_XS)
+    jac = spline.grad(xs)
+    bump = 1E-6
+    for i in range(len(NODE_YS)):
+        bumped = list(NODE_YS)
+        bumped[i] += bump
+        bumped_spline = spline.__class__(domains.TIME_ACT_365, domains.ZERO_RATE)
+        bumped_spline.fit(NODE_XS, bumped)
+        fd = (bumped_spline.predict(xs) - spline.predict(xs)) / bump
+        assert jac[:, i] == pytest.approx(fd, abs=1E-6)
+
+def test_node_values_are_recovered(spline):
+    assert spline.predict(np.array(NODE_XS)) == pytest.approx(NODE_YS, abs=1E-15)
@@ -186,6 +186,32 @@ def test_trust_constr_calibration(app, default_build_params):
     with app.app_context():
         bond_model = ModelFactory.build(build_params)
 
+@run_with_profiler
+def test_least_squares_trf_calibration(app, default_build_params):
+    build_params = default_build_params
+    build_params['opt_method'] = 'least_squares-trf'
+
+    with app.app_context():
+        bond_model = ModelFactory.build(build_params)
+
+@run_with_profiler
+def test_least_squares_lm_calibration(app, default_build_params):
+    build_params = default_build_params
+    build_params['opt_method'] = 'least_squares-lm'
+
+    with app.app_context():
+        bond_model = ModelFactory.build(build_params)
+
+@pytest.mark.parametrize('fitting_method_str', ['PiecewiseLinear', 'PiecewiseConstantLeftCts', 'PiecewiseConstantRightCts', 'CubicSpline'])
+def test_bootstrap_calibration(app, default_build_params, fitting_method_str):
+    build_params = default_build_params
+    build_params['opt_method'] = 'bootstrap'
+    build_params['fitting_method_str'] = fitting_method_str
+
+    with app.app_context():
+        bond_model = ModelFactory.build(build_params)
+        assert bond_model.calibration_objective(bond_model.training_values) < build_params['calibration_tolerance']
+
 @run_with_profiler
 def test_standard_nominal_calibration(app, default_build_params):
     # volatile test: quotes can change on each test run
@@ -233,3 +259,100 @@ def test_performance_cubic(app, default_build_params_cubic, opt_method='BFGS'):
 
     with app.app_context():
         bond_model = ModelFactory.build(build_params)
+
+
+def test_get_all_results_matches_scalar_functions(app, default_build_params):
+    build_params = default_build_params
+
+    with app.app_context():
+        bond_model = ModelFactory.build(build_params)
+        results = bond_model.get_all_results()
+
+        scalar_funcs = {
+            'df': bond_model.df,
+            'time_weighted_zero_rate': bond_model.time_weighted_zero_rate,
+            'zero_rate': bond_model.zero_rate,
+            'instantaneous_forward_rate': bond_model.instantaneous_forward_rate
+        }
+        dates = bond_model.get_curve_result_dates()
+        for key, func in scalar_funcs.items():
+            assert len(results[key]) == len(dates)
+            for (date_str, value), d in zip(results[key], dates):
+                assert date_str == str(d)
+                assert isinstance(value, float)
+                assert abs(value - func(d)) < 1E-12
+
+
+@pytest.mark.parametrize('fitting_method_str', ['PiecewiseLinear', 'CubicSpline', 'PiecewiseConstantLeftCts'])
+@pytest.mark.parametrize('domainY', [domains.TIME_WEIGHTED_ZERO_RATE, domains.ZERO_RATE])
+def test_calibration_gradient_matches_finite_differences(app, default_build_params, fitting_method_str, domainY):
+    import numpy as np
+    build_params = default_build_params
+    build_params['fitting_method_str'] = fitting_method_str
+    build_params['domainY'] = domainY
+
+    with app.app_context():
+        bond_model = ModelFactory.build(build_params)
+        x = 1.05 * np.array(bond_model.initial_training_data_guess())
+        _, grad = bond_model.calibration_objective_and_gradient(x)
+        hessian = bond_model.calibration_hessian(x)
+
+        h = 1E-6
+        bumps = h * np.eye(x.size)
+        grad_fd = np.array([(bond_model.calibration_objective(x + e) - bond_model.calibration_objective(x - e)) / (2 * h) for e in bumps])
+        hessian_fd = np.array([(bond_model.calibration_objective_and_gradient(x + e)[1] - bond_model.calibration_objective_and_gradient(x - e)[1]) / (2 * h) for e in bumps])
+
+        assert np.max(np.abs(grad - grad_fd)) < 1E-6 * np.max(np.abs(grad))
+        assert np.max(np.abs(hessian - hessian_fd)) < 1E-6 * np.max(np.abs(hessian))
+
+
+def test_pricing_kernel_matches_pv_bond(app, default_build_params):
+    build_params = default_build_params
+
+    with app.app_context():
+        bond_model = ModelFactory.build(build_params)
+        kernel = bond_model.pricing_kernel
+        kernel_pvs = kernel.pvs(bond_model.df_at_times(kernel.times))
+
+        assert kernel.amounts.shape == (len(bond_model.bond_data_points), kernel.times.size)
+        for p, kernel_pv in zip(bond_model.bond_data_points, kernel_pvs):
+            assert abs(kernel_pv - bond_model.pv_bond(p.bond)) < 1E-10
+
+
+def test_warm_start_calibration(app, default_build_params, otr_nominal_bonds, otr_nominal_yields, test_base_date):
+    from ...models.warmstart import calibration_warm_starts
+    calibration_warm_starts.clear()
+    build_params = default_build_params
+    build_params['opt_method'] = 'BFGS'
+    build_params['handle'] = 'WarmStartTestModel'
+
+    with app.app_context():
+        cold_model = ModelFactory.build(build_params)
+
+        # rebuild with quotes moved by 0.5bp
+        build_params['model_data'] = [BondYieldDataPoint(y + 0.00005, b, test_base_date).serialize() for b, y in zip(otr_nominal_bonds, otr_nominal_yields)]
+        warm_model = ModelFactory.build(build_params)
+
+    stats = calibration_warm_starts.get_stats()
+    assert stats['cold_starts'] == 1
+    assert stats['warm_starts'] == 1
+    assert stats['iterations_saved'] > 0
+    assert stats['size'] == 1
+    assert warm_model.training_data != cold_model.training_data
+
+
+def test_snapshot_round_trip(app, default_build_params_cubic):
+    import pickle
+    build_params = default_build_params_cubic
+    build_params['opt_method'] = 'BFGS'
+
+    with app.app_context():
+        bond_model = ModelFactory.build(build_params)
+        data = pickle.dumps(bond_model.snapshot())
+        assert len(data) < 4096
+
+        restored_model = pickle.loads(data).model
+        assert restored_model.training_data == bond_model.training_data
+        assert restored_model.get_all_results() == bond_model.get_all_results()
+        for p in bond_model.bond_data_points:
+            assert abs(restored_model.pv_bond(p.bond) - bond_model.pv_bond(p.bond)) < 1E-12
@@ -26,3 +26,51 @@ def test_historical_calibration(app):
 
         seasonality_model = ModelFactory.build(build_params)
         print(seasonality_model.__dict__)
+
+
+def test_cpi_model_snapshot_with_seasonality(app):
+    import pickle
+    from ...curveconstruction.curvedata import AdditiveSeasonalityDataPoint
+    from ...models.cpi import CpiModel
+    from ...buildsettings.buildsettings import BuildSettingsCPICurve
+
+    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    seasonals = [0.01, 0.02, 0.01, 0.0, -0.01, -0.02, -0.01, 0.0, 0.005, -0.005, 0.0, 0.0]
+    seasonality_data = [AdditiveSeasonalityDataPoint(v, m).serialize() for v, m in zip(seasonals, months)]
+    cpi_data = [CpiLevelDataPoint(v, d).serialize() for v, d in [(296.0, '2022-10-01'), (300.0, '2023-10-01'), (308.0, '2024-10-01')]]
+
+    with app.app_context():
+        seasonality_model = ModelFactory.build({
+            'model_type': 'AdditiveSeasonality',
+            'base_date': '2022-10-01',
+            'model_data': seasonality_data,
+            'domainX': domains.MONTH,
+            'domainY': domains.ADDITIVE_SEASONALITY
+        })
+        build_settings = BuildSettingsCPICurve(domains.TIME_ACT_365, domains.TIME_WEIGHTED_ZERO_RATE, 'PiecewiseLinear')
+        cpi_model = CpiModel('2022-10-01', cpi_data, build_settings, reference_models=[seasonality_model])
+
+        restored_model = pickle.loads(pickle.dumps(cpi_model.snapshot())).model
+        assert restored_model.t0_cpi == cpi_model.t0_cpi
+        assert restored_model.seasonality_model.seasonals_map == seasonality_model.seasonals_map
+        assert restored_model.get_all_results() == cpi_model.get_all_results()
+
+
+def test_build_model_route_results_options(client):
+    import json
+    from ...utilities.dategrid import result_date_grid
+
+    cpi_data = [CpiLevelDataPoint(v, d).serialize() for v, d in [(296.0, '2022-10-01'), (300.0, '2023-10-01'), (308.0, '2024-10-01')]]
+    form = {
+        'model_type': 'CPI',
+        'base_date': '2022-10-01',
+        'model_data': json.dumps(cpi_data, default=str),
+        'domainX': domains.TIME_ACT_365,
+        'domainY': domains.TIME_WEIGHTED_ZERO_RATE,
+        'fitting_method_str': 'PiecewiseLinear',
+        'results_options': json.dumps({'grid': 'thumbnail'})
+    }
+    response = client.post('/build_model', data=form).get_json()
+    assert 'errors' not in response
+    grid = result_date_grid('2022-10-01', 'thumbnail')
+    assert [d for d, _ in response['results']['cpi']] == grid.date_strs()
@@ -0,0 +1,72 @@
+from ...products.bonds import Bond
+from ...products.bondanalytics import BondAnalytics
+
+import json
+import pytest
+
+# FIXTURES
+
+@pytest.fixture()
+def test_base_date():
+    return '2022-10-10'
+
+@pytest.fixture()
+def bond_specs():
+    return [
+        {'Convention': 'USTBill', 'notional': 100, 'maturity_date': '2023-01-05', 'clean_price': 99.2},
+        {'Convention': 'USTBill', 'notional': 100, 'maturity_date': '2023-10-05', 'clean_price': 96.0},
+        {'Convention': 'USTBond', 'notional': 100, 'rate': 0.04250, 'maturity_date': '2024-09-30', 'tenor': '2Y', 'ytm': 0.04312},
+        {'Convention': 'USTBond', 'notional': 100, 'rate': 0.04125, 'maturity_date': '2027-09-30', 'tenor': '5Y', 'clean_price': 99.9},
+        {'Convention': 'USTBond', 'notional': 100, 'rate': 0.02750, 'maturity_date': '2032-08-15', 'tenor': '10Y', 'clean_price': 91.0},
+        {'Convention': 'USTBond', 'notional': 100, 'rate': 0.03000, 'maturity_date': '2052-08-15', 'tenor': '30Y', 'ytm': 0.03848}
+    ]
+
+# TESTS
+
+def test_batch_analytics_match_bond_measures(bond_specs, test_base_date):
+    results = BondAnalytics.from_specs(bond_specs, test_base_date)
+    assert len(results) == len(bond_specs)
+
+    for spec, res in zip(bond_specs, results):
+        spec = dict(spec)
+        ytm = spec.pop('ytm', None)
+        clean_price = spec.pop('clean_price', None)
+        bond = Bond.create_bond(**spec)
+        projected_cashflows = bond.get_projected_cashflows(test_base_date)
+        if ytm is None:
+            ytm = projected_cashflows.pv_to_yield(bond.clean_price_to_market_value(clean_price, test_base_date))
+            assert res['clean_price'] == pytest.approx(clean_price, abs=1E-10)
+
+        assert res['ytm'] == pytest.approx(ytm, abs=1E-12)
+        assert res['clean_price'] == pytest.approx(bond.yield_to_clean_price(ytm, test_base_date), abs=1E-10)
+        assert res['yield_dv01'] == pytest.approx(projected_cashflows.yield_dv01(ytm), rel=1E-10)
+        assert res['modified_duration'] == pytest.approx(projected_cashflows.modified_duration(ytm), rel=1E-10)
+        assert res['macauley_duration'] == pytest.approx(projected_cashflows.macauley_duration(ytm), rel=1E-10)
+        assert res['convexity'] == pytest.approx(projected_cashflows.convexity(ytm), rel=1E-10)
+
+def test_batch_analytics_reports_bad_specs(bond_specs, test_base_date):
+    bad_specs = [
+        {'Convention': 'USTBond', 'notional': 100, 'rate': 0.01, 'maturity_date': '2020-01-15', 'tenor': '2Y', 'ytm': 0.01},
+        {'Convention': 'USTBill', 'notional': 100, 'maturity_date': '2023-01-05'}
+    ]
+    results = BondAnalytics.from_specs(bond_specs + bad_specs, test_base_date)
+    assert all(['errors' not in res for res in results[:len(bond_specs)]])
+    assert all(['errors' in res for res in results[len(bond_specs):]])
+
+def test_batch_analytics_reports_unsolvable_prices(bond_specs, test_base_date):
+    bad_spec = {'Convention': 'USTBond', 'notional': 100, 'rate': 0.02750, 'maturity_date': '2032-08-15', 'tenor': '10Y', 'clean_price': -50.0}
+    results = BondAnalytics.from_specs(bond_specs + [bad_spec], test_base_date)
+    assert all(['errors' not in res for res in results[:len(bond_specs)]])
+    assert 'errors' in results[-1]
+    assert results[3]['clean_price'] == pytest.approx(99.9, abs=1E-10)
+
+def test_batch_analytics_default_base_date(bond_specs):
+    from ...utils import Date
+    analytics = BondAnalytics([Bond.create_bond(**{k: v for k, v in bond_specs[5].items() if k != 'ytm'})])
+    assert analytics.base_date == Date.today()
+
+def test_bond_analytics_route(client, bond_specs, test_base_date):
+    response = client.post('/bond_analytics', data={'bonds': json.dumps(bond_specs), 'base_date': test_base_date})
+    analytics = response.get_json()['analytics']
+    assert len(analytics) == len(bond_specs)
+    assert analytics[2]['ytm'] == pytest.approx(0.04312, abs=1E-12)
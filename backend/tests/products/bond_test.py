@@ -1,5 +1,6 @@
 
 from ...products.bonds import Bond
+from ...products.projectedcashflows import USStreetYieldCalculator, TrueYieldCalculator
 from ...tips_data import cusip_to_us_isin
 
 import pytest
@@ -38,3 +39,17 @@ bond_ids = [
 @pytest.mark.parametrize('cusip,isin', bond_ids, ids=[b[0] for b in bond_ids])
 def test_cusip_to_isin(cusip, isin):
     assert cusip_to_us_isin(cusip) == isin
+
+@pytest.mark.parametrize('calculator', [
+    USStreetYieldCalculator([2.0] * 9 + [102.0], 2, 0.3),
+    TrueYieldCalculator([2.0] * 9 + [102.0], [0.5 * i + 0.2 for i in range(10)])
+], ids=['USStreet', 'TrueYield'])
+def test_yield_calculator_value_and_derivatives(calculator):
+    y, h = 0.05, 1E-5
+    pv, pv_prime, pv_prime2 = calculator.value_and_derivatives(y)
+    assert pv == pytest.approx(calculator.yield_to_pv(y), rel=1E-14)
+    assert pv_prime == pytest.approx(calculator.yield_to_pv_prime(y), rel=1E-14)
+    assert pv_prime2 == pytest.approx(calculator.yield_to_pv_prime2(y), rel=1E-14)
+    assert pv_prime == pytest.approx((calculator.yield_to_pv(y + h) - calculator.yield_to_pv(y - h)) / (2 * h), rel=1E-8)
+    assert pv_prime2 == pytest.approx((calculator.yield_to_pv(y + h) - 2 * pv + calculator.yield_to_pv(y - h)) / (h * h), rel=1E-5)
+    assert calculator.pv_to_yield(pv) == pytest.approx(y, abs=1E-12)
@@ -0,0 +1,92 @@
+from ...utilities.calendar import BusinessDayIndex, CalendarUtil
+from ...utils import BumpDirection, Date, ordinals_to_datetime64
+
+import numpy as np
+import random
+import pytest
+
+
+def is_business_day(calendar_names, date):
+    """Check weekdays and holiday sets directly, as a reference for the index."""
+    return date.is_weekday() and not any([date in CalendarUtil.calendar_map[name].holidays for name in calendar_names])
+
+
+def step_business_days(calendar_names, date, bump_days, inc):
+    """Add business days one day at a time, as a reference for the index."""
+    date = Date(date)
+    while not is_business_day(calendar_names, date):
+        date = date.addDays(inc)
+    for _ in range(bump_days):
+        date = date.addDays(inc)
+        while not is_business_day(calendar_names, date):
+            date = date.addDays(inc)
+    return date
+
+
+def test_is_business_day():
+    assert CalendarUtil.is_business_day(['NYB'], '2022-07-01')
+    assert not CalendarUtil.is_business_day(['NYB'], '2022-07-04')
+    assert not CalendarUtil.is_business_day(['NYB'], '2022-07-02')
+    assert CalendarUtil.is_business_day([], '2022-07-04')
+    # outside the calendar years only weekends are not business days
+    assert CalendarUtil.is_business_day(['NYB'], '2100-01-01')
+    assert not CalendarUtil.is_business_day(['NYB'], '2100-01-02')
+
+
+def test_business_day_index_is_cached():
+    assert CalendarUtil.business_day_index(['NYB']) is CalendarUtil.business_day_index(['NYB', 'NYB'])
+    assert CalendarUtil.business_day_index([]) is CalendarUtil.business_day_index([])
+
+
+@pytest.mark.parametrize('calendar_names', [['NYB'], []])
+def test_add_business_days_matches_stepping(calendar_names):
+    rng = random.Random(0)
+    base_date = Date('2022-01-01')
+    for _ in range(500):
+        date = base_date.addDays(rng.randrange(-3000, 3000))
+        bump_days = rng.randrange(0, 40)
+        for direction, inc in [(BumpDirection.FORWARD, 1), (BumpDirection.BACKWARD, -1)]:
+            expected = step_business_days(calendar_names, date, bump_days, inc)
+            assert CalendarUtil.add_business_days(calendar_names, date, bump_days, direction) == expected
+
+
+def test_add_business_days_past_calendar_range():
+    assert CalendarUtil.add_business_days(['NYB'], '2099-12-31', 2) == Date('2100-01-04')
+    assert CalendarUtil.add_business_days(['NYB'], '1900-01-01', 1, BumpDirection.BACKWARD) == Date('1899-12-28')
+    assert CalendarUtil.nearest_business_day(['NYB'], '2022-07-04') == Date('2022-07-05')
+    assert CalendarUtil.nearest_business_day(['NYB'], '2022-07-04', BumpDirection.BACKWARD) == Date('2022-07-01')
+
+
+def test_joint_index():
+    start = Date('2022-07-01').ordinal
+    first = BusinessDayIndex.from_holidays(start, start + 9, [Date('2022-07-04').ordinal])
+    second = BusinessDayIndex.from_holidays(start + 2, start + 20, [Date('2022-07-05').ordinal])
+    joint = BusinessDayIndex.joint([first, second])
+    assert (joint.start_ordinal, joint.end_ordinal) == (start + 2, start + 9)
+    assert [Date.from_ordinal(o) for o in joint.bday_ordinals] == [Date(d) for d in ['2022-07-06', '2022-07-07', '2022-07-08']]
+    assert joint.add_business_days(Date('2022-07-04').ordinal, 1, 1) == Date('2022-07-07').ordinal
+    assert joint.add_business_days(Date('2022-07-08').ordinal, 1, 1) is None
+
+
+@pytest.mark.parametrize('calendar_names', [['NYB'], []])
+def test_array_operations_match_scalar(calendar_names):
+    rng = random.Random(1)
+    base_date = Date('2022-01-01')
+    dates = [base_date.addDays(rng.randrange(-3000, 3000)) for _ in range(500)]
+    dates += [Date('1899-12-30'), Date('2100-01-01'), Date('2099-12-31')]
+    ordinals = np.array([d.ordinal for d in dates], dtype=np.int64)
+    dates64 = ordinals_to_datetime64(ordinals)
+
+    expected = [is_business_day(calendar_names, d) for d in dates]
+    assert [CalendarUtil.is_business_day(calendar_names, d) for d in dates] == expected
+    assert CalendarUtil.is_business_day_array(calendar_names, dates64).tolist() == expected
+
+    for bump_days in [0, 1, 5]:
+        for direction in [BumpDirection.FORWARD, BumpDirection.BACKWARD]:
+            inc = 1 if direction == BumpDirection.FORWARD else -1
+            expected = [step_business_days(calendar_names, d, bump_days, inc).ordinal for d in dates]
+            assert CalendarUtil.add_business_days_array(calendar_names, ordinals, bump_days, direction).tolist() == expected
+
+    adjusted = CalendarUtil.nearest_business_day_array(calendar_names, dates64)
+    assert adjusted.dtype == np.dtype('datetime64[D]')
+    assert adjusted.astype(str).tolist() == [str(step_business_days(calendar_names, d, 0, 1)) for d in dates]
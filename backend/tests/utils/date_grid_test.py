@@ -0,0 +1,38 @@
+from ...utils import Date, EomRule
+from ...utilities.dategrid import ResultDateGrid, grid_spec, result_date_grid
+
+import numpy as np
+import pytest
+
+def stepped_dates(start_date, spec):
+    """Return the grid dates by stepping one Date at a time."""
+    dates = []
+    d = start_date
+    for end_tenor, step in spec:
+        end_date = start_date.addTenor(end_tenor)
+        while d <= end_date:
+            dates.append(d)
+            d = d.addDays(int(step[:-1])) if step.endswith('D') else d.addMonths(int(step[:-1]), EomRule.LAST)
+    return dates
+
+
+@pytest.mark.parametrize('base_date', ['2022-10-10', '2024-01-31', '2023-02-28', '2024-02-29'])
+@pytest.mark.parametrize('grid', ['default', 'thumbnail', [('1Y', '1D'), ('5Y', '1M'), ('30Y', '6M')]])
+def test_grid_matches_stepped_dates(base_date, grid):
+    spec = grid_spec(grid)
+    dates = stepped_dates(Date(base_date), spec)
+    result_grid = ResultDateGrid(base_date, spec)
+
+    assert result_grid.dates() == dates
+    assert result_grid.date_strs() == [str(d) for d in dates]
+    assert result_grid.dates64.dtype == np.dtype('datetime64[D]')
+    assert np.allclose(result_grid.year_fractions('2022-01-01'), [(d - Date('2022-01-01')).days / 365.0 for d in dates])
+
+
+def test_grid_is_memoized():
+    grid = result_date_grid('2022-10-10')
+    assert result_date_grid(Date('2022-10-10'), 'default') is grid
+    assert result_date_grid('2022-10-10', 'thumbnail') is not grid
+    assert not grid.ordinals.flags.writeable
+    with pytest.raises(ValueError):
+        result_date_grid('2022-10-10', 'unknown')
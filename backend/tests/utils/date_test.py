@@ -0,0 +1,77 @@
+from ...utils import Date, DateParser, DateTime, EomRule
+
+import datetime
+import pickle
+import pytest
+
+@pytest.mark.parametrize('date_str', ['2022-04-01', '20220401', '01 Apr 2022', '01-Apr-2022', '04/01/2022'])
+def test_supported_formats(date_str):
+    date = Date(date_str)
+    assert (date.year, date.month, date.day) == (2022, 4, 1)
+    assert date.toordinal() == datetime.date(2022, 4, 1).toordinal()
+    assert str(date) == '2022-04-01'
+
+
+def test_unsupported_format():
+    with pytest.raises(TypeError):
+        Date('2022-02-30')
+
+
+def test_ordinal_arithmetic():
+    date = Date('2024-01-31')
+    assert date.addDays(29) == Date('2024-02-29')
+    assert date.addDays(-31) == Date('2023-12-31')
+    assert date.addMonths(1, EomRule.LAST) == Date('2024-02-29')
+    assert date.addMonths(-13, EomRule.SAME) == Date('2022-12-31')
+    assert date.addMonths(25, EomRule.SAME) == Date('2026-02-28')
+    assert Date('2024-02-29').addOneYear() == Date('2025-02-28')
+    assert Date('2024-02-29').endOfMonth() == Date('2024-02-29')
+    assert (Date('2024-03-01') - '2024-02-01').days == 29
+    assert [Date('2024-06-03').addDays(i).weekday() for i in range(7)] == list(range(7))
+
+
+def test_date_is_compact():
+    date = Date('2022-04-01')
+    assert not hasattr(date, '__dict__')
+    assert date.date == datetime.date(2022, 4, 1)
+    assert pickle.loads(pickle.dumps(date)) == date
+    assert { Date('2022-04-01'): 1 }[Date(datetime.date(2022, 4, 1))] == 1
+    assert Date('2022-04-01') < '2022-04-02'
+
+
+def test_date_parser():
+    parser = DateParser(Date.supported_formats)
+    assert parser.parse('04/01/2022') == datetime.date(2022, 4, 1)
+    assert parser.parse('2022 Apr') == datetime.date(2022, 4, 1)
+    assert parser.parse('2022-04-03') == datetime.date(2022, 4, 3)
+    assert '04/01/2022' in parser.memo
+    assert parser.locked_format is None
+    with pytest.raises(TypeError):
+        parser.parse('April 1st')
+    for s in ['2022- 4- 1', '+022-04-01', '2022-04-1 ']:
+        with pytest.raises(TypeError):
+            parser.parse(s)
+
+
+def test_date_parser_ambiguous_formats():
+    formats = ['%m/%d/%Y', '%d/%m/%Y']
+    # without a locked format, the first matching format is used whatever was parsed before
+    parser = DateParser(formats)
+    assert parser.parse('25/12/2022') == datetime.date(2022, 12, 25)
+    assert parser.parse('04/01/2022') == datetime.date(2022, 4, 1)
+
+    # a series parser keeps the format of its first date
+    parser = DateParser(formats, lock_format=True)
+    assert parser.parse('2022-12-24') == datetime.date(2022, 12, 24)
+    assert parser.locked_format is None
+    assert parser.parse('25/12/2022') == datetime.date(2022, 12, 25)
+    assert parser.locked_format == '%d/%m/%Y'
+    assert parser.parse('04/01/2022') == datetime.date(2022, 1, 4)
+    assert parser.parse('12/31/2022') == datetime.date(2022, 12, 31)
+    assert parser.locked_format == '%d/%m/%Y'
+
+
+def test_datetime_parser():
+    assert DateTime('2022-04-01 17:04:35').datetime == datetime.datetime(2022, 4, 1, 17, 4, 35)
+    assert DateTime('20220401170435').datetime == datetime.datetime(2022, 4, 1, 17, 4, 35)
+    assert str(DateTime('2022-04-01')) == '2022-04-01T00:00:00'
@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # file locks are not available on this platform, so locks only apply within the process
+    fcntl = None
+
+from . import config as cfg
+
+class TimeSeriesStore(object):
+    """On-disk store of parsed time series, with one NPZ file per data name.
+        Each file holds the dates, values and the time the series was last fetched.
+        Files are replaced atomically, so the store can be shared by several processes and survives restarts.
+    """
+    def __init__(self, folder=None):
+        if not folder:
+            folder = os.environ.get(cfg.TIME_SERIES_STORE_FOLDER, os.path.join(os.getcwd(), 'backend/timeseries_store'))
+        self.folder = folder
+        self.thread_locks = {}
+        self.thread_locks_lock = threading.Lock()
+
+    def __repr__(self):
+        return f'TimeSeriesStore(\'{self.folder}\')'
+
+    def path(self, name):
+        """Return the file path of the series with this data name."""
+        # readable prefix plus a hash, since data names contain characters that are not valid in file names
+        prefix = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')[:64]
+        digest = hashlib.sha1(name.encode('UTF-8')).hexdigest()[:12]
+        return os.path.join(self.folder, f'{prefix}_{digest}.npz')
+
+    def contains(self, name):
+        return os.path.isfile(self.path(name))
+
+    def get(self, name):
+        """Return (dates, values, fetched_at, full_fetched_at) for this data name, or None if it is not in the store.
+            dates is a list of str, values is a list of float, fetched_at is the POSIX timestamp of the last fetch
+            and full_fetched_at is the timestamp of the last fetch of the full history.
+        """
+        try:
+            with np.load(self.path(name), allow_pickle=False) as f:
+                dates = f['dates'].tolist()
+                values = f['values'].tolist()
+                fetched_at = float(f['fetched_at'])
+                full_fetched_at = float(f['full_fetched_at']) if 'full_fetched_at' in f.files else fetched_at
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return None
+        return dates, values, fetched_at, full_fetched_at
+
+    def set(self, name, dates, values, fetched_at=None, full_fetched_at=None):
+        """Write the series for this data name to the store, replacing any existing file.
+            full_fetched_at defaults to fetched_at, i.e. dates and values are the full history.
+        """
+        if len(dates) != len(values):
+            raise ValueError(f'{self.__class__.__name__}.set: dates and values for {name} must have the same length.')
+
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        full_fetched_at = fetched_at if full_fetched_at is None else full_fetched_at
+        os.makedirs(self.folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    dates=np.array(dates, dtype=str),
+                    values=np.array(values, dtype=float),
+                    fetched_at=np.array(fetched_at, dtype=float),
+                    full_fetched_at=np.array(full_fetched_at, dtype=float)
+                )
+            os.replace(tmp_path, self.path(name))
+        except:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def age(self, name):
+        """Return the number of seconds since the series was last fetched, or None if it is not in the store."""
+        stored = self.get(name)
+        if stored is None:
+            return None
+        return time.time() - stored[2]
+
+    @contextmanager
+    def lock(self, name):
+        """Context manager holding an exclusive lock on the series with this data name, across threads and processes."""
+        if fcntl is None:
+            with self.thread_locks_lock:
+                thread_lock = self.thread_locks.setdefault(name, threading.Lock())
+            with thread_lock:
+                yield
+            return
+
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self.path(name)[:-len('.npz')] + '.lock', 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def delete(self, name):
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+
+# Shared by all DataAPI requests, and by other processes using the same folder
+time_series_store = TimeSeriesStore()
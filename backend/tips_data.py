@@ -1,9 +1,9 @@
-from concurrent import futures
 import datetime
 import os
-import requests
 
 from backend.data import HttpGetter, get_fred_data, MarketWatchBondQuoteParser
+from backend.httpsession import http_session
+from backend.fetchengine import fetch_engine
 from backend import config as cfg
 
 # get logger from current_app instance
@@ -35,34 +35,28 @@ def get_all_tsy_reference_data():
     """Return reference data for all outstanding Treasuries, from Auction Query page on TreasuryDirect."""
     first_page_url = f'https://www.treasurydirect.gov/TA_WS/securities/jqsearch?format=json&pagesize=1&pagenum=0'
     app.logger.info(f'get_all_tsy_reference_data: making request GET {first_page_url}')
-    num_records = requests.get(first_page_url).json()['totalResultsCount']
+    num_records = http_session.get(first_page_url).json()['totalResultsCount']
 
     page_size = 100
-    max_workers = 32
     pages = (num_records // page_size) + 1
     urls = [f'https://www.treasurydirect.gov/TA_WS/securities/jqsearch?format=json&pagesize={page_size}&pagenum={p}'
                 for p in range(pages)
             ]
 
-    def get_page(url):
-        res = requests.get(url).json()
-        return res['securityList']
-
     today = datetime.date.today()
     def str_to_date(s):
         s = s[:10]
         return datetime.date(int(s[:4]), int(s[5:7]), int(s[8:]))
 
-    # request pages in multiple threads
+    # request pages concurrently in the fetch engine
     results = []
-    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_url = { executor.submit(get_page, url): url for url in urls }
-        
-        for future in futures.as_completed(future_to_url):
-            try:
-                results += future.result()
-            except Exception as e:
-                app.logger.error(e)
+    for url, response in zip(urls, fetch_engine.get_many(urls)):
+        try:
+            if isinstance(response, Exception):
+                raise response
+            results += response.json()['securityList']
+        except Exception as e:
+            app.logger.error(f'get_all_tsy_reference_data: failed to get {url}: {e}')
 
     # filter out matured bonds and reopenings
     outstanding = [r for r in results if (str_to_date(r['maturityDate']) > today) and (r['reopening'] == 'No')]
@@ -2,7 +2,8 @@
 from enum import Enum, auto
 import json
 import os
-from ..utils import Date, BumpDirection
+import numpy as np
+from ..utils import Date, BumpDirection, date_ordinals, ordinals_to_datetime64
 
 # get logger from current_app instance
 from flask import current_app as app
@@ -53,6 +54,91 @@ class ObservanceRule(Enum):
             raise ValueError(f'ObservanceRule: unsupported rule {rule}.')
 
 
+class BusinessDayIndex(object):
+    """Business days from start_ordinal to end_ordinal, as a boolean array by day, the sorted array of business day
+        ordinals and the cumulative count of business days on or before each day, so that checking, rolling and adding
+        business days within the range are array lookups.
+    """
+    def __init__(self, start_ordinal, is_business_day):
+        self.start_ordinal = int(start_ordinal)
+        self.is_bday = np.asarray(is_business_day, dtype=bool)
+        self.end_ordinal = self.start_ordinal + self.is_bday.size - 1
+        self.bday_ordinals = self.start_ordinal + np.flatnonzero(self.is_bday)
+        self.bday_counts = np.cumsum(self.is_bday)
+
+    def __repr__(self):
+        return f'BusinessDayIndex({Date.from_ordinal(self.start_ordinal)}, {Date.from_ordinal(self.end_ordinal)})'
+
+    @classmethod
+    def from_holidays(cls, start_ordinal, end_ordinal, holiday_ordinals):
+        """Return the index of weekdays that are not holidays from start_ordinal to end_ordinal."""
+        ordinals = np.arange(start_ordinal, end_ordinal + 1)
+        # day ordinal 1 is a Monday
+        is_bday = (ordinals - 1) % 7 < 5
+        holiday_ordinals = np.asarray(sorted(holiday_ordinals), dtype=np.int64)
+        holiday_ordinals = holiday_ordinals[(holiday_ordinals >= start_ordinal) & (holiday_ordinals <= end_ordinal)]
+        is_bday[holiday_ordinals - start_ordinal] = False
+        return cls(start_ordinal, is_bday)
+
+    @classmethod
+    def joint(cls, indices):
+        """Return the index of days that are business days in all of these indices, over the range they share."""
+        start_ordinal = max(index.start_ordinal for index in indices)
+        end_ordinal = min(index.end_ordinal for index in indices)
+        is_bday = np.ones(max(end_ordinal - start_ordinal + 1, 0), dtype=bool)
+        for index in indices:
+            offset = start_ordinal - index.start_ordinal
+            is_bday &= index.is_bday[offset:offset + is_bday.size]
+        return cls(start_ordinal, is_bday)
+
+    def contains(self, ordinal):
+        return self.start_ordinal <= ordinal <= self.end_ordinal
+
+    def is_business_day(self, ordinal):
+        """Return True if the day ordinal is a business day. pre-condition: ordinal is in the index."""
+        return bool(self.is_bday[ordinal - self.start_ordinal])
+
+    def add_business_days(self, ordinal, bump_days, inc):
+        """Return the ordinal bump_days business days from the nearest business day to ordinal in direction inc,
+            which is 1 or -1, or None if the result is not in the index.
+        """
+        if not self.contains(ordinal):
+            return None
+
+        offset = ordinal - self.start_ordinal
+        # position of the last business day on or before ordinal
+        position = int(self.bday_counts[offset]) - 1
+        if inc > 0:
+            if not self.is_bday[offset]:
+                position += 1
+            position += bump_days
+        else:
+            position -= bump_days
+
+        if 0 <= position < self.bday_ordinals.size:
+            return int(self.bday_ordinals[position])
+        return None
+
+    def add_business_days_array(self, ordinals, bump_days, inc):
+        """Return add_business_days of each ordinal in an array, as an array of ordinals with -1 where the result
+            is not in the index.
+        """
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        in_range = (ordinals >= self.start_ordinal) & (ordinals <= self.end_ordinal)
+        offsets = np.where(in_range, ordinals - self.start_ordinal, 0)
+
+        positions = self.bday_counts[offsets] - 1
+        if inc > 0:
+            positions += ~self.is_bday[offsets] + bump_days
+        else:
+            positions -= bump_days
+
+        valid = in_range & (positions >= 0) & (positions < self.bday_ordinals.size)
+        if not self.bday_ordinals.size:
+            return np.full(ordinals.shape, -1, dtype=np.int64)
+        return np.where(valid, self.bday_ordinals[np.where(valid, positions, 0)], -1)
+
+
 class Calendar(object):
 
     calendars_root = os.path.join(os.getcwd(), 'backend/utilities/calendarfiles')
@@ -74,6 +160,12 @@ class Calendar(object):
             app.logger.error(f'Could not read calendar {name}: {e}')
             raise e
 
+        self.index = BusinessDayIndex.from_holidays(
+            Date.from_ymd(self.min_year, 1, 1).ordinal,
+            Date.from_ymd(self.max_year, 12, 31).ordinal,
+            [h.ordinal for h in self.holidays]
+        )
+
     def __repr__(self):
         return f'Calendar({self.name})'
 
@@ -229,6 +321,8 @@ class CalendarManager(object):
 
     def __init__(self):
         self.calendar_map = { name: Calendar(name) for name in CalendarManager.supported_calendars }
+        # business day indices of each combination of calendars, with no calendars meaning weekdays only
+        self.joint_indices = {}
     
     def __repr__(self):
         return f'CalendarManager({CalendarManager.supported_calendars})'
@@ -244,11 +338,33 @@ class CalendarManager(object):
             if name not in self.calendar_map:
                 raise ValueError(f'CalendarManager: unsupported calendar name {name}.')
 
+    def business_day_index(self, calendar_names):
+        """Return the BusinessDayIndex of these calendars combined, built on first use."""
+        key = tuple(sorted(set(calendar_names)))
+        index = self.joint_indices.get(key)
+        if index is None:
+            if len(key) == 1:
+                index = self.calendar_map[key[0]].index
+            elif key:
+                index = BusinessDayIndex.joint([self.calendar_map[name].index for name in key])
+            else:
+                calendars = self.calendar_map.values()
+                index = BusinessDayIndex.from_holidays(
+                    min(cal.index.start_ordinal for cal in calendars),
+                    max(cal.index.end_ordinal for cal in calendars),
+                    []
+                )
+            self.joint_indices[key] = index
+        return index
+
     def is_business_day(self, calendar_names, date):
         """ Return True if this date is a business day in the holiday calendar, False otherwise.
             pre-condition: calendar_names is a subset of CalendarManager.supported_calendars
         """
         date = Date(date)
+        index = self.business_day_index(calendar_names)
+        if index.contains(date.ordinal):
+            return index.is_business_day(date.ordinal)
         return date.is_weekday() and (not any([date in self.calendar_map[cal].holidays for cal in calendar_names]))
 
     def add_business_days(self, calendar_names, date, bump_days, direction=BumpDirection.FORWARD):
@@ -266,8 +382,13 @@ class CalendarManager(object):
         else:
             raise ValueError('CalendarManager.add_business_days: unsupported BumpDirection, must be FORWARD or BACKWARD.')
         
-        # move to nearest business day
         date = Date(date)
+        ordinal = self.business_day_index(calendar_names).add_business_days(date.ordinal, bump_days, inc)
+        if ordinal is not None:
+            return Date.from_ordinal(ordinal)
+
+        # outside the calendar years, step one day at a time
+        # move to nearest business day
         while (not self.is_business_day(calendar_names, date)):
             date = date.addDays(inc)
 
@@ -284,5 +405,56 @@ class CalendarManager(object):
         """Return the nearest bday to date."""
         return self.add_business_days(calendar_names, date, 0, direction)
 
+    def is_business_day_array(self, calendar_names, dates):
+        """Return a boolean array of is_business_day for an array of dates, as datetime64 or day ordinals."""
+        ordinals = CalendarManager.to_ordinals(dates)
+        index = self.business_day_index(calendar_names)
+        in_range = (ordinals >= index.start_ordinal) & (ordinals <= index.end_ordinal)
+        result = index.is_bday[np.where(in_range, ordinals - index.start_ordinal, 0)] & in_range
+        for i in np.flatnonzero(~in_range):
+            result[i] = self.is_business_day(calendar_names, Date.from_ordinal(int(ordinals[i])))
+        return result
+
+    def add_business_days_array(self, calendar_names, dates, bump_days, direction=BumpDirection.FORWARD):
+        """ Return add_business_days of each date in an array of dates, as datetime64 or day ordinals.
+            The result is a datetime64[D] array if dates is one, otherwise an array of day ordinals.
+        """
+        self.check_calendar_names(calendar_names)
+        if bump_days < 0:
+            raise ValueError('CalendarManager.add_business_days_array: bump_days cannot be negative. Use BumpDirection.BACKWARD.')
+
+        if direction == BumpDirection.FORWARD:
+            inc = 1
+        elif direction == BumpDirection.BACKWARD:
+            inc = -1
+        else:
+            raise ValueError('CalendarManager.add_business_days_array: unsupported BumpDirection, must be FORWARD or BACKWARD.')
+
+        ordinals = CalendarManager.to_ordinals(dates)
+        result = self.business_day_index(calendar_names).add_business_days_array(ordinals, bump_days, inc)
+        # outside the calendar years, add one date at a time
+        for i in np.flatnonzero(result < 0):
+            date = Date.from_ordinal(int(ordinals[i]))
+            result[i] = self.add_business_days(calendar_names, date, bump_days, direction).ordinal
+
+        if CalendarManager.is_datetime64(dates):
+            return ordinals_to_datetime64(result)
+        return result
+
+    def nearest_business_day_array(self, calendar_names, dates, direction=BumpDirection.FORWARD):
+        """Return the nearest bday to each date in an array of dates, as datetime64 or day ordinals."""
+        return self.add_business_days_array(calendar_names, dates, 0, direction)
+
+    @staticmethod
+    def is_datetime64(dates):
+        return isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64)
+
+    @staticmethod
+    def to_ordinals(dates):
+        """Return an array of day ordinals of dates, given as day ordinals, datetime64 or a list of dates."""
+        if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.integer):
+            return dates.astype(np.int64)
+        return date_ordinals(dates)
+
 # export CalendarManager object to app
 CalendarUtil = CalendarManager()
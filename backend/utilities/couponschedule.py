@@ -1,6 +1,6 @@
 
 from .calendar import CalendarUtil
-from ..utils import Date, BumpDirection, DateFrequency, EomRule, day_count_fraction
+from ..utils import Date, BumpDirection, DateFrequency, EomRule, date_ordinals, day_count_fraction
 
 # A CouponSchedule is a collection of lists of ascending coupon and payment Dates generated using some rule.
 class CouponSchedule(object):
@@ -81,33 +81,16 @@ class CouponSchedule(object):
         else:
             raise ValueError(f'CouponSchedule: unsupported bump direction {self.direction}.')
 
-        # Adjust dates using coupon calendar
-        self.adj_start_dates.append(CalendarUtil.nearest_business_day(
-                                                self.coupon_calendars,
-                                                self.unadj_start_dates[0]
-                                            ))
-        self.adj_end_dates.append(CalendarUtil.nearest_business_day(
-                                                self.coupon_calendars,
-                                                self.unadj_end_dates[0]
-                                            ))
-        for i, e_date in enumerate(self.unadj_end_dates[1:]):
-            adj_e_date = CalendarUtil.nearest_business_day(
-                                                self.coupon_calendars,
-                                                e_date
-                                            )
-            # i is index of e_date minus 1
-            self.adj_start_dates.append(self.adj_end_dates[i])
-            self.adj_end_dates.append(adj_e_date)
+        # Adjust dates using coupon calendar, for all dates at once
+        unadj_ordinals = date_ordinals(self.unadj_end_dates)
+        adj_ordinals = CalendarUtil.nearest_business_day_array(self.coupon_calendars, unadj_ordinals)
+        self.adj_end_dates = [Date.from_ordinal(o) for o in adj_ordinals.tolist()]
+        self.adj_start_dates = [CalendarUtil.nearest_business_day(self.coupon_calendars, self.unadj_start_dates[0])] + self.adj_end_dates[:-1]
 
         # Generate payment dates
-        end_dates = self.adj_end_dates if pay_dates_relative_to_adj else self.unadj_end_dates
-        for e_date in end_dates:
-            pay_date = CalendarUtil.add_business_days(
-                                        self.payment_calendars,
-                                        e_date,
-                                        self.payment_days
-                                    )
-            self.payment_dates.append(pay_date)
+        end_ordinals = adj_ordinals if pay_dates_relative_to_adj else unadj_ordinals
+        payment_ordinals = CalendarUtil.add_business_days_array(self.payment_calendars, end_ordinals, self.payment_days)
+        self.payment_dates = [Date.from_ordinal(o) for o in payment_ordinals.tolist()]
 
         
     def __repr__(self):
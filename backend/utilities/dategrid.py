@@ -0,0 +1,106 @@
+from .. import config as cfg
+from ..utils import Date, Tenor, date_ordinals, ordinals_to_datetime64
+
+import functools
+import numpy as np
+
+class ResultDateGrid(object):
+    """Dates to evaluate model results, as read-only arrays of day ordinals and datetime64[D], built from a grid spec.
+        A grid spec is a list of (end tenor, step) segments, e.g. [('3Y', '1D'), ('31Y', '1M')]. Each segment starts
+        at the first date after the previous one and steps by days or months up to and including base date + end tenor.
+        Month steps follow EomRule.LAST.
+    """
+    def __init__(self, base_date, spec):
+        self.base_date = Date(base_date)
+        self.spec = spec
+
+        segments = []
+        start_ordinal = self.base_date.ordinal
+        for end_tenor, step in spec:
+            end_ordinal = self.base_date.addTenor(end_tenor).ordinal
+            segment, start_ordinal = ResultDateGrid.segment_ordinals(start_ordinal, end_ordinal, Tenor(step))
+            segments.append(segment)
+
+        self.ordinals = np.concatenate(segments) if segments else np.array([], dtype=np.int64)
+        self.ordinals.flags.writeable = False
+        self.dates64 = ordinals_to_datetime64(self.ordinals)
+        self.dates64.flags.writeable = False
+        self.date_list = None
+        self.date_str_list = None
+
+    def __repr__(self):
+        return f'ResultDateGrid({self.base_date}, {self.spec}, size={self.ordinals.size})'
+
+    def __len__(self):
+        return self.ordinals.size
+
+    @staticmethod
+    def segment_ordinals(start_ordinal, end_ordinal, step):
+        """Return the array of day ordinals from start_ordinal to end_ordinal, inclusive, in steps of a Tenor,
+            and the ordinal of the next step after the segment.
+        """
+        if step.size <= 0:
+            raise ValueError(f'ResultDateGrid.segment_ordinals: step must be positive but got {step}.')
+        if end_ordinal < start_ordinal:
+            return np.array([], dtype=np.int64), start_ordinal
+
+        if step.unit == 'D':
+            ordinals = np.arange(start_ordinal, end_ordinal + 1, step.size, dtype=np.int64)
+            return ordinals, int(ordinals[-1]) + step.size
+
+        step_months = step.size * (12 if step.unit == 'Y' else 1)
+        start_date = Date.from_ordinal(start_ordinal)
+        end_date = Date.from_ordinal(end_ordinal)
+        num_months = 12 * (end_date.year - start_date.year) + end_date.month - start_date.month
+        # one step past the end month, to find the start of the next segment
+        months = np.datetime64(f'{start_date.year:04d}-{start_date.month:02d}', 'M') + np.arange(0, num_months + step_months + 1, step_months)
+        month_starts = months.astype('datetime64[D]')
+        days_in_month = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+
+        # stepping by months with EomRule.LAST keeps the day until a date falls on a month end, then stays at month ends
+        at_month_end = np.maximum.accumulate(start_date.day >= days_in_month)
+        days = np.where(at_month_end, days_in_month, start_date.day)
+        ordinals = date_ordinals(month_starts) + days - 1
+
+        num_dates = np.searchsorted(ordinals, end_ordinal, side='right')
+        return ordinals[:num_dates], int(ordinals[num_dates])
+
+    def dates(self):
+        """Return the list of Dates in the grid."""
+        if self.date_list is None:
+            self.date_list = [Date.from_ordinal(o) for o in self.ordinals.tolist()]
+        return list(self.date_list)
+
+    def date_strs(self):
+        """Return the list of yyyy-mm-dd strings of the dates in the grid."""
+        if self.date_str_list is None:
+            self.date_str_list = np.datetime_as_string(self.dates64, unit='D').tolist()
+        return list(self.date_str_list)
+
+    def year_fractions(self, start_date=None):
+        """Return the ACT/365 year fractions from start_date, default base_date, to each date in the grid."""
+        start_ordinal = self.base_date.ordinal if start_date is None else Date(start_date).ordinal
+        return (self.ordinals - start_ordinal) / 365.0
+
+
+def grid_spec(grid=None):
+    """Return a grid spec as a tuple of (end tenor, step) pairs, given a spec or the name of one in cfg.result_date_grids_."""
+    if grid is None:
+        grid = cfg.default_result_date_grid_
+    if isinstance(grid, str):
+        if grid not in cfg.result_date_grids_:
+            raise ValueError(f'grid_spec: unrecognized grid {grid}, expected one of {list(cfg.result_date_grids_.keys())}.')
+        grid = cfg.result_date_grids_[grid]
+    try:
+        return tuple((str(end_tenor), str(step)) for end_tenor, step in grid)
+    except (TypeError, ValueError):
+        raise ValueError(f'grid_spec: grid must be a list of (end tenor, step) pairs but got {grid}.')
+
+
+@functools.lru_cache(maxsize=cfg.result_date_grid_cache_size_)
+def cached_result_date_grid(base_date_str, spec):
+    return ResultDateGrid(base_date_str, spec)
+
+def result_date_grid(base_date, grid=None):
+    """Return the ResultDateGrid from base_date for a grid spec or grid name, memoized per (base_date, spec)."""
+    return cached_result_date_grid(str(Date(base_date)), grid_spec(grid))
@@ -1,6 +1,7 @@
 
 import datetime
 from enum import Enum, auto
+import numpy as np
 
 class StrEnum(Enum):
 
@@ -134,99 +135,130 @@ class Month(StrEnum):
 
 
 class Date(object):
-    # wraps datetime.date but allows conversion from string types in constructor
+    # wraps a proleptic Gregorian day ordinal, as in datetime.date.toordinal(), but allows conversion from
+    # datetime.date and string types in constructor
+    __slots__ = ('ordinal', 'year', 'month', 'day')
+
+    supported_formats = [
+        '%Y-%m-%d', # 2022-04-01
+        '%Y%m%d',   # 20220401
+        '%Y-%m',    # 2022-04
+        '%Y %b',    # 2022 Apr
+        '%d %b %Y', # 01 Apr 2022
+        '%d-%b-%Y', # 01-Apr-2022
+        '%m/%d/%Y'  # 04/01/2022
+    ]
+
+    days_in_month = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
     def __init__(self, date):
 
         if isinstance(date, Date):
-            self.date = date.date
-        elif isinstance(date, datetime.date):
-            self.date = date
-        else:
-            date = str(date)
-
-            supported_formats = [
-                '%Y-%m-%d', # 2022-04-01
-                '%Y%m%d',   # 20220401
-                '%Y-%m',    # 2022-04
-                '%Y %b',    # 2022 Apr
-                '%d %b %Y', # 01 Apr 2022
-                '%d-%b-%Y', # 01-Apr-2022
-                '%m/%d/%Y'  # 04/01/2022
-            ]
-            date_obj = None
-            for fmt in supported_formats:
-                try:
-                    date_obj = datetime.datetime.strptime(date, fmt).date()
-                    break
-                except ValueError as e:
-                    pass
-
-            if date_obj:
-                date = date_obj
-            else:
-                raise TypeError(f'Unsupported date format: {date}')
-
-            self.date = date
-        
-        # datetime.date API
+            self.ordinal = date.ordinal
+            self.year = date.year
+            self.month = date.month
+            self.day = date.day
+            return
+
+        if not isinstance(date, datetime.date):
+            date = Date.parse_date_str(str(date))
+
+        self.ordinal = date.toordinal()
         self.year = date.year
         self.month = date.month
         self.day = date.day
-        self.hash = self.year * 10000 + self.month * 100 + self.day
+
+    @staticmethod
+    def parse_date_str(date):
+        """Return the datetime.date of a string in one of the supported formats."""
+        return date_parser.parse(date)
+
+    @classmethod
+    def from_ordinal(cls, ordinal):
+        """Return the Date of a day ordinal."""
+        d = datetime.date.fromordinal(ordinal)
+        date = cls.__new__(cls)
+        date.ordinal = ordinal
+        date.year = d.year
+        date.month = d.month
+        date.day = d.day
+        return date
+
+    @classmethod
+    def from_ymd(cls, year, month, day):
+        """Return the Date of a year, month and day."""
+        date = cls.__new__(cls)
+        date.ordinal = datetime.date(year, month, day).toordinal()
+        date.year = year
+        date.month = month
+        date.day = day
+        return date
 
     
     def __repr__(self):
-        return str(self.date)
+        return f'{self.year:04d}-{self.month:02d}-{self.day:02d}'
 
     def __hash__(self):
-        return self.hash
+        return self.ordinal
+
+    @property
+    def date(self):
+        return datetime.date.fromordinal(self.ordinal)
 
     def datetime_date(self):
         return self.date
 
+    def toordinal(self):
+        return self.ordinal
+
     def start_of_month(self):
-        return Date(self.__repr__()[:-3] + '-01')
+        return Date.from_ymd(self.year, self.month, 1)
 
     # Overload binary operators
     def __lt__(self, rhs):
         if not isinstance(rhs, Date):
             rhs = Date(rhs)
-        return self.hash < rhs.hash
+        return self.ordinal < rhs.ordinal
 
     def __le__(self, rhs):
         if not isinstance(rhs, Date):
             rhs = Date(rhs)
-        return self.hash <= rhs.hash
+        return self.ordinal <= rhs.ordinal
 
     def __gt__(self, rhs):
         if not isinstance(rhs, Date):
             rhs = Date(rhs)
-        return self.hash > rhs.hash
+        return self.ordinal > rhs.ordinal
 
     def __ge__(self, rhs):
         if not isinstance(rhs, Date):
             rhs = Date(rhs)
-        return self.hash >= rhs.hash
+        return self.ordinal >= rhs.ordinal
 
     def __eq__(self, rhs):
-        # no type check to save a constructor call
-        return self.hash == rhs.hash
+        # no conversion to save a constructor call
+        if isinstance(rhs, Date):
+            return self.ordinal == rhs.ordinal
+        return NotImplemented
 
     def __ne__(self, rhs):
-        # no type check to save a constructor call
-        return self.hash != rhs.hash
+        # no conversion to save a constructor call
+        if isinstance(rhs, Date):
+            return self.ordinal != rhs.ordinal
+        return NotImplemented
 
     def __sub__(self, rhs):
         if not isinstance(rhs, Date):
             rhs = Date(rhs)
-        return self.date - rhs.date
+        return datetime.timedelta(days=self.ordinal - rhs.ordinal)
 
     @classmethod
     def today(cls):
         return Date(datetime.date.today())
 
     def weekday(self):
-        return self.date.weekday()
+        # day ordinal 1 is Monday 0001-01-01
+        return (self.ordinal - 1) % 7
 
     def is_weekday(self):
         return self.weekday() < 5
@@ -258,28 +290,14 @@ class Date(object):
     @classmethod
     def class_daysInMonth(cls, month, year):
         """Return the number of days in this month."""
-        daysInMonth = {
-            1: 31,
-            2: 28,
-            3: 31,
-            4: 30,
-            5: 31,
-            6: 30,
-            7: 31,
-            8: 31,
-            9: 30,
-            10: 31,
-            11: 30,
-            12: 31
-        }
         if month == 2 and Date.class_isLeapYear(year):
             return 29
         else:
-            return daysInMonth[month]
+            return Date.days_in_month[month - 1]
 
     def endOfMonth(self):
         """Return the Date that is last in this month."""
-        return Date(datetime.date(self.year, self.month, self.daysInMonth()))
+        return Date.from_ymd(self.year, self.month, self.daysInMonth())
 
     # bump functions
     def addOneYear(self, sign=1):
@@ -288,33 +306,27 @@ class Date(object):
         if abs(sign) != 1:
             raise ValueError('Date.addOneYear: sign must be +/-1')
         day = self.day if not self.isLeapDay() else 28
-        return Date(datetime.date(self.year + sign, self.month, day))
+        return Date.from_ymd(self.year + sign, self.month, day)
 
     def addMonths(self, months, eom_rule):
         """Return a new Date that is months ahead/behind this date."""
-        year = self.year
-        month = self.month + months
-
-        while month > 12:
-            year += 1
-            month -= 12
-
-        while month < 1:
-            year -= 1
-            month += 12
+        year_shift, month_index = divmod(self.month - 1 + months, 12)
+        year = self.year + year_shift
+        month = month_index + 1
         
         # Use eom_rule to determine day number.
-        day = min(self.day, Date.class_daysInMonth(month, year))
+        days_in_month = Date.class_daysInMonth(month, year)
+        day = min(self.day, days_in_month)
         if eom_rule == EomRule.LAST:
             if self.day == Date.class_daysInMonth(self.month, self.year):
                 # stay at end of shifted month
-                day = Date.class_daysInMonth(month, year)
+                day = days_in_month
         
-        return Date(datetime.date(year, month, day))
+        return Date.from_ymd(year, month, day)
 
     def addDays(self, days):
         """Return a new Date that is days ahead of this date."""
-        return Date(self.date + datetime.timedelta(days=days))
+        return Date.from_ordinal(self.ordinal + days)
 
     def addTenor(self, tenor, eom_rule=EomRule.LAST):
         """Return a new Date that is tenor ahead of this date."""
@@ -353,6 +365,21 @@ class Date(object):
 
 class DateTime(object):
     # wraps datetime.datetime but allows conversion from string types in constructor
+    supported_formats = [
+        '%Y%m%d%H%M%S',         # 20220401170435
+        '%Y-%m-%d %H:%M:%S',    # 2022-04-01 17:04:35
+        '%Y-%m-%d %H:%M:%S.%f', # 2022-04-01 17:04:35.987654
+        '%H:%M:%S %d %b %Y',    # 17:04:35 01 Apr 2022
+        '%Y-%m-%d  %I:%M:%S %p', # 2022-04-01  5:04:35 PM
+        # Date formats
+        '%Y-%m-%d', # 2022-04-01
+        '%Y%m%d',   # 20220401
+        '%Y-%m',    # 2022-04
+        '%Y %b',    # 2022 Apr
+        '%d %b %Y', # 01 Apr 2022
+        '%d-%b-%Y'  # 01-Apr-2022
+    ]
+
     def __init__(self, dt):
 
         if isinstance(dt, DateTime):
@@ -360,35 +387,7 @@ class DateTime(object):
         elif isinstance(dt, datetime.datetime):
             self.datetime = dt
         else:
-            dt = str(dt)
-
-            supported_formats = [
-                '%Y%m%d%H%M%S',         # 20220401170435
-                '%Y-%m-%d %H:%M:%S',    # 2022-04-01 17:04:35
-                '%Y-%m-%d %H:%M:%S.%f', # 2022-04-01 17:04:35.987654
-                '%H:%M:%S %d %b %Y',    # 17:04:35 01 Apr 2022
-                '%Y-%m-%d  %I:%M:%S %p', # 2022-04-01  5:04:35 PM
-                # Date formats
-                '%Y-%m-%d', # 2022-04-01
-                '%Y%m%d',   # 20220401
-                '%Y-%m',    # 2022-04
-                '%Y %b',    # 2022 Apr
-                '%d %b %Y', # 01 Apr 2022
-                '%d-%b-%Y'  # 01-Apr-2022
-            ]
-            date_obj = None
-            for fmt in supported_formats:
-                try:
-                    date_obj = datetime.datetime.strptime(dt, fmt)
-                    break
-                except ValueError:
-                    pass
-
-            if date_obj:
-                dt = date_obj
-            else:
-                raise TypeError(f'Unsupported date format: {dt}')
-
+            dt = datetime_parser.parse(str(dt))
             self.datetime = dt
         
         # datetime.datetime API
@@ -410,6 +409,76 @@ class DateTime(object):
         return Date(self.datetime.strftime('%Y-%m-%d'))
 
 
+class DateParser(object):
+    """Parser of date strings in a list of strptime formats, returning datetime.date or datetime.datetime objects.
+        ISO yyyy-mm-dd strings are parsed by slicing, and other strings by the first format in the list that matches,
+        so the result of a string never depends on the strings parsed before it. Parsed strings are memoized.
+        With lock_format, the parser belongs to one series: the first format that matches is tried first from then on,
+        so strings that are ambiguous between formats are read the same way as the rest of the series.
+    """
+    def __init__(self, formats, result_type=datetime.date, max_size=65536, lock_format=False):
+        self.formats = list(formats)
+        self.result_type = result_type
+        self.max_size = max_size
+        self.lock_format = lock_format
+        self.locked_format = None
+        self.memo = {}
+
+    def __repr__(self):
+        return f'DateParser(locked_format={self.locked_format}, size={len(self.memo)})'
+
+    def parse(self, s):
+        """Return the date of string s, or raise TypeError if it is not in a supported format."""
+        res = self.memo.get(s)
+        if res is None:
+            res = self.parse_uncached(s)
+            if len(self.memo) >= self.max_size:
+                self.memo.clear()
+            self.memo[s] = res
+        return res
+
+    @staticmethod
+    def is_iso_date(s):
+        return len(s) == 10 and s[4] == s[7] == '-' and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit()
+
+    def parse_uncached(self, s):
+        if self.is_iso_date(s):
+            try:
+                return self.result_type(int(s[:4]), int(s[5:7]), int(s[8:]))
+            except ValueError:
+                pass
+
+        # the format is locked at most once, so memoized results stay consistent with it
+        locked_format = self.locked_format
+        if locked_format is not None:
+            try:
+                return self.strptime(s, locked_format)
+            except ValueError:
+                pass
+
+        for fmt in self.formats:
+            if fmt == locked_format:
+                continue
+            try:
+                res = self.strptime(s, fmt)
+                if self.lock_format and locked_format is None:
+                    self.locked_format = fmt
+                return res
+            except ValueError:
+                pass
+
+        raise TypeError(f'Unsupported date format: {s}')
+
+    def strptime(self, s, fmt):
+        dt = datetime.datetime.strptime(s, fmt)
+        return dt.date() if self.result_type is datetime.date else dt
+
+
+# Shared by the Date and DateTime constructors
+date_parser = DateParser(Date.supported_formats)
+datetime_parser = DateParser(DateTime.supported_formats, result_type=datetime.datetime)
+
+
 class Tenor(object):
     def __init__(self, tenor_str):
         tenor = str(tenor_str).upper()
@@ -428,9 +497,32 @@ class Tenor(object):
         return self.tenor
 
 
+# Day ordinal of numpy's datetime64 epoch 1970-01-01
+EPOCH_ORDINAL = 719163
+
+def date_ordinals(dates):
+    """Return a numpy array of the day ordinals of dates, given as a datetime64 array or a list of dates."""
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype('datetime64[D]').astype(np.int64) + EPOCH_ORDINAL
+    return np.fromiter((Date(d).ordinal for d in dates), dtype=np.int64)
+
+def ordinals_to_datetime64(ordinals):
+    """Return a datetime64[D] array of an array of day ordinals."""
+    return (np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+
+
 def day_count_fraction(start_date, end_date, day_count):
     # pre-condition start_date and end_date are of type Date
     if day_count == DayCount.ACT_365:
         return (end_date - start_date).days / 365.0
     else:
         raise NotImplementedError(f'day_count_fraction for {day_count} is not implemented.')
+
+
+def day_count_fractions(start_date, end_dates, day_count):
+    """Return a numpy array of day count fractions from start_date to each date in end_dates."""
+    if day_count == DayCount.ACT_365:
+        start_ordinal = Date(start_date).ordinal
+        return (date_ordinals(end_dates) - start_ordinal) / 365.0
+    else:
+        raise NotImplementedError(f'day_count_fractions for {day_count} is not implemented.')